@@ -1,7 +1,7 @@
 from logging.config import fileConfig
 
 from alembic import context
-from app.db.base import Base
+from app.db.base import Base, load_models
 from sqlalchemy import engine_from_config, pool
 
 # this is the Alembic Config object, which provides
@@ -17,6 +17,7 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 
 # target_metadata = mymodel.Base.metadata
+load_models()
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
@@ -0,0 +1,33 @@
+"""table qr version
+
+Revision ID: 0b6e2a9d4c71
+Revises: f3b8d1e6a042
+Create Date: 2026-10-19 21:05:27.114830
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0b6e2a9d4c71"
+down_revision: Union[str, Sequence[str], None] = "f3b8d1e6a042"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "restaurant_tables",
+        sa.Column(
+            "qr_version", sa.Integer(), server_default="1", nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("restaurant_tables", "qr_version")
@@ -0,0 +1,403 @@
+"""partition orders
+
+Revision ID: 1c7f4a8e2b95
+Revises: 0b6e2a9d4c71
+Create Date: 2026-10-19 22:10:44.521907
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "1c7f4a8e2b95"
+down_revision: Union[str, Sequence[str], None] = "0b6e2a9d4c71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitioned parents and their partition key
+PARTITIONED = (
+    ("orders", "created_at"),
+    ("order_items", "order_created_at"),
+    ("order_item_options", "order_created_at"),
+)
+# Must match app.services.partitions: monthly, UTC bounds, plus a default
+CREATE_PARTITIONS = """
+DO $$
+DECLARE
+    start_month date := date_trunc(
+        'month', coalesce(
+            (SELECT min(created_at) FROM orders_unpartitioned), now()
+        ) AT TIME ZONE 'UTC')::date;
+    last_month date := (
+        date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months'
+    )::date;
+    parent text;
+BEGIN
+    FOREACH parent IN ARRAY ARRAY[
+        'orders', 'order_items', 'order_item_options'
+    ] LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF %I DEFAULT',
+            parent || '_default', parent
+        );
+    END LOOP;
+    WHILE start_month <= last_month LOOP
+        FOREACH parent IN ARRAY ARRAY[
+            'orders', 'order_items', 'order_item_options'
+        ] LOOP
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES '
+                'FROM (%L) TO (%L)',
+                parent || '_p' || to_char(start_month, 'YYYY_MM'),
+                parent,
+                start_month::timestamp AT TIME ZONE 'UTC',
+                (start_month + interval '1 month')::timestamp
+                    AT TIME ZONE 'UTC'
+            );
+        END LOOP;
+        start_month := start_month + interval '1 month';
+    END LOOP;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Postgres can't partition a table in place: move the old tables
+    # aside, create partitioned ones keyed by the order's created_at,
+    # copy the rows over and drop the old tables. Ids keep their
+    # sequences.
+    op.drop_constraint("payments_order_id_fkey", "payments")
+    op.drop_constraint(
+        "order_item_options_order_item_id_fkey", "order_item_options"
+    )
+    op.drop_constraint("order_items_order_id_fkey", "order_items")
+    for table, _ in PARTITIONED:
+        op.rename_table(table, f"{table}_unpartitioned")
+        op.drop_constraint(f"{table}_pkey", f"{table}_unpartitioned")
+        op.drop_index(f"ix_{table}_id", table_name=f"{table}_unpartitioned")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+    op.drop_constraint(
+        "order_items_order_id_menu_item_id_options_key_key",
+        "order_items_unpartitioned",
+    )
+    op.drop_index(
+        "ix_order_item_options_order_item_id",
+        table_name="order_item_options_unpartitioned",
+    )
+
+    op.create_table(
+        "orders",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('orders_id_seq')"),
+            nullable=False,
+        ),
+        sa.Column("restaurant_id", sa.Integer(), nullable=False),
+        sa.Column("table_id", sa.Integer(), nullable=False),
+        sa.Column("total_amount", sa.Float(), nullable=True),
+        sa.Column("is_completed", sa.Boolean(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["restaurant_id"],
+            ["restaurants.id"],
+            name="orders_restaurant_id_fkey",
+        ),
+        sa.ForeignKeyConstraint(
+            ["table_id"],
+            ["restaurant_tables.id"],
+            name="orders_table_id_fkey",
+        ),
+        sa.PrimaryKeyConstraint("id", "created_at"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_index(
+        "ix_orders_open_table",
+        "orders",
+        ["restaurant_id", "table_id"],
+        unique=False,
+        postgresql_where=sa.text("is_completed IS false"),
+    )
+    op.create_table(
+        "order_items",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('order_items_id_seq')"),
+            nullable=False,
+        ),
+        sa.Column("order_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "order_created_at", sa.TIMESTAMP(timezone=True), nullable=False
+        ),
+        sa.Column("menu_item_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=True),
+        sa.Column(
+            "options_key", sa.String(), server_default="", nullable=False
+        ),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("unit_price", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["menu_item_id"],
+            ["menu_items.id"],
+            name="order_items_menu_item_id_fkey",
+        ),
+        sa.ForeignKeyConstraint(
+            ["order_id", "order_created_at"],
+            ["orders.id", "orders.created_at"],
+            name="order_items_order_id_order_created_at_fkey",
+        ),
+        sa.PrimaryKeyConstraint("id", "order_created_at"),
+        sa.UniqueConstraint(
+            "order_id", "order_created_at", "menu_item_id", "options_key"
+        ),
+        postgresql_partition_by="RANGE (order_created_at)",
+    )
+    op.create_table(
+        "order_item_options",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('order_item_options_id_seq')"),
+            nullable=False,
+        ),
+        sa.Column("order_item_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "order_created_at", sa.TIMESTAMP(timezone=True), nullable=False
+        ),
+        sa.Column("option_id", sa.Integer(), nullable=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("price_delta", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["option_id"],
+            ["options.id"],
+            name="order_item_options_option_id_fkey",
+            ondelete="SET NULL",
+        ),
+        sa.ForeignKeyConstraint(
+            ["order_item_id", "order_created_at"],
+            ["order_items.id", "order_items.order_created_at"],
+            name="order_item_options_order_item_id_order_created_at_fkey",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", "order_created_at"),
+        postgresql_partition_by="RANGE (order_created_at)",
+    )
+    op.create_index(
+        "ix_order_item_options_order_item_id",
+        "order_item_options",
+        ["order_item_id"],
+        unique=False,
+    )
+    op.execute(CREATE_PARTITIONS)
+
+    op.execute(
+        "INSERT INTO orders (id, restaurant_id, table_id, total_amount, "
+        "is_completed, created_at) "
+        "SELECT id, restaurant_id, table_id, total_amount, is_completed, "
+        "created_at FROM orders_unpartitioned"
+    )
+    op.execute(
+        "INSERT INTO order_items (id, order_id, order_created_at, "
+        "menu_item_id, quantity, options_key, name, unit_price) "
+        "SELECT i.id, i.order_id, o.created_at, i.menu_item_id, "
+        "i.quantity, i.options_key, i.name, i.unit_price "
+        "FROM order_items_unpartitioned i "
+        "JOIN orders_unpartitioned o ON o.id = i.order_id"
+    )
+    op.execute(
+        "INSERT INTO order_item_options (id, order_item_id, "
+        "order_created_at, option_id, name, price_delta) "
+        "SELECT x.id, x.order_item_id, o.created_at, x.option_id, x.name, "
+        "x.price_delta FROM order_item_options_unpartitioned x "
+        "JOIN order_items_unpartitioned i ON i.id = x.order_item_id "
+        "JOIN orders_unpartitioned o ON o.id = i.order_id"
+    )
+
+    op.add_column(
+        "payments",
+        sa.Column(
+            "order_created_at", sa.TIMESTAMP(timezone=True), nullable=True
+        ),
+    )
+    op.execute(
+        "UPDATE payments p SET order_created_at = o.created_at "
+        "FROM orders_unpartitioned o WHERE o.id = p.order_id"
+    )
+    op.alter_column("payments", "order_created_at", nullable=False)
+    op.create_foreign_key(
+        "payments_order_id_order_created_at_fkey",
+        "payments",
+        "orders",
+        ["order_id", "order_created_at"],
+        ["id", "created_at"],
+        ondelete="CASCADE",
+    )
+
+    for table, _ in reversed(PARTITIONED):
+        op.drop_table(f"{table}_unpartitioned")
+    for table, _ in PARTITIONED:
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("payments_order_id_order_created_at_fkey", "payments")
+    op.drop_column("payments", "order_created_at")
+    op.drop_constraint(
+        "order_item_options_order_item_id_order_created_at_fkey",
+        "order_item_options",
+    )
+    op.drop_constraint(
+        "order_items_order_id_order_created_at_fkey", "order_items"
+    )
+    for table, _ in PARTITIONED:
+        op.rename_table(table, f"{table}_partitioned")
+        op.drop_constraint(f"{table}_pkey", f"{table}_partitioned")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+    op.drop_index("ix_orders_open_table", table_name="orders_partitioned")
+    op.drop_index(
+        "ix_order_item_options_order_item_id",
+        table_name="order_item_options_partitioned",
+    )
+
+    op.create_table(
+        "orders",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('orders_id_seq')"),
+            nullable=False,
+        ),
+        sa.Column("restaurant_id", sa.Integer(), nullable=False),
+        sa.Column("table_id", sa.Integer(), nullable=False),
+        sa.Column("total_amount", sa.Float(), nullable=True),
+        sa.Column("is_completed", sa.Boolean(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["restaurant_id"],
+            ["restaurants.id"],
+            name="orders_restaurant_id_fkey",
+        ),
+        sa.ForeignKeyConstraint(
+            ["table_id"],
+            ["restaurant_tables.id"],
+            name="orders_table_id_fkey",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_orders_id", "orders", ["id"], unique=False)
+    op.create_table(
+        "order_items",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('order_items_id_seq')"),
+            nullable=False,
+        ),
+        sa.Column("order_id", sa.Integer(), nullable=False),
+        sa.Column("menu_item_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=True),
+        sa.Column(
+            "options_key", sa.String(), server_default="", nullable=False
+        ),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("unit_price", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["menu_item_id"],
+            ["menu_items.id"],
+            name="order_items_menu_item_id_fkey",
+        ),
+        sa.ForeignKeyConstraint(
+            ["order_id"], ["orders.id"], name="order_items_order_id_fkey"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("order_id", "menu_item_id", "options_key"),
+    )
+    op.create_index("ix_order_items_id", "order_items", ["id"], unique=False)
+    op.create_table(
+        "order_item_options",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('order_item_options_id_seq')"),
+            nullable=False,
+        ),
+        sa.Column("order_item_id", sa.Integer(), nullable=False),
+        sa.Column("option_id", sa.Integer(), nullable=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("price_delta", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["option_id"],
+            ["options.id"],
+            name="order_item_options_option_id_fkey",
+            ondelete="SET NULL",
+        ),
+        sa.ForeignKeyConstraint(
+            ["order_item_id"],
+            ["order_items.id"],
+            name="order_item_options_order_item_id_fkey",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_order_item_options_id",
+        "order_item_options",
+        ["id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_order_item_options_order_item_id",
+        "order_item_options",
+        ["order_item_id"],
+        unique=False,
+    )
+
+    op.execute(
+        "INSERT INTO orders (id, restaurant_id, table_id, total_amount, "
+        "is_completed, created_at) "
+        "SELECT id, restaurant_id, table_id, total_amount, is_completed, "
+        "created_at FROM orders_partitioned"
+    )
+    op.execute(
+        "INSERT INTO order_items (id, order_id, menu_item_id, quantity, "
+        "options_key, name, unit_price) "
+        "SELECT id, order_id, menu_item_id, quantity, options_key, name, "
+        "unit_price FROM order_items_partitioned"
+    )
+    op.execute(
+        "INSERT INTO order_item_options (id, order_item_id, option_id, "
+        "name, price_delta) "
+        "SELECT id, order_item_id, option_id, name, price_delta "
+        "FROM order_item_options_partitioned"
+    )
+    op.create_foreign_key(
+        "payments_order_id_fkey",
+        "payments",
+        "orders",
+        ["order_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+    # Dropping a partitioned table drops its partitions
+    for table, _ in reversed(PARTITIONED):
+        op.drop_table(f"{table}_partitioned")
+    for table, _ in PARTITIONED:
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
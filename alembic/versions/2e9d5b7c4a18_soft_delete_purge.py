@@ -0,0 +1,58 @@
+"""soft delete purge
+
+Revision ID: 2e9d5b7c4a18
+Revises: 1c7f4a8e2b95
+Create Date: 2026-10-19 23:02:17.316480
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2e9d5b7c4a18"
+down_revision: Union[str, Sequence[str], None] = "1c7f4a8e2b95"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SOFT_DELETE_TABLES = (
+    "categories",
+    "customers",
+    "menu_items",
+    "option_groups",
+    "options",
+    "restaurant_tables",
+    "restaurants",
+)
+# Keys to soft-deletable rows on the large tables, probed when purging
+INDEXES = (
+    ("ix_orders_restaurant_id", "orders", "restaurant_id"),
+    ("ix_orders_table_id", "orders", "table_id"),
+    ("ix_order_items_menu_item_id", "order_items", "menu_item_id"),
+    ("ix_daily_item_sales_menu_item_id", "daily_item_sales", "menu_item_id"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in SOFT_DELETE_TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                "deleted_at", sa.TIMESTAMP(timezone=True), nullable=True
+            ),
+        )
+        # Retention of rows deleted before now starts from the upgrade
+        op.execute(f"UPDATE {table} SET deleted_at = now() WHERE is_deleted")
+    for name, table, column in INDEXES:
+        op.create_index(name, table, [column], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
+    for table in SOFT_DELETE_TABLES:
+        op.drop_column(table, "deleted_at")
@@ -0,0 +1,112 @@
+"""reservations
+
+Revision ID: 3f7a2c9e5b18
+Revises: 8c1f5e2a9d46
+Create Date: 2026-10-21 11:02:47.318520
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "3f7a2c9e5b18"
+down_revision: Union[str, Sequence[str], None] = "8c1f5e2a9d46"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # GiST support for "=" on plain columns, for the exclusion constraint
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column(
+        "restaurant_tables",
+        sa.Column("seats", sa.Integer(), server_default="4", nullable=False),
+    )
+    op.add_column(
+        "restaurants",
+        sa.Column(
+            "reservations_version",
+            sa.Integer(),
+            server_default="1",
+            nullable=False,
+        ),
+    )
+    op.create_table(
+        "reservations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("restaurant_id", sa.Integer(), nullable=False),
+        sa.Column("table_id", sa.Integer(), nullable=False),
+        sa.Column("customer_id", sa.Integer(), nullable=True),
+        sa.Column("guest_name", sa.String(length=100), nullable=False),
+        sa.Column("phone", sa.String(length=20), nullable=True),
+        sa.Column("party_size", sa.Integer(), nullable=False),
+        sa.Column("starts_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("ends_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column(
+            "period",
+            postgresql.TSTZRANGE(),
+            sa.Computed("tstzrange(starts_at, ends_at, '[)')", persisted=True),
+            nullable=False,
+        ),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "BOOKED",
+                "SEATED",
+                "COMPLETED",
+                "CANCELLED",
+                "NO_SHOW",
+                name="reservationstatus",
+            ),
+            server_default="BOOKED",
+            nullable=False,
+        ),
+        sa.Column("notes", sa.String(length=500), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.CheckConstraint(
+            "ends_at > starts_at", name="ck_reservations_period"
+        ),
+        postgresql.ExcludeConstraint(
+            (sa.column("table_id"), "="),
+            (sa.column("period"), "&&"),
+            name="ex_reservations_table_period",
+            using="gist",
+            where=sa.text("status IN ('BOOKED', 'SEATED')"),
+        ),
+        sa.ForeignKeyConstraint(["customer_id"], ["customers.id"]),
+        sa.ForeignKeyConstraint(
+            ["restaurant_id"], ["restaurants.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["table_id"], ["restaurant_tables.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_reservations_restaurant_period",
+        "reservations",
+        ["restaurant_id", "period"],
+        unique=False,
+        postgresql_using="gist",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_reservations_restaurant_period",
+        table_name="reservations",
+        postgresql_using="gist",
+    )
+    op.drop_table("reservations")
+    sa.Enum(name="reservationstatus").drop(op.get_bind(), checkfirst=False)
+    op.drop_column("restaurants", "reservations_version")
+    op.drop_column("restaurant_tables", "seats")
@@ -0,0 +1,56 @@
+"""audit log
+
+Revision ID: 5a3e9c1d7f20
+Revises: 2e9d5b7c4a18
+Create Date: 2026-10-20 10:14:52.208133
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "5a3e9c1d7f20"
+down_revision: Union[str, Sequence[str], None] = "2e9d5b7c4a18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "audit_log",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("occurred_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("actor_id", sa.Integer(), nullable=True),
+        sa.Column("restaurant_id", sa.Integer(), nullable=True),
+        sa.Column("entity", sa.String(length=50), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=True),
+        sa.Column("action", sa.String(length=10), nullable=False),
+        sa.Column(
+            "changes", postgresql.JSONB(astext_type=sa.Text()), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_audit_log_restaurant",
+        "audit_log",
+        ["restaurant_id", "occurred_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_audit_log_entity",
+        "audit_log",
+        ["restaurant_id", "entity", "entity_id", "occurred_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_audit_log_entity", table_name="audit_log")
+    op.drop_index("ix_audit_log_restaurant", table_name="audit_log")
+    op.drop_table("audit_log")
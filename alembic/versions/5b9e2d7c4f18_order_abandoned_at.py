@@ -0,0 +1,31 @@
+"""order abandoned at
+
+Revision ID: 5b9e2d7c4f18
+Revises: c81f4d2a6e09
+Create Date: 2026-10-22 14:02:37.518204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b9e2d7c4f18"
+down_revision: Union[str, Sequence[str], None] = "c81f4d2a6e09"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "orders",
+        sa.Column("abandoned_at", sa.TIMESTAMP(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("orders", "abandoned_at")
@@ -0,0 +1,43 @@
+"""rollup fk cascade
+
+Revision ID: 6d2b8e4f1a73
+Revises: 3f7a2c9e5b18
+Create Date: 2026-10-22 09:14:31.506284
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6d2b8e4f1a73"
+down_revision: Union[str, Sequence[str], None] = "3f7a2c9e5b18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, referred table)
+ROLLUP_FKS = (
+    ("daily_sales", "restaurant_id", "restaurants"),
+    ("daily_item_sales", "restaurant_id", "restaurants"),
+    ("daily_item_sales", "menu_item_id", "menu_items"),
+)
+
+
+def _recreate(ondelete: str | None) -> None:
+    for table, column, referred in ROLLUP_FKS:
+        name = f"{table}_{column}_fkey"
+        op.drop_constraint(name, table, type_="foreignkey")
+        op.create_foreign_key(
+            name, table, referred, [column], ["id"], ondelete=ondelete
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _recreate("CASCADE")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _recreate(None)
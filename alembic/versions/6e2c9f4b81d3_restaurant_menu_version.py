@@ -0,0 +1,36 @@
+"""restaurant menu version
+
+Revision ID: 6e2c9f4b81d3
+Revises: 3f6a8d21c5e7
+Create Date: 2026-10-19 14:22:07.530911
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6e2c9f4b81d3"
+down_revision: Union[str, Sequence[str], None] = "3f6a8d21c5e7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "restaurants",
+        sa.Column(
+            "menu_version",
+            sa.Integer(),
+            server_default="1",
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("restaurants", "menu_version")
@@ -0,0 +1,69 @@
+"""sales rollups
+
+Revision ID: 9c1e4b7a2f30
+Revises: 4b58f06f1f9f
+Create Date: 2026-10-19 09:12:41.218503
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c1e4b7a2f30"
+down_revision: Union[str, Sequence[str], None] = "4b58f06f1f9f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "orders",
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_table(
+        "daily_sales",
+        sa.Column("restaurant_id", sa.Integer(), nullable=False),
+        sa.Column("sales_date", sa.Date(), nullable=False),
+        sa.Column("order_count", sa.Integer(), nullable=False),
+        sa.Column("item_count", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["restaurant_id"],
+            ["restaurants.id"],
+        ),
+        sa.PrimaryKeyConstraint("restaurant_id", "sales_date"),
+    )
+    op.create_table(
+        "daily_item_sales",
+        sa.Column("restaurant_id", sa.Integer(), nullable=False),
+        sa.Column("sales_date", sa.Date(), nullable=False),
+        sa.Column("menu_item_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["menu_item_id"],
+            ["menu_items.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["restaurant_id"],
+            ["restaurants.id"],
+        ),
+        sa.PrimaryKeyConstraint(
+            "restaurant_id", "sales_date", "menu_item_id"
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("daily_item_sales")
+    op.drop_table("daily_sales")
+    op.drop_column("orders", "created_at")
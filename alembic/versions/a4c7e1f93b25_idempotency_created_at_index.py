@@ -0,0 +1,34 @@
+"""idempotency created_at index
+
+Revision ID: a4c7e1f93b25
+Revises: 6d2b8e4f1a73
+Create Date: 2026-10-22 10:03:18.772406
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c7e1f93b25"
+down_revision: Union[str, Sequence[str], None] = "6d2b8e4f1a73"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_idempotency_keys_created_at",
+        "idempotency_keys",
+        ["created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_idempotency_keys_created_at", table_name="idempotency_keys"
+    )
@@ -0,0 +1,75 @@
+"""order item snapshots
+
+Revision ID: a4d7c2e9b150
+Revises: 6e2c9f4b81d3
+Create Date: 2026-10-19 15:03:41.208317
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d7c2e9b150"
+down_revision: Union[str, Sequence[str], None] = "6e2c9f4b81d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("order_items", sa.Column("name", sa.String(), nullable=True))
+    op.add_column(
+        "order_items", sa.Column("unit_price", sa.Float(), nullable=True)
+    )
+    # Existing lines were always billed at the current menu price
+    op.execute(
+        """
+        UPDATE order_items AS oi
+        SET name = mi.name, unit_price = mi.price
+        FROM menu_items AS mi
+        WHERE mi.id = oi.menu_item_id
+        """
+    )
+    # Fold repeated lines into the oldest one before adding the constraint
+    op.execute(
+        """
+        WITH merged AS (
+            SELECT order_id, menu_item_id, min(id) AS keep_id,
+                   sum(quantity) AS quantity
+            FROM order_items
+            GROUP BY order_id, menu_item_id
+            HAVING count(*) > 1
+        ), kept AS (
+            UPDATE order_items AS oi
+            SET quantity = merged.quantity
+            FROM merged
+            WHERE oi.id = merged.keep_id
+        )
+        DELETE FROM order_items AS oi
+        USING merged
+        WHERE oi.order_id = merged.order_id
+          AND oi.menu_item_id = merged.menu_item_id
+          AND oi.id <> merged.keep_id
+        """
+    )
+    op.alter_column("order_items", "name", nullable=False)
+    op.alter_column("order_items", "unit_price", nullable=False)
+    op.create_unique_constraint(
+        op.f("order_items_order_id_menu_item_id_key"),
+        "order_items",
+        ["order_id", "menu_item_id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        op.f("order_items_order_id_menu_item_id_key"),
+        "order_items",
+        type_="unique",
+    )
+    op.drop_column("order_items", "unit_price")
+    op.drop_column("order_items", "name")
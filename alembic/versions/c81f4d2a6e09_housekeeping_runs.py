@@ -0,0 +1,33 @@
+"""housekeeping runs
+
+Revision ID: c81f4d2a6e09
+Revises: a4c7e1f93b25
+Create Date: 2026-10-22 11:26:54.190337
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c81f4d2a6e09"
+down_revision: Union[str, Sequence[str], None] = "a4c7e1f93b25"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "housekeeping_runs",
+        sa.Column("task", sa.String(length=100), nullable=False),
+        sa.Column("last_run_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("task"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("housekeeping_runs")
@@ -0,0 +1,161 @@
+"""option groups
+
+Revision ID: c81f5a3d7e24
+Revises: a4d7c2e9b150
+Create Date: 2026-10-19 16:11:26.774902
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c81f5a3d7e24"
+down_revision: Union[str, Sequence[str], None] = "a4d7c2e9b150"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "option_groups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("restaurant_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("min_select", sa.Integer(), nullable=False),
+        sa.Column("max_select", sa.Integer(), nullable=False),
+        sa.Column("required", sa.Boolean(), nullable=False),
+        sa.Column("is_deleted", sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["restaurant_id"],
+            ["restaurants.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("restaurant_id", "name"),
+    )
+    op.create_index(
+        op.f("ix_option_groups_id"), "option_groups", ["id"], unique=False
+    )
+    op.create_table(
+        "options",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("option_group_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("price_delta", sa.Float(), nullable=False),
+        sa.Column("is_available", sa.Boolean(), nullable=True),
+        sa.Column("is_deleted", sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["option_group_id"],
+            ["option_groups.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_options_id"), "options", ["id"], unique=False)
+    op.create_table(
+        "item_option_groups",
+        sa.Column("menu_item_id", sa.Integer(), nullable=False),
+        sa.Column("option_group_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["menu_item_id"], ["menu_items.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(
+            ["option_group_id"], ["option_groups.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("menu_item_id", "option_group_id"),
+    )
+    op.create_table(
+        "order_item_options",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("order_item_id", sa.Integer(), nullable=False),
+        sa.Column("option_id", sa.Integer(), nullable=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("price_delta", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["option_id"], ["options.id"], ondelete="SET NULL"
+        ),
+        sa.ForeignKeyConstraint(
+            ["order_item_id"], ["order_items.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_order_item_options_id"),
+        "order_item_options",
+        ["id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_order_item_options_order_item_id"),
+        "order_item_options",
+        ["order_item_id"],
+        unique=False,
+    )
+    op.add_column(
+        "order_items",
+        sa.Column(
+            "options_key", sa.String(), server_default="", nullable=False
+        ),
+    )
+    op.drop_constraint(
+        op.f("order_items_order_id_menu_item_id_key"),
+        "order_items",
+        type_="unique",
+    )
+    op.create_unique_constraint(
+        op.f("order_items_order_id_menu_item_id_options_key_key"),
+        "order_items",
+        ["order_id", "menu_item_id", "options_key"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        op.f("order_items_order_id_menu_item_id_options_key_key"),
+        "order_items",
+        type_="unique",
+    )
+    # Lines that differed only by options fold into the oldest one
+    op.execute(
+        """
+        WITH merged AS (
+            SELECT order_id, menu_item_id, min(id) AS keep_id,
+                   sum(quantity) AS quantity
+            FROM order_items
+            GROUP BY order_id, menu_item_id
+            HAVING count(*) > 1
+        ), kept AS (
+            UPDATE order_items AS oi
+            SET quantity = merged.quantity
+            FROM merged
+            WHERE oi.id = merged.keep_id
+        )
+        DELETE FROM order_items AS oi
+        USING merged
+        WHERE oi.order_id = merged.order_id
+          AND oi.menu_item_id = merged.menu_item_id
+          AND oi.id <> merged.keep_id
+        """
+    )
+    op.create_unique_constraint(
+        op.f("order_items_order_id_menu_item_id_key"),
+        "order_items",
+        ["order_id", "menu_item_id"],
+    )
+    op.drop_column("order_items", "options_key")
+    op.drop_index(
+        op.f("ix_order_item_options_order_item_id"),
+        table_name="order_item_options",
+    )
+    op.drop_index(
+        op.f("ix_order_item_options_id"), table_name="order_item_options"
+    )
+    op.drop_table("order_item_options")
+    op.drop_table("item_option_groups")
+    op.drop_index(op.f("ix_options_id"), table_name="options")
+    op.drop_table("options")
+    op.drop_index(op.f("ix_option_groups_id"), table_name="option_groups")
+    op.drop_table("option_groups")
@@ -0,0 +1,101 @@
+"""customers
+
+Revision ID: d5b3e8a1f962
+Revises: c81f5a3d7e24
+Create Date: 2026-10-19 17:02:44.319580
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d5b3e8a1f962"
+down_revision: Union[str, Sequence[str], None] = "c81f5a3d7e24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Trigram operators, and btree_gin so restaurant_id can lead the index
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    op.create_table(
+        "customers",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("restaurant_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("phone", sa.String(), nullable=True),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("notes", sa.String(), nullable=True),
+        sa.Column("loyalty_points", sa.Integer(), nullable=False),
+        sa.Column("is_deleted", sa.Boolean(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["restaurant_id"],
+            ["restaurants.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_customers_id"), "customers", ["id"], unique=False)
+    op.create_index(
+        "uq_customers_restaurant_phone",
+        "customers",
+        ["restaurant_id", "phone"],
+        unique=True,
+        postgresql_where=sa.text("NOT is_deleted"),
+    )
+    op.create_index(
+        "uq_customers_restaurant_email",
+        "customers",
+        ["restaurant_id", sa.text("lower(email)")],
+        unique=True,
+        postgresql_where=sa.text("NOT is_deleted"),
+    )
+    op.create_index(
+        "ix_customers_name_prefix",
+        "customers",
+        ["restaurant_id", sa.text("lower(name) text_pattern_ops")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_customers_name_trgm",
+        "customers",
+        ["restaurant_id", "name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_customers_phone_trgm",
+        "customers",
+        ["restaurant_id", "phone"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"phone": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_customers_phone_trgm", table_name="customers")
+    op.drop_index("ix_customers_name_trgm", table_name="customers")
+    op.drop_index("ix_customers_name_prefix", table_name="customers")
+    op.drop_index("uq_customers_restaurant_email", table_name="customers")
+    op.drop_index("uq_customers_restaurant_phone", table_name="customers")
+    op.drop_index(op.f("ix_customers_id"), table_name="customers")
+    op.drop_table("customers")
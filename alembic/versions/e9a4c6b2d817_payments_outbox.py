@@ -0,0 +1,126 @@
+"""payments and outbox
+
+Revision ID: e9a4c6b2d817
+Revises: d5b3e8a1f962
+Create Date: 2026-10-19 18:40:12.507731
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "e9a4c6b2d817"
+down_revision: Union[str, Sequence[str], None] = "d5b3e8a1f962"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "payments",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("order_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "method",
+            sa.Enum("CASH", "CARD", "UPI", "OTHER", name="payment_method"),
+            nullable=False,
+        ),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "PENDING",
+                "CAPTURED",
+                "REFUNDED",
+                "FAILED",
+                name="payment_status",
+            ),
+            server_default="PENDING",
+            nullable=False,
+        ),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column(
+            "refunded_amount",
+            sa.Float(),
+            server_default="0",
+            nullable=False,
+        ),
+        sa.Column("idempotency_key", sa.String(length=255), nullable=False),
+        sa.Column("txn_ref", sa.String(), nullable=True),
+        sa.Column("paid_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("refunded_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.CheckConstraint("amount >= 0", name="ck_payments_amount"),
+        sa.CheckConstraint(
+            "refunded_amount >= 0 AND refunded_amount <= amount",
+            name="ck_payments_refunded_amount",
+        ),
+        sa.ForeignKeyConstraint(
+            ["order_id"], ["orders.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("order_id", "idempotency_key"),
+    )
+    op.create_index(op.f("ix_payments_id"), "payments", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_payments_order_id"), "payments", ["order_id"], unique=False
+    )
+    op.create_table(
+        "outbox_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("topic", sa.String(length=100), nullable=False),
+        sa.Column(
+            "payload",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+        ),
+        sa.Column(
+            "attempts", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column(
+            "available_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("processed_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_outbox_events_pending",
+        "outbox_events",
+        ["available_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("processed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_outbox_events_pending",
+        table_name="outbox_events",
+        postgresql_where=sa.text("processed_at IS NULL"),
+    )
+    op.drop_table("outbox_events")
+    op.drop_index(op.f("ix_payments_order_id"), table_name="payments")
+    op.drop_index(op.f("ix_payments_id"), table_name="payments")
+    op.drop_table("payments")
+    sa.Enum(name="payment_status").drop(op.get_bind(), checkfirst=False)
+    sa.Enum(name="payment_method").drop(op.get_bind(), checkfirst=False)
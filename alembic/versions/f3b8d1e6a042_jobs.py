@@ -0,0 +1,85 @@
+"""jobs
+
+Revision ID: f3b8d1e6a042
+Revises: e9a4c6b2d817
+Create Date: 2026-10-19 20:15:38.902114
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f3b8d1e6a042"
+down_revision: Union[str, Sequence[str], None] = "e9a4c6b2d817"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The payments outbox becomes the durable queues of the job runner
+    op.drop_index(
+        "ix_outbox_events_pending",
+        table_name="outbox_events",
+        postgresql_where=sa.text("processed_at IS NULL"),
+    )
+    op.rename_table("outbox_events", "jobs")
+    op.execute("ALTER SEQUENCE outbox_events_id_seq RENAME TO jobs_id_seq")
+    op.execute(
+        "ALTER TABLE jobs RENAME CONSTRAINT outbox_events_pkey TO jobs_pkey"
+    )
+    op.alter_column("jobs", "topic", new_column_name="name")
+    op.alter_column("jobs", "processed_at", new_column_name="finished_at")
+    op.add_column(
+        "jobs",
+        sa.Column(
+            "queue",
+            sa.String(length=50),
+            server_default="default",
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "jobs",
+        sa.Column("failed_at", sa.TIMESTAMP(timezone=True), nullable=True),
+    )
+    op.execute(
+        "UPDATE jobs SET queue = 'payments' WHERE name LIKE 'payment.%'"
+    )
+    op.create_index(
+        "ix_jobs_pending",
+        "jobs",
+        ["queue", "available_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("finished_at IS NULL AND failed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_jobs_pending",
+        table_name="jobs",
+        postgresql_where=sa.text("finished_at IS NULL AND failed_at IS NULL"),
+    )
+    # Jobs other than the payment events had no outbox equivalent
+    op.execute("DELETE FROM jobs WHERE queue <> 'payments'")
+    op.drop_column("jobs", "failed_at")
+    op.drop_column("jobs", "queue")
+    op.alter_column("jobs", "finished_at", new_column_name="processed_at")
+    op.alter_column("jobs", "name", new_column_name="topic")
+    op.execute(
+        "ALTER TABLE jobs RENAME CONSTRAINT jobs_pkey TO outbox_events_pkey"
+    )
+    op.execute("ALTER SEQUENCE jobs_id_seq RENAME TO outbox_events_id_seq")
+    op.rename_table("jobs", "outbox_events")
+    op.create_index(
+        "ix_outbox_events_pending",
+        "outbox_events",
+        ["available_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("processed_at IS NULL"),
+    )
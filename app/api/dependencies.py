@@ -1,25 +1,61 @@
+from dataclasses import dataclass
+
+from app.core.ownership import owned_restaurants
 from app.core.security import decode_token
+from app.db.audit import set_actor
 from app.db.session import SessionLocal
+from app.models.category import Category
+from app.models.customer import Customer
+from app.models.option import Option, OptionGroup
+from app.models.order import Order
+from app.models.payment import Payment
+from app.models.reservation import Reservation
+from app.models.restaurant import Restaurant
+from app.models.table import RestaurantTable
 from app.models.user import User
-from fastapi import Depends, HTTPException, status
+from app.models.webhook import WebhookSubscription
+from app.schemas.payment import PaymentCreate
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 oauth2_scheme = HTTPBearer(auto_error=False)
+# Marks sessions that get_db opened (and may close early)
+REQUEST_SESSION = "request_session"
 
 
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request):
+    # Sub-requests of POST /batch run on the batch's session
+    shared = getattr(request.state, "db", None)
+    if shared is not None:
+        yield shared
+        return
+    # Checks out a connection only on its first query; SessionRoute
+    # gives it back as soon as the handler returns
+    db = SessionLocal(info={REQUEST_SESSION: True})
     try:
         yield db
     finally:
         db.close()
 
 
-def get_current_user(
-    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
+def release_db(db: Session) -> None:
+    """Give a request's pooled connection back before its response is built.
+
+    Only sessions opened by ``get_db`` that are still inside a
+    transaction are closed; a shared batch session is left alone. Closing
+    detaches the session's objects, which keep every attribute already
+    loaded, so a handler has to return loaded data (eager-load any
+    relationship its response model reads). After a commit the
+    connection is already back in the pool, and objects expired by it
+    still refresh on a fresh checkout when serialized.
+    """
+    if db.info.get(REQUEST_SESSION) and db.in_transaction():
+        db.close()
+
+
+def _token_user_id(token: HTTPAuthorizationCredentials | None) -> int:
     if token is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -30,10 +66,303 @@ def get_current_user(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
+    return int(payload["sub"])
+
+
+def _batch_user(request: Request) -> User | None:
+    # Set once per POST /batch instead of per sub-request
+    return getattr(request.state, "user", None)
+
+
+def get_current_user(
+    request: Request,
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> User:
+    user = _batch_user(request)
+    if user is None:
+        user_id = _token_user_id(token)
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+    set_actor(db, user.id)
+    return user
+
+
+@dataclass
+class RestaurantScope:
+    user_id: int
+    restaurant_id: int
+
 
-    user = db.query(User).filter(User.id == int(payload["sub"])).first()
-    if not user:
+_owned_ids = (
+    select(func.array_agg(Restaurant.id))
+    .where(Restaurant.user_id == User.id)
+    .correlate(User)
+    .scalar_subquery()
+)
+
+
+def owned_restaurant_ids(user_id: int):
+    """Ids of the live restaurants ``user_id`` owns, as a subquery.
+
+    For folding ownership into the WHERE clause of an UPDATE, which the
+    soft-delete filter does not reach.
+    """
+    return select(Restaurant.id).where(
+        Restaurant.user_id == user_id, Restaurant.is_deleted.is_(False)
+    )
+
+
+# Methods that write; their ownership check never trusts the cache
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def _load_user(db: Session, user_id: int, *columns, refresh: bool = False):
+    """Fetch ``columns`` for the user in one query.
+
+    On an ownership cache miss, or with ``refresh``, the user's
+    restaurant ids are aggregated into the same query. When the cache
+    answers and nothing else is needed no query runs, so no connection
+    is checked out. Returns ``(owned_ids, fresh, values)``.
+    """
+    owned = None if refresh else owned_restaurants.get(user_id)
+    fresh = owned is None
+    query_columns = (_owned_ids, *columns) if fresh else columns
+    if not query_columns:
+        return owned, fresh, []
+    row = db.execute(select(*query_columns).where(User.id == user_id)).first()
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
         )
-    return user
+    values = list(row)
+    if fresh:
+        owned = owned_restaurants.set(user_id, values.pop(0) or ())
+    return owned, fresh, values
+
+
+def _owns(db, user_id, restaurant_id, owned, fresh) -> bool:
+    if restaurant_id in owned:
+        return True
+    if fresh:
+        return False
+    # May have been created by another worker since we cached
+    ids = db.scalars(
+        select(Restaurant.id).where(Restaurant.user_id == user_id)
+    ).all()
+    return restaurant_id in owned_restaurants.set(user_id, ids)
+
+
+def _writes(request: Request) -> bool:
+    # The cache is per process: another worker may have just deleted the
+    # restaurant, and a write must not land on it in the meantime
+    return request.method not in _SAFE_METHODS
+
+
+def _scope_user_id(request, token) -> int:
+    user = _batch_user(request)
+    if user is not None:
+        return user.id
+    return _token_user_id(token)
+
+
+def restaurant_scope(
+    restaurant_id: int,
+    request: Request,
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> RestaurantScope:
+    """Current user plus a live restaurant they own, else 404."""
+    user_id = _scope_user_id(request, token)
+    owned, fresh, _ = _load_user(db, user_id, refresh=_writes(request))
+    if not _owns(db, user_id, restaurant_id, owned, fresh):
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    set_actor(db, user_id, restaurant_id)
+    return RestaurantScope(user_id=user_id, restaurant_id=restaurant_id)
+
+
+def _owned_parent_scope(request, token, db, restaurant_id, detail):
+    # restaurant_id: scalar subquery for the parent row's restaurant
+    user_id = _scope_user_id(request, token)
+    owned, fresh, (restaurant_id,) = _load_user(
+        db, user_id, restaurant_id, refresh=_writes(request)
+    )
+    if restaurant_id is None or not _owns(
+        db, user_id, restaurant_id, owned, fresh
+    ):
+        raise HTTPException(status_code=404, detail=detail)
+    set_actor(db, user_id, restaurant_id)
+    return RestaurantScope(user_id=user_id, restaurant_id=restaurant_id)
+
+
+def category_scope(
+    category_id: int,
+    request: Request,
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> RestaurantScope:
+    """Current user plus the owned restaurant of a live category."""
+    category_restaurant = (
+        select(Category.restaurant_id)
+        .where(Category.id == category_id)
+        .scalar_subquery()
+    )
+    return _owned_parent_scope(
+        request, token, db, category_restaurant, "Category not found"
+    )
+
+
+def option_group_scope(
+    group_id: int,
+    request: Request,
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> RestaurantScope:
+    """Current user plus the owned restaurant of a live option group."""
+    group_restaurant = (
+        select(OptionGroup.restaurant_id)
+        .where(OptionGroup.id == group_id)
+        .scalar_subquery()
+    )
+    return _owned_parent_scope(
+        request, token, db, group_restaurant, "Option group not found"
+    )
+
+
+def option_scope(
+    option_id: int,
+    request: Request,
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> RestaurantScope:
+    """Current user plus the owned restaurant of a live option."""
+    option_restaurant = (
+        select(OptionGroup.restaurant_id)
+        .join(Option, Option.option_group_id == OptionGroup.id)
+        .where(Option.id == option_id)
+        .scalar_subquery()
+    )
+    return _owned_parent_scope(
+        request, token, db, option_restaurant, "Option not found"
+    )
+
+
+def customer_scope(
+    customer_id: int,
+    request: Request,
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> RestaurantScope:
+    """Current user plus the owned restaurant of a live customer."""
+    customer_restaurant = (
+        select(Customer.restaurant_id)
+        .where(Customer.id == customer_id)
+        .scalar_subquery()
+    )
+    return _owned_parent_scope(
+        request, token, db, customer_restaurant, "Customer not found"
+    )
+
+
+def table_scope(
+    table_id: int,
+    request: Request,
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> RestaurantScope:
+    """Current user plus the owned restaurant of a live table."""
+    table_restaurant = (
+        select(RestaurantTable.restaurant_id)
+        .where(RestaurantTable.id == table_id)
+        .scalar_subquery()
+    )
+    return _owned_parent_scope(
+        request, token, db, table_restaurant, "Table not found"
+    )
+
+
+def order_scope(
+    order_id: int,
+    request: Request,
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> RestaurantScope:
+    """Current user plus the owned restaurant of an order."""
+    order_restaurant = (
+        select(Order.restaurant_id)
+        .where(Order.id == order_id)
+        .scalar_subquery()
+    )
+    return _owned_parent_scope(
+        request, token, db, order_restaurant, "Order not found"
+    )
+
+
+def payment_order_scope(
+    payment: PaymentCreate,
+    request: Request,
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> RestaurantScope:
+    """``order_scope`` for the order named in a payment body."""
+    return order_scope(payment.order_id, request, token, db)
+
+
+def payment_scope(
+    payment_id: int,
+    request: Request,
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> RestaurantScope:
+    """Current user plus the owned restaurant of a payment's order."""
+    payment_restaurant = (
+        select(Order.restaurant_id)
+        .join(
+            Payment,
+            (Payment.order_id == Order.id)
+            & (Payment.order_created_at == Order.created_at),
+        )
+        .where(Payment.id == payment_id)
+        .scalar_subquery()
+    )
+    return _owned_parent_scope(
+        request, token, db, payment_restaurant, "Payment not found"
+    )
+
+
+def webhook_scope(
+    webhook_id: int,
+    request: Request,
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> RestaurantScope:
+    """Current user plus the owned restaurant of a webhook subscription."""
+    webhook_restaurant = (
+        select(WebhookSubscription.restaurant_id)
+        .where(WebhookSubscription.id == webhook_id)
+        .scalar_subquery()
+    )
+    return _owned_parent_scope(
+        request, token, db, webhook_restaurant, "Webhook not found"
+    )
+
+
+def reservation_scope(
+    reservation_id: int,
+    request: Request,
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> RestaurantScope:
+    """Current user plus the owned restaurant of a reservation."""
+    reservation_restaurant = (
+        select(Reservation.restaurant_id)
+        .where(Reservation.id == reservation_id)
+        .scalar_subquery()
+    )
+    return _owned_parent_scope(
+        request, token, db, reservation_restaurant, "Reservation not found"
+    )
@@ -0,0 +1,187 @@
+from datetime import date, timedelta
+
+import numpy as np
+from app.api.dependencies import get_current_user, get_db
+from app.api.routing import SessionRoute
+from app.models.menu import MenuItem
+from app.models.restaurant import Restaurant
+from app.models.user import User
+from app.schemas.analytics import (
+    BasketSizeOut,
+    HeatmapOut,
+    ItemMixOut,
+    RestaurantRevenueOut,
+)
+from app.services import analytics
+from app.services.reports import day_start, local_date
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+router = APIRouter(
+    prefix="/analytics", tags=["analytics"], route_class=SessionRoute
+)
+
+
+def _owned_restaurants(
+    db: Session, current_user: User, restaurant_id: int | None
+) -> dict[int, tuple[str, str | None]]:
+    """Name and time zone of each of the user's restaurants."""
+    query = db.query(
+        Restaurant.id, Restaurant.name, Restaurant.time_zone
+    ).filter(Restaurant.user_id == current_user.id)
+    if restaurant_id is not None:
+        query = query.filter(Restaurant.id == restaurant_id)
+    restaurants = {rid: (name, zone) for rid, name, zone in query.all()}
+    if not restaurants:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    return restaurants
+
+
+def _days(
+    time_zone: str | None, start: date | None, end: date | None
+) -> tuple[date, date]:
+    # Local calendar days, end inclusive; the last 30 by default
+    end = end or local_date(time_zone)
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be <= end")
+    return start, end
+
+
+def _lines(
+    db, restaurants, start, end, previous: bool = False
+) -> analytics.OrderLines:
+    """Lines of the orders placed on the restaurants' local days.
+
+    Restaurants are queried per time zone, each over its own days.
+    ``previous`` takes the period of equal length just before instead.
+    """
+    by_zone = {}
+    for rid, (_, zone) in restaurants.items():
+        by_zone.setdefault(zone, []).append(rid)
+    parts = []
+    for zone, ids in by_zone.items():
+        first, last = _days(zone, start, end)
+        if previous:
+            length = last - first + timedelta(days=1)
+            first, last = first - length, last - length
+        parts.append(
+            analytics.load_order_lines(
+                db,
+                ids,
+                day_start(zone, first),
+                day_start(zone, last + timedelta(days=1)),
+            )
+        )
+    return analytics.concat(parts)
+
+
+# Revenue per restaurant against the preceding period of equal length
+@router.get("/revenue", response_model=list[RestaurantRevenueOut])
+def revenue(
+    start: date | None = None,
+    end: date | None = None,
+    restaurant_id: int | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    restaurants = _owned_restaurants(db, current_user, restaurant_id)
+    ids = list(restaurants)
+
+    current = analytics.revenue_by_restaurant(
+        _lines(db, restaurants, start, end), ids
+    )
+    previous = analytics.revenue_by_restaurant(
+        _lines(db, restaurants, start, end, previous=True), ids
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (current - previous) / previous * 100
+
+    return [
+        RestaurantRevenueOut(
+            restaurant_id=rid,
+            name=restaurants[rid][0],
+            revenue=current[i],
+            previous_revenue=previous[i],
+            change_pct=change[i] if previous[i] else None,
+        )
+        for i, rid in enumerate(ids)
+    ]
+
+
+# Quantity and revenue share per menu item
+@router.get("/item-mix", response_model=list[ItemMixOut])
+def item_mix(
+    start: date | None = None,
+    end: date | None = None,
+    restaurant_id: int | None = None,
+    limit: int = Query(50, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    restaurants = _owned_restaurants(db, current_user, restaurant_id)
+    lines = _lines(db, restaurants, start, end)
+    items, quantity, revenue = analytics.item_mix(lines)
+    items, quantity, revenue = items[:limit], quantity[:limit], revenue[:limit]
+    total_quantity = lines.quantity.sum() or 1
+
+    names = dict(
+        db.query(MenuItem.id, MenuItem.name)
+        .filter(MenuItem.id.in_(items.tolist()))
+        .all()
+    )
+    return [
+        ItemMixOut(
+            menu_item_id=item_id,
+            name=names.get(item_id, ""),
+            quantity=qty,
+            revenue=rev,
+            share=qty / total_quantity,
+        )
+        for item_id, qty, rev in zip(
+            items.tolist(), quantity.tolist(), revenue.tolist()
+        )
+    ]
+
+
+# Distribution of items and revenue per order
+@router.get("/basket-size", response_model=BasketSizeOut)
+def basket_size(
+    start: date | None = None,
+    end: date | None = None,
+    restaurant_id: int | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    restaurants = _owned_restaurants(db, current_user, restaurant_id)
+    lines = _lines(db, restaurants, start, end)
+    if not len(lines):
+        return BasketSizeOut(
+            orders=0,
+            mean_items=0,
+            median_items=0,
+            p90_items=0,
+            mean_revenue=0,
+        )
+    items, revenue = analytics.basket_sizes(lines)
+    return BasketSizeOut(
+        orders=len(items),
+        mean_items=items.mean(),
+        median_items=np.median(items),
+        p90_items=np.percentile(items, 90),
+        mean_revenue=revenue.mean(),
+    )
+
+
+# Revenue by local weekday and hour
+@router.get("/heatmap", response_model=HeatmapOut)
+def heatmap(
+    start: date | None = None,
+    end: date | None = None,
+    restaurant_id: int | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    restaurants = _owned_restaurants(db, current_user, restaurant_id)
+    lines = _lines(db, restaurants, start, end)
+    return HeatmapOut(revenue=analytics.hourly_heatmap(lines).tolist())
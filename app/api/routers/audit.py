@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from app.api.dependencies import RestaurantScope, get_db, restaurant_scope
+from app.api.routing import SessionRoute
+from app.crud.audit import search_audit
+from app.schemas.audit import AuditPage
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+router = APIRouter(tags=["audit"], route_class=SessionRoute)
+
+
+# Who changed what, newest first, one keyset page at a time. Entries are
+# written behind the change, so the latest few seconds may be missing.
+@router.get("/restaurants/{restaurant_id}/audit", response_model=AuditPage)
+def list_audit(
+    entity: str | None = None,
+    entity_id: int | None = None,
+    actor_id: int | None = None,
+    since: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    try:
+        items, next_cursor = search_audit(
+            db,
+            scope.restaurant_id,
+            entity=entity,
+            entity_id=entity_id,
+            actor_id=actor_id,
+            since=since,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"items": items, "next_cursor": next_cursor}
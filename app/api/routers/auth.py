@@ -1,21 +1,30 @@
+import uuid
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from app.api.dependencies import get_db
+from app.api.routing import SessionRoute
 
 # import bcrypt
+from app.core.config import get_settings
 from app.core.security import (
     create_access_token,
+    create_refresh_token,
     hash_password,
+    hash_refresh_token,
     verify_password,
 )
+from app.db.writes import insert_row
 
 # from app.core import security
 # from app.db.session import SessionLocal
+from app.models.refresh_token import RefreshToken
 from app.models.user import User
-from app.schemas.user import UserCreate, UserRead
+from app.schemas.user import RefreshRequest, TokenPair, UserCreate, UserRead
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel, EmailStr
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
 
 # def get_db():
@@ -33,7 +42,7 @@ class OwnerCreate(BaseModel):
     phone: Optional[str] = None
 
 
-router = APIRouter(prefix="/auth", tags=["Auth"])
+router = APIRouter(prefix="/auth", tags=["Auth"], route_class=SessionRoute)
 
 
 @router.post("/register/owner", response_model=UserRead)
@@ -43,20 +52,50 @@ def create_users(user_in: UserCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Email already registered")
 
     hashed = hash_password(user_in.password)
-    user = User(
+    user = insert_row(
+        db,
+        User,
         email=user_in.email,
         fullname=user_in.fullname,
         phone=user_in.phone,
         password=hashed,
         role="OWNER",
     )
-    db.add(user)
     db.commit()
-    db.refresh(user)
     return user
 
 
-@router.post("/login")
+def _issue_tokens(db: Session, user: User, family_id: str) -> TokenPair:
+    # Adds the refresh token row; the caller commits
+    refresh_token, token_hash = create_refresh_token()
+    db.add(
+        RefreshToken(
+            user_id=user.id,
+            token_hash=token_hash,
+            family_id=family_id,
+            expires_at=datetime.now(timezone.utc)
+            + timedelta(days=get_settings().REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    token_data = {"sub": str(user.id), "role": user.role}
+    return TokenPair(
+        access_token=create_access_token(token_data),
+        refresh_token=refresh_token,
+    )
+
+
+def _revoke_family(db: Session, family_id: str) -> None:
+    db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.family_id == family_id,
+            RefreshToken.revoked_at.is_(None),
+        )
+        .values(revoked_at=func.now())
+    )
+
+
+@router.post("/login", response_model=TokenPair)
 def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
@@ -71,7 +110,65 @@ def login(
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Inactive user")
 
-    token_data = {"sub": str(user.id), "role": user.role}
-    access_token = create_access_token(token_data)
+    tokens = _issue_tokens(db, user, uuid.uuid4().hex)
+    db.commit()
+    return tokens
+
+
+# Rotate a refresh token: no password check, so no bcrypt on renewals
+@router.post("/refresh", response_model=TokenPair)
+def refresh(body: RefreshRequest, db: Session = Depends(get_db)):
+    token_hash = hash_refresh_token(body.refresh_token)
+    # Revoke atomically so two concurrent renewals can't both succeed
+    used = db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > func.now(),
+        )
+        .values(revoked_at=func.now())
+        .returning(RefreshToken.user_id, RefreshToken.family_id)
+    ).first()
+
+    if used is None:
+        stale = (
+            db.query(RefreshToken)
+            .filter(RefreshToken.token_hash == token_hash)
+            .first()
+        )
+        if stale is not None and stale.revoked_at is not None:
+            # A rotated token came back: assume it was stolen and end the
+            # whole session for both holders.
+            _revoke_family(db, stale.family_id)
+            db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+        )
+
+    user = db.query(User).filter(User.id == used.user_id).first()
+    if not user or not user.is_active:
+        _revoke_family(db, used.family_id)
+        db.commit()
+        raise HTTPException(status_code=403, detail="Inactive user")
+
+    tokens = _issue_tokens(db, user, used.family_id)
+    db.commit()
+    return tokens
 
-    return {"access_token": access_token, "token_type": "bearer"}
+
+# Revoke the session a refresh token belongs to
+@router.post("/logout")
+def logout(body: RefreshRequest, db: Session = Depends(get_db)):
+    token = (
+        db.query(RefreshToken)
+        .filter(
+            RefreshToken.token_hash == hash_refresh_token(body.refresh_token)
+        )
+        .first()
+    )
+    if token is not None:
+        _revoke_family(db, token.family_id)
+        db.commit()
+    return {"message": "Logged out"}
@@ -0,0 +1,307 @@
+import asyncio
+import json
+import logging
+
+from app.api.dependencies import _token_user_id, oauth2_scheme
+from app.core.config import get_settings
+from app.db.audit import discard_pending, publish_pending
+from app.db.session import SessionLocal, get_engine
+from app.models.user import User
+from app.schemas.batch import (
+    BatchRequest,
+    BatchResponse,
+    SubRequest,
+    SubResponse,
+)
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+logger = logging.getLogger(__name__)
+
+# Parent headers not passed on to sub-requests
+_DROPPED_HEADERS = {
+    b"content-length",
+    b"content-type",
+    b"accept-encoding",
+    b"idempotency-key",
+}
+
+
+async def _dispatch(
+    request: Request, sub: SubRequest, index: int, state: dict
+) -> SubResponse:
+    """Run one sub-request through the app's router, in process.
+
+    Middleware is skipped; ``state`` carries the shared session and user
+    that ``get_db`` and the auth dependencies pick up. Only JSON
+    responses are kept: streams, files and exports are stopped at their
+    first message (406), and a sub-request still running after
+    ``BATCH_REQUEST_TIMEOUT_SECONDS`` is answered 504 and left running
+    under ``state["abandoned"]``.
+    """
+    sub_id = sub.id if sub.id is not None else str(index)
+    path, _, query = sub.path.partition("?")
+    if path.rstrip("/") == router.prefix:
+        return SubResponse(
+            id=sub_id, status=400, body={"detail": "Batches cannot nest"}
+        )
+
+    body = b"" if sub.body is None else json.dumps(sub.body).encode()
+    headers = [
+        (name, value)
+        for name, value in request.scope["headers"]
+        if name not in _DROPPED_HEADERS
+    ]
+    headers += [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    scope = {
+        **request.scope,
+        "method": sub.method,
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": headers,
+        "state": state,
+    }
+
+    received = False
+    # Set once the response is rejected or over, so a streaming handler
+    # listening for the client sees it go
+    disconnected = asyncio.Event()
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    status_code = 500
+    rejected = False
+    chunks = []
+
+    async def send(message):
+        nonlocal status_code, rejected
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            content_type = next(
+                (
+                    value.decode()
+                    for name, value in message.get("headers", [])
+                    if name.lower() == b"content-type"
+                ),
+                "",
+            )
+            if content_type and not content_type.startswith(
+                "application/json"
+            ):
+                # Streams, files and exports never end up in the batch's
+                # JSON; stop them before their first chunk
+                rejected = True
+                disconnected.set()
+                raise OSError("batch responses must be JSON")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    task = asyncio.ensure_future(request.app.router(scope, receive, send))
+    done, _ = await asyncio.wait(
+        {task}, timeout=get_settings().BATCH_REQUEST_TIMEOUT_SECONDS
+    )
+    if not done:
+        # A sync handler can't be stopped mid-thread; it keeps running
+        # on the session, which the caller must hand to _abandon
+        disconnected.set()
+        state["abandoned"] = task
+        return SubResponse(
+            id=sub_id, status=504, body={"detail": "Sub-request timed out"}
+        )
+
+    try:
+        task.result()
+    except StarletteHTTPException as exc:
+        # Raised by the router itself, e.g. no route matches the path
+        return SubResponse(
+            id=sub_id, status=exc.status_code, body={"detail": exc.detail}
+        )
+    except Exception:
+        if rejected:
+            return SubResponse(
+                id=sub_id,
+                status=406,
+                body={"detail": "Only JSON responses can be batched"},
+            )
+        logger.exception("batch sub-request %s %s failed", sub.method, path)
+        return SubResponse(
+            id=sub_id, status=500, body={"detail": "Internal Server Error"}
+        )
+    finally:
+        disconnected.set()
+
+    raw = b"".join(chunks)
+    payload = json.loads(raw) if raw else None
+    return SubResponse(id=sub_id, status=status_code, body=payload)
+
+
+# Cleanups waiting on abandoned sub-requests, referenced until done
+_abandoned: set[asyncio.Task] = set()
+
+
+def _abandon(task: asyncio.Task, db, conn=None) -> None:
+    """Roll back and close ``db`` (and ``conn``) once ``task`` is done.
+
+    Sessions aren't thread-safe, so nothing touches one while a timed-out
+    handler may still be using it from its worker thread; its writes are
+    rolled back with the rest once it returns.
+    """
+
+    async def settle():
+        await asyncio.wait({task})
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(
+                "abandoned batch sub-request failed: %r", task.exception()
+            )
+        if conn is not None:
+            await run_in_threadpool(conn.rollback)
+            discard_pending(db)
+        await run_in_threadpool(db.close)
+        if conn is not None:
+            await run_in_threadpool(conn.close)
+
+    cleanup = asyncio.create_task(settle())
+    _abandoned.add(cleanup)
+    cleanup.add_done_callback(_abandoned.discard)
+
+
+def _groups(requests: list[SubRequest], atomic: bool):
+    """Split into runs of consecutive GETs and single writes.
+
+    In an atomic batch reads must see the batch's uncommitted writes, so
+    every sub-request runs on its own, in order.
+    """
+    group = []
+    for index, sub in enumerate(requests):
+        if sub.method == "GET" and not atomic:
+            group.append((index, sub))
+            continue
+        if group:
+            yield group
+            group = []
+        yield [(index, sub)]
+    if group:
+        yield group
+
+
+def _load_batch_user(db, user_id: int) -> User:
+    user = db.get(User, user_id)
+    if user is None:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
+
+
+async def _run_read(request, sub, index, user, limit) -> SubResponse:
+    # Concurrent reads cannot share a session; each gets its own
+    async with limit:
+        db = SessionLocal()
+        state = {"db": db, "user": db.merge(user, load=False)}
+        try:
+            return await _dispatch(request, sub, index, state)
+        finally:
+            if "abandoned" in state:
+                _abandon(state["abandoned"], db)
+            else:
+                await run_in_threadpool(db.close)
+
+
+# Run several sub-requests in one round trip
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+):
+    settings = get_settings()
+    if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.BATCH_MAX_REQUESTS} sub-requests",
+        )
+    user_id = _token_user_id(token)
+
+    conn = None
+    if batch.atomic:
+        # Handlers' own commits only release a savepoint; the outer
+        # transaction is committed or rolled back once, at the end.
+        conn = await run_in_threadpool(get_engine().connect)
+        conn.begin()
+        db = SessionLocal(bind=conn, join_transaction_mode="create_savepoint")
+    else:
+        db = SessionLocal()
+
+    responses: list[SubResponse | None] = [None] * len(batch.requests)
+    failed = False
+    state = {}
+    try:
+        user = await run_in_threadpool(_load_batch_user, db, user_id)
+        state.update(db=db, user=user)
+        limit = asyncio.Semaphore(
+            max(1, min(settings.BATCH_READ_CONCURRENCY, settings.DB_POOL_SIZE))
+        )
+        for group in _groups(batch.requests, batch.atomic):
+            if failed:
+                for index, sub in group:
+                    responses[index] = SubResponse(
+                        id=sub.id if sub.id is not None else str(index),
+                        status=424,
+                        body={"detail": "Not run: an earlier request failed"},
+                    )
+                continue
+            if len(group) > 1:
+                results = await asyncio.gather(
+                    *(
+                        _run_read(request, sub, index, user, limit)
+                        for index, sub in group
+                    )
+                )
+                for (index, _), result in zip(group, results):
+                    responses[index] = result
+                continue
+
+            index, sub = group[0]
+            result = await _dispatch(request, sub, index, state)
+            responses[index] = result
+            if "abandoned" in state:
+                # Its handler still holds the session: run nothing more
+                # on it, and commit nothing
+                failed = True
+            elif result.status >= 400:
+                if batch.atomic:
+                    failed = True
+                else:
+                    # Drop whatever the failed handler left pending
+                    await run_in_threadpool(db.rollback)
+
+        if conn is not None and "abandoned" not in state:
+            await run_in_threadpool(conn.rollback if failed else conn.commit)
+            # The session only saw savepoints; its audit entries are
+            # settled here
+            if failed:
+                discard_pending(db)
+            else:
+                publish_pending(db)
+    finally:
+        if "abandoned" in state:
+            _abandon(state["abandoned"], db, conn)
+        else:
+            await run_in_threadpool(db.close)
+            if conn is not None:
+                await run_in_threadpool(conn.close)
+
+    return BatchResponse(
+        responses=responses, rolled_back=failed and batch.atomic
+    )
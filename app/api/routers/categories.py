@@ -1,59 +1,70 @@
-from app.api.dependencies import get_current_user, get_db
+from app.api.dependencies import (
+    RestaurantScope,
+    get_current_user,
+    get_db,
+    owned_restaurant_ids,
+    restaurant_scope,
+)
+from app.api.routing import SessionRoute
+from app.db.writes import insert_row, update_row
 from app.models.category import Category
-from app.models.restaurant import Restaurant
 from app.models.user import User
-from app.schemas.category import CategoryCreate, CategoryOut
+from app.schemas.category import CategoryCreate, CategoryOut, CategoryUpdate
+from app.services.menu_cache import bump_menu_version
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-router = APIRouter(prefix="/categories", tags=["categories"])
+router = APIRouter(
+    prefix="/categories", tags=["categories"], route_class=SessionRoute
+)
 
 
 # Create category
 @router.post("/{restaurant_id}", response_model=CategoryOut)
 def create_category(
-    restaurant_id: int,
     category: CategoryCreate,
+    scope: RestaurantScope = Depends(restaurant_scope),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
-    restaurant = (
-        db.query(Restaurant)
-        .filter(
-            Restaurant.id == restaurant_id,
-            Restaurant.user_id == current_user.id,
-        )
-        .first()
+    new_category = insert_row(
+        db, Category, restaurant_id=scope.restaurant_id, name=category.name
     )
-    if not restaurant:
-        raise HTTPException(status_code=404, detail="Restaurant not found")
-
-    new_category = Category(restaurant_id=restaurant.id, name=category.name)
-    db.add(new_category)
+    bump_menu_version(db, scope.restaurant_id)
     db.commit()
-    db.refresh(new_category)
     return new_category
 
 
 # List categories
 @router.get("/{restaurant_id}", response_model=list[CategoryOut])
 def list_categories(
-    restaurant_id: int,
+    scope: RestaurantScope = Depends(restaurant_scope),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
     return (
         db.query(Category)
-        .join(Restaurant)
-        .filter(
-            Restaurant.id == restaurant_id,
-            Restaurant.user_id == current_user.id,
-            Category.is_deleted.is_(False),
-        )
+        .filter(Category.restaurant_id == scope.restaurant_id)
         .all()
     )
 
 
+def _update_category(db: Session, category_id: int, user: User, values):
+    category = update_row(
+        db,
+        Category,
+        [
+            Category.id == category_id,
+            Category.restaurant_id.in_(owned_restaurant_ids(user.id)),
+        ],
+        values,
+    )
+    if not category:
+        raise HTTPException(status_code=404, detail="Category not found")
+    if values:
+        bump_menu_version(db, category.restaurant_id)
+        db.commit()
+    return category
+
+
 @router.put("/{category_id}", response_model=CategoryOut)
 def update_category(
     category_id: int,
@@ -61,20 +72,22 @@ def update_category(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    existing_category = (
-        db.query(Category)
-        .join(Restaurant)
-        .filter(
-            Category.id == category_id,
-            Restaurant.user_id == current_user.id,
-            Category.is_deleted.is_(False),
-        )
-        .first()
+    return _update_category(
+        db, category_id, current_user, {"name": category.name}
     )
-    if not existing_category:
-        raise HTTPException(status_code=404, detail="Category not found")
 
-    existing_category.name = category.name
-    db.commit()
-    db.refresh(existing_category)
-    return existing_category
+
+# Partial update
+@router.patch("/{category_id}", response_model=CategoryOut)
+def patch_category(
+    category_id: int,
+    category: CategoryUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return _update_category(
+        db,
+        category_id,
+        current_user,
+        category.model_dump(exclude_unset=True, exclude_none=True),
+    )
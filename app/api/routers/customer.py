@@ -0,0 +1,114 @@
+from app.api.dependencies import (
+    RestaurantScope,
+    customer_scope,
+    get_db,
+    restaurant_scope,
+)
+from app.api.routing import SessionRoute
+from app.crud.customer import search_customers
+from app.db.writes import insert_row, update_row
+from app.models.customer import Customer
+from app.schemas.customer import (
+    CustomerCreate,
+    CustomerOut,
+    CustomerPage,
+    CustomerUpdate,
+)
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+router = APIRouter(tags=["customers"], route_class=SessionRoute)
+
+DUPLICATE_DETAIL = "A customer with this phone or email already exists"
+
+
+# Search / list customers, one keyset page at a time
+@router.get(
+    "/restaurants/{restaurant_id}/customers", response_model=CustomerPage
+)
+def list_customers(
+    query: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    try:
+        items, next_cursor = search_customers(
+            db, scope.restaurant_id, query, cursor, limit
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"items": items, "next_cursor": next_cursor}
+
+
+# Create customer
+@router.post(
+    "/restaurants/{restaurant_id}/customers", response_model=CustomerOut
+)
+def create_customer(
+    customer: CustomerCreate,
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    try:
+        new_customer = insert_row(
+            db,
+            Customer,
+            restaurant_id=scope.restaurant_id,
+            **customer.model_dump(),
+        )
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=DUPLICATE_DETAIL)
+    return new_customer
+
+
+# Get customer
+@router.get("/customers/{customer_id}", response_model=CustomerOut)
+def get_customer(
+    customer_id: int,
+    scope: RestaurantScope = Depends(customer_scope),
+    db: Session = Depends(get_db),
+):
+    return db.get(Customer, customer_id)
+
+
+# Partial update
+@router.patch("/customers/{customer_id}", response_model=CustomerOut)
+def update_customer(
+    customer_id: int,
+    data: CustomerUpdate,
+    scope: RestaurantScope = Depends(customer_scope),
+    db: Session = Depends(get_db),
+):
+    try:
+        customer = update_row(
+            db,
+            Customer,
+            [Customer.id == customer_id],
+            data.model_dump(exclude_unset=True),
+        )
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=DUPLICATE_DETAIL)
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return customer
+
+
+# Soft delete customer
+@router.delete("/customers/{customer_id}")
+def soft_delete_customer(
+    customer_id: int,
+    scope: RestaurantScope = Depends(customer_scope),
+    db: Session = Depends(get_db),
+):
+    update_row(
+        db, Customer, [Customer.id == customer_id], {"is_deleted": True}
+    )
+    db.commit()
+    return {"message": f"Customer {customer_id} soft deleted successfully"}
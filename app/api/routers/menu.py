@@ -1,13 +1,64 @@
-from app.api.dependencies import get_current_user, get_db
+import asyncio
+import json
+
+from app.api.dependencies import (
+    RestaurantScope,
+    category_scope,
+    get_current_user,
+    get_db,
+    owned_restaurant_ids,
+    restaurant_scope,
+)
+from app.api.routing import SessionRoute
+from app.core.broadcast import broadcaster, publish
+from app.db.writes import insert_row, update_row
 from app.models.category import Category
 from app.models.menu import MenuItem
 from app.models.restaurant import Restaurant
 from app.models.user import User
-from app.schemas.menu import MenuItemCreate, MenuItemOut
+from app.schemas.menu import (
+    MenuAvailabilityOut,
+    MenuAvailabilityUpdate,
+    MenuItemCreate,
+    MenuItemOut,
+    MenuItemUpdate,
+)
+from app.services.menu_cache import bump_menu_version
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
-router = APIRouter(prefix="/menu", tags=["menu"])
+router = APIRouter(prefix="/menu", tags=["menu"], route_class=SessionRoute)
+
+KEEPALIVE_SECONDS = 15
+
+
+def _category_restaurant(item):
+    # Older items have no restaurant_id of their own
+    return (
+        select(Category.restaurant_id)
+        .where(Category.id == item.category_id)
+        .scalar_subquery()
+    )
+
+
+def _owned_item(item_id: int, user: User) -> list:
+    owned_categories = select(Category.id).where(
+        Category.restaurant_id.in_(owned_restaurant_ids(user.id)),
+        Category.is_deleted.is_(False),
+    )
+    return [MenuItem.id == item_id, MenuItem.category_id.in_(owned_categories)]
+
+
+def _update_menu_item(db: Session, item_id: int, user: User, values):
+    menu_item = update_row(db, MenuItem, _owned_item(item_id, user), values)
+    if not menu_item:
+        raise HTTPException(status_code=404, detail="Menu item not found")
+    if values:
+        bump_menu_version(db, _category_restaurant(menu_item))
+        db.commit()
+    return menu_item
 
 
 # Create menu item
@@ -15,29 +66,18 @@ router = APIRouter(prefix="/menu", tags=["menu"])
 def create_menu_item(
     category_id: int,
     item: MenuItemCreate,
+    scope: RestaurantScope = Depends(category_scope),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
-    category = (
-        db.query(Category)
-        .join(Restaurant)
-        .filter(
-            Category.id == category_id, Restaurant.user_id == current_user.id
-        )
-        .first()
+    new_item = insert_row(
+        db,
+        MenuItem,
+        category_id=category_id,
+        restaurant_id=scope.restaurant_id,
+        **item.model_dump(),
     )
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-
-    new_item = MenuItem(
-        category_id=category.id,
-        name=item.name,
-        price=item.price,
-        is_available=item.is_available,
-    )
-    db.add(new_item)
+    bump_menu_version(db, scope.restaurant_id)
     db.commit()
-    db.refresh(new_item)
     return new_item
 
 
@@ -45,20 +85,10 @@ def create_menu_item(
 @router.get("/{category_id}", response_model=list[MenuItemOut])
 def list_menu_items(
     category_id: int,
+    scope: RestaurantScope = Depends(category_scope),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
-    return (
-        db.query(MenuItem)
-        .join(Category)
-        .join(Restaurant)
-        .filter(
-            Category.id == category_id,
-            Restaurant.user_id == current_user.id,
-            MenuItem.is_deleted.is_(False),
-        )
-        .all()
-    )
+    return db.query(MenuItem).filter(MenuItem.category_id == category_id).all()
 
 
 # update_menu_item :-
@@ -69,26 +99,23 @@ def update_menu_item(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    menu_item = (
-        db.query(MenuItem)
-        .join(Category)
-        .join(Restaurant)
-        .filter(
-            MenuItem.id == item_id,
-            Restaurant.user_id == current_user.id,
-            MenuItem.is_deleted.is_(False),
-        )
-        .first()
-    )
-    if not menu_item:
-        raise HTTPException(status_code=404, detail="Menu item not found")
+    return _update_menu_item(db, item_id, current_user, item.model_dump())
 
-    menu_item.name = item.name
-    menu_item.price = item.price
-    menu_item.is_available = item.is_available
-    db.commit()
-    db.refresh(menu_item)
-    return menu_item
+
+# Partial update (name, price, availability)
+@router.patch("/{item_id}", response_model=MenuItemOut)
+def patch_menu_item(
+    item_id: int,
+    item: MenuItemUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return _update_menu_item(
+        db,
+        item_id,
+        current_user,
+        item.model_dump(exclude_unset=True, exclude_none=True),
+    )
 
 
 # Soft delete menu item
@@ -98,20 +125,87 @@ def soft_delete_menu_item(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    item = (
-        db.query(MenuItem)
-        .join(Category)
-        .join(Restaurant)
-        .filter(
-            MenuItem.id == item_id,
-            Restaurant.user_id == current_user.id,
-            MenuItem.is_deleted.is_(False),
-        )
-        .first()
+    _update_menu_item(db, item_id, current_user, {"is_deleted": True})
+    return {"message": f"Menu item {item_id} soft deleted successfully"}
+
+
+# Bulk availability ("86" sold-out items) in one statement
+@router.post(
+    "/availability/{restaurant_id}", response_model=MenuAvailabilityOut
+)
+def set_availability(
+    change: MenuAvailabilityUpdate,
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    restaurant_categories = select(Category.id).where(
+        Category.restaurant_id == scope.restaurant_id,
+        Category.is_deleted.is_(False),
     )
-    if not item:
-        raise HTTPException(status_code=404, detail="Menu item not found")
+    stmt = update(MenuItem).where(
+        MenuItem.category_id.in_(restaurant_categories),
+        MenuItem.is_deleted.is_(False),
+        # Untouched rows are neither rewritten nor reported
+        MenuItem.is_available.is_not(change.is_available),
+    )
+    if change.item_ids:
+        stmt = stmt.where(MenuItem.id.in_(change.item_ids))
+    if change.category_id is not None:
+        stmt = stmt.where(MenuItem.category_id == change.category_id)
+    if change.name:
+        stmt = stmt.where(
+            MenuItem.name.icontains(change.name, autoescape=True)
+        )
+
+    changed = db.execute(
+        stmt.values(is_available=change.is_available)
+        .returning(MenuItem.id, MenuItem.name, MenuItem.is_available)
+        .execution_options(
+            synchronize_session=False, audit_columns=("is_available",)
+        )
+    ).all()
+    items = [row._asdict() for row in changed]
+    if not items:
+        version = db.get(Restaurant, scope.restaurant_id).menu_version
+        return {"menu_version": version, "items": []}
 
-    item.is_deleted = True
+    version = bump_menu_version(db, scope.restaurant_id)
+    publish(
+        db,
+        f"restaurant:{scope.restaurant_id}",
+        "availability",
+        {"menu_version": version, "items": items},
+    )
     db.commit()
-    return {"message": f"Menu item {item_id} soft deleted successfully"}
+    return {"menu_version": version, "items": items}
+
+
+# Server-sent events for menu changes pushed to connected devices
+@router.get("/events/{restaurant_id}")
+def menu_events(
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    # The stream may stay open for hours; don't hold a pooled connection
+    db.close()
+    topic = f"restaurant:{scope.restaurant_id}"
+
+    async def stream():
+        async with broadcaster.subscribe(topic) as queue:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(), KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                data = json.dumps(message["data"])
+                yield f"event: {message['event']}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
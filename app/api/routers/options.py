@@ -0,0 +1,230 @@
+from app.api.dependencies import (
+    RestaurantScope,
+    get_db,
+    option_group_scope,
+    option_scope,
+    restaurant_scope,
+)
+from app.api.routing import SessionRoute
+from app.db.writes import insert_row, update_row
+from app.models.category import Category
+from app.models.menu import MenuItem
+from app.models.option import Option, OptionGroup
+from app.schemas.option import (
+    ItemOptionGroups,
+    OptionCreate,
+    OptionGroupBase,
+    OptionGroupCreate,
+    OptionGroupOut,
+    OptionOut,
+    OptionUpdate,
+)
+from app.services.menu_cache import bump_menu_version
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+
+router = APIRouter(
+    prefix="/options", tags=["options"], route_class=SessionRoute
+)
+
+
+def _groups_with_options(db: Session):
+    # Live options of each group, loaded in one extra query
+    return db.query(OptionGroup).options(selectinload(OptionGroup.options))
+
+
+def _live_group(db: Session, group_id: int) -> OptionGroup:
+    return _groups_with_options(db).filter(OptionGroup.id == group_id).one()
+
+
+# Create option group, optionally with its options
+@router.post("/groups/{restaurant_id}", response_model=OptionGroupOut)
+def create_option_group(
+    group: OptionGroupCreate,
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    new_group = OptionGroup(
+        restaurant_id=scope.restaurant_id,
+        **group.model_dump(exclude={"options"}),
+    )
+    new_group.options = [
+        Option(**option.model_dump()) for option in group.options
+    ]
+    db.add(new_group)
+    bump_menu_version(db, scope.restaurant_id)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=409, detail="Option group name already in use"
+        )
+    return _live_group(db, new_group.id)
+
+
+# List option groups with their options
+@router.get("/groups/{restaurant_id}", response_model=list[OptionGroupOut])
+def list_option_groups(
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    return (
+        _groups_with_options(db)
+        .filter(OptionGroup.restaurant_id == scope.restaurant_id)
+        .order_by(OptionGroup.id)
+        .all()
+    )
+
+
+# Update a group's name and selection rules
+@router.put("/groups/{group_id}", response_model=OptionGroupOut)
+def update_option_group(
+    group_id: int,
+    group: OptionGroupBase,
+    scope: RestaurantScope = Depends(option_group_scope),
+    db: Session = Depends(get_db),
+):
+    try:
+        update_row(
+            db, OptionGroup, [OptionGroup.id == group_id], group.model_dump()
+        )
+        bump_menu_version(db, scope.restaurant_id)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=409, detail="Option group name already in use"
+        )
+    return _live_group(db, group_id)
+
+
+# Soft delete option group
+@router.delete("/groups/{group_id}")
+def soft_delete_option_group(
+    group_id: int,
+    scope: RestaurantScope = Depends(option_group_scope),
+    db: Session = Depends(get_db),
+):
+    update_row(
+        db, OptionGroup, [OptionGroup.id == group_id], {"is_deleted": True}
+    )
+    bump_menu_version(db, scope.restaurant_id)
+    db.commit()
+    return {"message": f"Option group {group_id} soft deleted successfully"}
+
+
+# Add an option to a group
+@router.post("/groups/{group_id}/options", response_model=OptionOut)
+def create_option(
+    group_id: int,
+    option: OptionCreate,
+    scope: RestaurantScope = Depends(option_group_scope),
+    db: Session = Depends(get_db),
+):
+    new_option = insert_row(
+        db, Option, option_group_id=group_id, **option.model_dump()
+    )
+    bump_menu_version(db, scope.restaurant_id)
+    db.commit()
+    return new_option
+
+
+def _update_option(db: Session, option_id: int, restaurant_id: int, values):
+    option = update_row(db, Option, [Option.id == option_id], values)
+    if not option:
+        raise HTTPException(status_code=404, detail="Option not found")
+    if values:
+        bump_menu_version(db, restaurant_id)
+        db.commit()
+    return option
+
+
+# Update option (name, price delta, availability)
+@router.put("/{option_id}", response_model=OptionOut)
+def update_option(
+    option_id: int,
+    option: OptionCreate,
+    scope: RestaurantScope = Depends(option_scope),
+    db: Session = Depends(get_db),
+):
+    return _update_option(
+        db, option_id, scope.restaurant_id, option.model_dump()
+    )
+
+
+# Partial update of an option
+@router.patch("/{option_id}", response_model=OptionOut)
+def patch_option(
+    option_id: int,
+    option: OptionUpdate,
+    scope: RestaurantScope = Depends(option_scope),
+    db: Session = Depends(get_db),
+):
+    return _update_option(
+        db,
+        option_id,
+        scope.restaurant_id,
+        option.model_dump(exclude_unset=True, exclude_none=True),
+    )
+
+
+# Soft delete option
+@router.delete("/{option_id}")
+def soft_delete_option(
+    option_id: int,
+    scope: RestaurantScope = Depends(option_scope),
+    db: Session = Depends(get_db),
+):
+    _update_option(db, option_id, scope.restaurant_id, {"is_deleted": True})
+    return {"message": f"Option {option_id} soft deleted successfully"}
+
+
+# Set which option groups a menu item offers
+@router.put(
+    "/{restaurant_id}/items/{item_id}", response_model=list[OptionGroupOut]
+)
+def set_item_option_groups(
+    item_id: int,
+    data: ItemOptionGroups,
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    menu_item = (
+        db.query(MenuItem)
+        .join(Category, MenuItem.category_id == Category.id)
+        .filter(
+            MenuItem.id == item_id,
+            Category.restaurant_id == scope.restaurant_id,
+        )
+        .first()
+    )
+    if not menu_item:
+        raise HTTPException(status_code=404, detail="Menu item not found")
+
+    wanted = set(data.option_group_ids)
+    groups = (
+        db.query(OptionGroup)
+        .filter(
+            OptionGroup.id.in_(wanted),
+            OptionGroup.restaurant_id == scope.restaurant_id,
+        )
+        .all()
+    )
+    missing = wanted - {group.id for group in groups}
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Option groups not found: {sorted(missing)}",
+        )
+
+    menu_item.option_groups = groups
+    bump_menu_version(db, scope.restaurant_id)
+    db.commit()
+    return (
+        _groups_with_options(db)
+        .filter(OptionGroup.id.in_(wanted))
+        .order_by(OptionGroup.id)
+        .all()
+    )
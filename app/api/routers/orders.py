@@ -1,35 +1,54 @@
-from app.api.dependencies import get_current_user, get_db
-from app.models.category import Category
-from app.models.menu import MenuItem
-from app.models.order import Order, OrderItem
+from datetime import date, datetime, timedelta, timezone
+from typing import Literal
+
+from app.api.dependencies import RestaurantScope, get_db, restaurant_scope
+from app.api.routing import SessionRoute
+from app.core.config import get_settings
+from app.db.writes import row_columns
+from app.models.order import Order, OrderItem, OrderItemOption
 from app.models.restaurant import Restaurant
 from app.models.table import RestaurantTable
-from app.models.user import User
 from app.schemas.order import OrderCreate, OrderOut
+from app.services.exports import export_orders
+from app.services.option_rules import OptionError, PricedLine, menu_rules
+from app.services.reports import day_start, record_sale
+from app.services.webhooks import emit
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, selectinload
 
-router = APIRouter(prefix="/orders", tags=["orders"])
+router = APIRouter(prefix="/orders", tags=["orders"], route_class=SessionRoute)
 
 
 @router.post("/{restaurant_id}/", response_model=OrderOut)
 def place_order(
-    restaurant_id: int,
     order_data: OrderCreate,
+    scope: RestaurantScope = Depends(restaurant_scope),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
-    # Validate restaurant (must belong to logged-in user)
-    restaurant = (
-        db.query(Restaurant)
-        .filter(
-            Restaurant.id == restaurant_id,
-            Restaurant.user_id == current_user.id,
-        )
-        .first()
-    )
-    if not restaurant:
-        raise HTTPException(status_code=404, detail="Restaurant not found")
+    # Restaurant ownership is checked by restaurant_scope
+    restaurant_id = scope.restaurant_id
+    restaurant = db.get(Restaurant, restaurant_id)
+
+    # Validate and price every line from the compiled menu rules before
+    # writing anything; repeats within the request become one line
+    rules = menu_rules(db, restaurant)
+    lines: dict[tuple[int, str], PricedLine] = {}
+    quantities: dict[tuple[int, str], int] = {}
+    for item in order_data.items:
+        try:
+            line = rules.price(item.menu_item_id, item.option_ids)
+        except KeyError:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Menu item {item.menu_item_id} not found",
+            )
+        except OptionError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        key = (line.menu_item_id, line.options_key)
+        lines[key] = line
+        quantities[key] = quantities.get(key, 0) + item.quantity
 
     # Validate table
     table = (
@@ -37,7 +56,6 @@ def place_order(
         .filter(
             RestaurantTable.id == order_data.table_id,
             RestaurantTable.restaurant_id == restaurant_id,
-            RestaurantTable.is_deleted.is_(False),
         )
         .first()
     )
@@ -46,92 +64,171 @@ def place_order(
             status_code=400, detail="Please select table number"
         )
 
+    # Open orders are recent, so bounding created_at lets Postgres skip
+    # every older month's partition. A bound computed here (not now() in
+    # SQL) is a constant, which prunes when planning rather than running.
+    open_since = datetime.now(timezone.utc) - timedelta(
+        hours=get_settings().OPEN_ORDER_MAX_AGE_HOURS
+    )
     existing_order = (
         db.query(Order)
         .filter(
             Order.table_id == table.id,
             Order.restaurant_id == restaurant_id,
             Order.is_completed.is_(False),
+            Order.created_at >= open_since,
         )
+        .with_for_update()
         .first()
     )
+    is_new_order = existing_order is None
+    # Lines already on the order. The order's row lock keeps concurrent
+    # requests for it from racing on them (and on the total).
+    existing_lines = set()
     if existing_order:
-        new_order = existing_order
-    else:
-        # Create new order
-        new_order = Order(
-            restaurant_id=restaurant_id, table_id=table.id, total_amount=0.0
-        )
-        db.add(new_order)
-        db.commit()
-        db.refresh(new_order)
-
-    total_price = new_order.total_amount
-
-    # Add each ordered menu item
-    for item in order_data.items:
-        # FIXED QUERY — fetch by category’s restaurant_id
-        menu_item = (
-            db.query(MenuItem)
-            .join(Category, MenuItem.category_id == Category.id)
+        order_id = existing_order.id
+        order_created_at = existing_order.created_at
+        existing_lines = set(
+            db.query(OrderItem.menu_item_id, OrderItem.options_key)
             .filter(
-                MenuItem.id == item.menu_item_id,
-                Category.restaurant_id == restaurant_id,
-                MenuItem.is_deleted.is_(False),
+                OrderItem.order_id == order_id,
+                OrderItem.order_created_at == order_created_at,
             )
-            .first()
+            .all()
         )
-
-        if not menu_item:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Menu item {item.menu_item_id} not found",
+    else:
+        # Create new order. Every line on it is new and priced above, so
+        # its total is known up front; the id and partition key come
+        # back from the INSERT (with the rest of the row, for the audit
+        # log).
+        new_order = db.execute(
+            insert(Order)
+            .values(
+                restaurant_id=restaurant_id,
+                table_id=table.id,
+                total_amount=sum(
+                    line.unit_price * quantities[key]
+                    for key, line in lines.items()
+                ),
             )
+            .returning(*row_columns(Order))
+        ).one()
+        order_id, order_created_at = new_order.id, new_order.created_at
 
-        # Create order item
-        order_item = OrderItem(
-            order_id=new_order.id,
-            menu_item_id=menu_item.id,
-            quantity=item.quantity,
+    # Upsert one line per item and option choice: a line already on the
+    # open order keeps its price snapshot and only gains quantity.
+    priced = []
+    if lines:
+        rows = insert(OrderItem).values(
+            [
+                {
+                    "order_id": order_id,
+                    "order_created_at": order_created_at,
+                    "menu_item_id": line.menu_item_id,
+                    "options_key": key[1],
+                    "quantity": quantities[key],
+                    "name": line.name,
+                    "unit_price": line.unit_price,
+                }
+                for key, line in lines.items()
+            ]
         )
-        db.add(order_item)
+        priced = db.execute(
+            rows.on_conflict_do_update(
+                index_elements=[
+                    "order_id",
+                    "order_created_at",
+                    "menu_item_id",
+                    "options_key",
+                ],
+                set_={"quantity": OrderItem.quantity + rows.excluded.quantity},
+            ).returning(
+                OrderItem.id,
+                OrderItem.menu_item_id,
+                OrderItem.options_key,
+                OrderItem.unit_price,
+            )
+        ).all()
 
-        # Add to total
-        total_price += menu_item.price * item.quantity
+    # Option snapshots are written once, when a line is first created
+    chosen = [
+        {
+            "order_item_id": row.id,
+            "order_created_at": order_created_at,
+            "option_id": option.id,
+            "name": option.name,
+            "price_delta": option.price_delta,
+        }
+        for row in priced
+        if (row.menu_item_id, row.options_key) not in existing_lines
+        for option in lines[(row.menu_item_id, row.options_key)].options
+    ]
+    if chosen:
+        db.execute(insert(OrderItemOption), chosen)
 
-    # Update total price
-    new_order.total_amount = total_price
+    sold_lines = []
+    for row in priced:
+        quantity = quantities[(row.menu_item_id, row.options_key)]
+        sold_lines.append((row.menu_item_id, quantity, row.unit_price))
+
+    # Update total price; lines already on the order keep their price
+    if existing_order:
+        existing_order.total_amount += sum(
+            unit_price * quantity for _, quantity, unit_price in sold_lines
+        )
+        total_amount = existing_order.total_amount
+    else:
+        total_amount = new_order.total_amount
+    record_sale(db, restaurant, sold_lines, is_new_order, order_created_at)
+    # Subscribers get it after the commit, from the webhook dispatcher
+    emit(
+        db,
+        restaurant_id,
+        "order.placed",
+        {
+            "order_id": order_id,
+            "table_id": table.id,
+            "table_number": table.table_number,
+            "new_order": is_new_order,
+            "total_amount": total_amount,
+            "lines": [
+                {
+                    "menu_item_id": line.menu_item_id,
+                    "name": line.name,
+                    "options": [option.name for option in line.options],
+                    "quantity": quantities[key],
+                    "unit_price": line.unit_price,
+                }
+                for key, line in lines.items()
+            ],
+        },
+    )
     db.commit()
-    db.refresh(new_order)
 
-    return new_order
+    # Lines and their options in two queries rather than one per line
+    return (
+        db.query(Order)
+        .options(selectinload(Order.items).selectinload(OrderItem.options))
+        .filter(Order.id == order_id, Order.created_at == order_created_at)
+        .one()
+    )
 
 
 @router.get("/{restaurant_id}/bill/{order_id}/")
 def get_bill(
-    restaurant_id: int,
+    order_id: int,
     table_number: int,
+    scope: RestaurantScope = Depends(restaurant_scope),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
-    # Validate restaurant (must belong to logged-in user)
-    restaurant = (
-        db.query(Restaurant)
-        .filter(
-            Restaurant.id == restaurant_id,
-            Restaurant.user_id == current_user.id,
-        )
-        .first()
-    )
-    if not restaurant:
-        raise HTTPException(status_code=404, detail="Restaurant not found")
+    restaurant_id = scope.restaurant_id
+    restaurant = db.get(Restaurant, restaurant_id)
 
     table = (
         db.query(RestaurantTable)
         .filter(
             RestaurantTable.table_number == table_number,
             RestaurantTable.restaurant_id == restaurant_id,
-            RestaurantTable.is_deleted.is_(False),
         )
         .first()
     )
@@ -141,42 +238,90 @@ def get_bill(
         )
 
     # Validate order
-    orders = (
+    order = (
         db.query(Order)
         .filter(
-            Order.table_id == table.id, Order.restaurant_id == restaurant_id
+            Order.id == order_id,
+            Order.table_id == table.id,
+            Order.restaurant_id == restaurant_id,
         )
-        .all()
+        .first()
     )
-    if not orders:
+    if not order:
         raise HTTPException(
             status_code=404,
-            detail=f"No orders found for this table{table_number}",
+            detail=f"Order {order_id} not found for table {table_number}",
         )
 
+    # Lines carry their own name and price; no menu lookups needed. The
+    # order's created_at confines the lookup to its month's partition.
+    order_items = (
+        db.query(OrderItem)
+        .options(selectinload(OrderItem.options))
+        .filter(
+            OrderItem.order_id == order.id,
+            OrderItem.order_created_at == order.created_at,
+        )
+        .order_by(OrderItem.id)
+        .all()
+    )
+
     bill_details = []
     grand_total = 0.0
+    for item in order_items:
+        item_total = item.unit_price * item.quantity
+        grand_total += item_total
 
-    for order in orders:
-        order_items = (
-            db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
+        bill_details.append(
+            {
+                "item_name": item.name,
+                "options": [option.name for option in item.options],
+                "quantity": item.quantity,
+                "unit_price": item.unit_price,
+                "total_price": item_total,
+            }
         )
-
-        for item in order_items:
-            item_total = item.menu_item.price * item.quantity
-            grand_total += item_total
-
-            bill_details.append(
-                {
-                    "item_name": item.menu_item.name,
-                    "quantity": item.quantity,
-                    "unit_price": item.menu_item.price,
-                    "total_price": item_total,
-                }
-            )
     return {
         "restaurant_name": restaurant.name,
         "table_number": table.table_number,
         "grand_total": grand_total,
         "ordered_items": bill_details,
     }
+
+
+# Stream full order history as CSV or NDJSON (optionally gzipped)
+@router.get("/{restaurant_id}/export")
+def export_order_history(
+    format: Literal["csv", "ndjson"] = "csv",
+    start: date | None = None,
+    end: date | None = None,
+    status: Literal["open", "completed"] | None = None,
+    gzip: bool = False,
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    restaurant_id = scope.restaurant_id
+    # Dates are the restaurant's local days, as in the sales reports;
+    # end date is inclusive
+    start_at = end_at = None
+    if start is not None or end is not None:
+        time_zone = db.get(Restaurant, restaurant_id).time_zone
+        if start is not None:
+            start_at = day_start(time_zone, start)
+        if end is not None:
+            end_at = day_start(time_zone, end + timedelta(days=1))
+    completed = None if status is None else status == "completed"
+
+    filename = f"orders-{restaurant_id}.{format}"
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        export_orders(
+            restaurant_id, format, start_at, end_at, completed, gzip
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,73 @@
+from app.api.dependencies import (
+    RestaurantScope,
+    get_db,
+    order_scope,
+    payment_order_scope,
+    payment_scope,
+)
+from app.api.routing import SessionRoute
+from app.models.payment import Payment
+from app.schemas.payment import (
+    CaptureOut,
+    PaymentCreate,
+    PaymentOut,
+    RefundCreate,
+)
+from app.services.payments import (
+    PaymentError,
+    capture_payment,
+    refund_payment,
+)
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+router = APIRouter(tags=["payments"], route_class=SessionRoute)
+
+
+# Capture a payment; retries with the same idempotency_key are safe
+@router.post("/payments", response_model=CaptureOut)
+def create_payment(
+    payment: PaymentCreate,
+    scope: RestaurantScope = Depends(payment_order_scope),
+    db: Session = Depends(get_db),
+):
+    try:
+        captured, total, paid, completed = capture_payment(db, payment)
+    except PaymentError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=str(exc))
+    return {
+        "payment": captured,
+        "order_total": total,
+        "amount_paid": paid,
+        "balance_due": max(round(total - paid, 2), 0.0),
+        "order_completed": completed,
+    }
+
+
+# List an order's payments
+@router.get("/orders/{order_id}/payments", response_model=list[PaymentOut])
+def list_order_payments(
+    order_id: int,
+    scope: RestaurantScope = Depends(order_scope),
+    db: Session = Depends(get_db),
+):
+    return (
+        db.query(Payment)
+        .filter(Payment.order_id == order_id)
+        .order_by(Payment.id)
+        .all()
+    )
+
+
+# Refund part or all of a payment
+@router.post("/payments/{payment_id}/refund", response_model=PaymentOut)
+def create_refund(
+    payment_id: int,
+    refund: RefundCreate,
+    scope: RestaurantScope = Depends(payment_scope),
+    db: Session = Depends(get_db),
+):
+    try:
+        return refund_payment(db, payment_id, refund.amount)
+    except PaymentError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=str(exc))
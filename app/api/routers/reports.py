@@ -0,0 +1,104 @@
+from datetime import date, timedelta
+
+from app.api.dependencies import RestaurantScope, get_db, restaurant_scope
+from app.api.routing import SessionRoute
+from app.models.menu import MenuItem
+from app.models.report import DailyItemSales, DailySales
+from app.models.restaurant import Restaurant
+from app.schemas.report import DailySalesOut, TopItemOut
+from app.services.reports import local_date
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+router = APIRouter(
+    prefix="/restaurants", tags=["reports"], route_class=SessionRoute
+)
+
+
+def _report_window(
+    db: Session,
+    restaurant_id: int,
+    start: date | None,
+    end: date | None,
+) -> tuple[date, date]:
+    if end is None:
+        restaurant = db.get(Restaurant, restaurant_id)
+        end = local_date(restaurant.time_zone)
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be <= end")
+    return start, end
+
+
+# Daily sales, read from the daily_sales rollup only
+@router.get(
+    "/{restaurant_id}/reports/daily", response_model=list[DailySalesOut]
+)
+def daily_sales_report(
+    start: date | None = None,
+    end: date | None = None,
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    restaurant_id = scope.restaurant_id
+    start, end = _report_window(db, restaurant_id, start, end)
+    return (
+        db.query(DailySales)
+        .filter(
+            DailySales.restaurant_id == restaurant_id,
+            DailySales.sales_date.between(start, end),
+        )
+        .order_by(DailySales.sales_date)
+        .all()
+    )
+
+
+# Best sellers by quantity, read from the daily_item_sales rollup only
+@router.get(
+    "/{restaurant_id}/reports/top-items", response_model=list[TopItemOut]
+)
+def top_items_report(
+    start: date | None = None,
+    end: date | None = None,
+    limit: int = Query(10, ge=1, le=100),
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    restaurant_id = scope.restaurant_id
+    start, end = _report_window(db, restaurant_id, start, end)
+    totals = (
+        db.query(
+            DailyItemSales.menu_item_id,
+            func.sum(DailyItemSales.quantity).label("quantity"),
+            func.sum(DailyItemSales.revenue).label("revenue"),
+        )
+        .filter(
+            DailyItemSales.restaurant_id == restaurant_id,
+            DailyItemSales.sales_date.between(start, end),
+        )
+        .group_by(DailyItemSales.menu_item_id)
+        .order_by(func.sum(DailyItemSales.quantity).desc())
+        .limit(limit)
+        .subquery()
+    )
+    rows = (
+        db.query(
+            totals.c.menu_item_id,
+            MenuItem.name,
+            totals.c.quantity,
+            totals.c.revenue,
+        )
+        .join(MenuItem, MenuItem.id == totals.c.menu_item_id)
+        .order_by(totals.c.quantity.desc())
+        .all()
+    )
+    return [
+        TopItemOut(
+            menu_item_id=row.menu_item_id,
+            name=row.name,
+            quantity=row.quantity,
+            revenue=row.revenue,
+        )
+        for row in rows
+    ]
@@ -0,0 +1,275 @@
+from datetime import datetime, timedelta, timezone
+
+from app.api.dependencies import (
+    RestaurantScope,
+    get_db,
+    reservation_scope,
+    restaurant_scope,
+)
+from app.api.routing import SessionRoute
+from app.core.config import get_settings
+from app.db.writes import insert_row, update_row
+from app.models.customer import Customer
+from app.models.reservation import Reservation
+from app.models.table import RestaurantTable, TableStatus
+from app.schemas.reservation import (
+    AvailabilityOut,
+    ReservationCreate,
+    ReservationOut,
+    ReservationStatusEnum,
+    ReservationUpdate,
+)
+from app.services.reservations import (
+    bump_reservations_version,
+    free_tables,
+    slots,
+)
+from fastapi import APIRouter, Depends, HTTPException, Query
+from psycopg2 import errorcodes
+from pydantic import AwareDatetime
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+router = APIRouter(tags=["reservations"], route_class=SessionRoute)
+
+BOOKED_DETAIL = "Table is already booked for that time"
+# Longest range one availability search covers
+MAX_AVAILABILITY_WINDOW = timedelta(hours=24)
+# Changes to these move, take or free a table
+_HOLDING_FIELDS = {"table_id", "starts_at", "ends_at", "status"}
+
+
+def _check_times(
+    starts_at: datetime, ends_at: datetime, new_start: bool = True
+) -> None:
+    # A start left as it was may be past: the party is already seated
+    if ends_at <= starts_at:
+        raise HTTPException(
+            status_code=422, detail="ends_at must be after starts_at"
+        )
+    settings = get_settings()
+    now = datetime.now(timezone.utc)
+    grace = timedelta(minutes=settings.RESERVATION_START_GRACE_MINUTES)
+    if ends_at <= now or (new_start and starts_at < now - grace):
+        raise HTTPException(status_code=422, detail="That time has passed")
+    horizon = timedelta(days=settings.RESERVATION_HORIZON_DAYS)
+    if starts_at > now + horizon:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Reservations open {horizon.days} days ahead",
+        )
+
+
+def _check_table(
+    db: Session, restaurant_id: int, table_id: int, party_size: int
+) -> None:
+    table = db.execute(
+        select(RestaurantTable.table_number, RestaurantTable.seats).where(
+            RestaurantTable.id == table_id,
+            RestaurantTable.restaurant_id == restaurant_id,
+            RestaurantTable.status != TableStatus.INACTIVE,
+        )
+    ).first()
+    if table is None:
+        raise HTTPException(status_code=404, detail="Table not found")
+    if table.seats < party_size:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Table {table.table_number} seats {table.seats}",
+        )
+
+
+def _booked(exc: IntegrityError) -> bool:
+    # The exclusion constraint: the table is held for an overlapping time
+    return getattr(exc.orig, "pgcode", None) == errorcodes.EXCLUSION_VIOLATION
+
+
+# Book a table; without table_id the smallest free one that fits is taken
+@router.post(
+    "/restaurants/{restaurant_id}/reservations", response_model=ReservationOut
+)
+def create_reservation(
+    reservation: ReservationCreate,
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    _check_times(reservation.starts_at, reservation.ends_at)
+    if reservation.customer_id is not None and (
+        db.execute(
+            select(Customer.id).where(
+                Customer.id == reservation.customer_id,
+                Customer.restaurant_id == scope.restaurant_id,
+            )
+        ).first()
+        is None
+    ):
+        raise HTTPException(status_code=404, detail="Customer not found")
+    if reservation.table_id is None:
+        (tables,) = free_tables(
+            db,
+            scope.restaurant_id,
+            [(reservation.starts_at, reservation.ends_at)],
+            reservation.party_size,
+        )
+        candidates = [table.id for table in tables]
+        if not candidates:
+            raise HTTPException(
+                status_code=409, detail="No table is free for that time"
+            )
+    else:
+        _check_table(
+            db,
+            scope.restaurant_id,
+            reservation.table_id,
+            reservation.party_size,
+        )
+        candidates = [reservation.table_id]
+
+    # The exclusion constraint has the last word: a table booked since
+    # the search is skipped for the next one
+    values = reservation.model_dump()
+    for table_id in candidates:
+        values["table_id"] = table_id
+        try:
+            with db.begin_nested():
+                row = insert_row(
+                    db,
+                    Reservation,
+                    restaurant_id=scope.restaurant_id,
+                    **values,
+                )
+        except IntegrityError as exc:
+            if not _booked(exc):
+                raise
+            continue
+        bump_reservations_version(db, scope.restaurant_id)
+        db.commit()
+        return row
+    raise HTTPException(status_code=409, detail=BOOKED_DETAIL)
+
+
+# Reservations overlapping a time range, earliest first
+@router.get(
+    "/restaurants/{restaurant_id}/reservations",
+    response_model=list[ReservationOut],
+)
+def list_reservations(
+    start: AwareDatetime,
+    end: AwareDatetime,
+    status: ReservationStatusEnum | None = None,
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    stmt = select(Reservation).where(
+        Reservation.restaurant_id == scope.restaurant_id,
+        Reservation.period.overlaps(func.tstzrange(start, end)),
+    )
+    if status is not None:
+        stmt = stmt.where(Reservation.status == status)
+    return db.scalars(
+        stmt.order_by(Reservation.starts_at, Reservation.id)
+    ).all()
+
+
+# Tables free for a party: for the whole range, or with duration_minutes
+# for every slot of that length starting each step_minutes within it
+@router.get(
+    "/restaurants/{restaurant_id}/availability",
+    response_model=AvailabilityOut,
+)
+def availability(
+    start: AwareDatetime,
+    end: AwareDatetime,
+    party_size: int = Query(ge=1),
+    duration_minutes: int | None = Query(default=None, ge=15, le=720),
+    step_minutes: int = Query(default=15, ge=5, le=240),
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    if end <= start:
+        raise HTTPException(status_code=422, detail="end must be after start")
+    if end - start > MAX_AVAILABILITY_WINDOW:
+        raise HTTPException(
+            status_code=422, detail="Search at most 24 hours at a time"
+        )
+    if duration_minutes is None:
+        windows = [(start, end)]
+    else:
+        windows = slots(
+            start,
+            end,
+            timedelta(minutes=duration_minutes),
+            timedelta(minutes=step_minutes),
+        )
+    free = free_tables(db, scope.restaurant_id, windows, party_size)
+    return {
+        "party_size": party_size,
+        "slots": [
+            {
+                "starts_at": starts_at,
+                "ends_at": ends_at,
+                "tables": [table._asdict() for table in tables],
+            }
+            for (starts_at, ends_at), tables in zip(windows, free)
+        ],
+    }
+
+
+# Get reservation
+@router.get("/reservations/{reservation_id}", response_model=ReservationOut)
+def get_reservation(
+    reservation_id: int,
+    scope: RestaurantScope = Depends(reservation_scope),
+    db: Session = Depends(get_db),
+):
+    return db.get(Reservation, reservation_id)
+
+
+# Move, resize or change the status of a reservation (CANCELLED, COMPLETED
+# and NO_SHOW free the table)
+@router.patch("/reservations/{reservation_id}", response_model=ReservationOut)
+def update_reservation(
+    reservation_id: int,
+    reservation: ReservationUpdate,
+    scope: RestaurantScope = Depends(reservation_scope),
+    db: Session = Depends(get_db),
+):
+    values = reservation.model_dump(exclude_unset=True, exclude_none=True)
+    where = [Reservation.id == reservation_id]
+    if values.keys() & {"table_id", "party_size", "starts_at", "ends_at"}:
+        current = db.execute(
+            select(
+                Reservation.table_id,
+                Reservation.party_size,
+                Reservation.starts_at,
+                Reservation.ends_at,
+            )
+            .where(*where)
+            .with_for_update()
+        ).one()
+        merged = {**current._asdict(), **values}
+        if values.keys() & {"starts_at", "ends_at"}:
+            _check_times(
+                merged["starts_at"],
+                merged["ends_at"],
+                new_start="starts_at" in values,
+            )
+        if values.keys() & {"table_id", "party_size"}:
+            _check_table(
+                db,
+                scope.restaurant_id,
+                merged["table_id"],
+                merged["party_size"],
+            )
+    try:
+        row = update_row(db, Reservation, where, values)
+        if values.keys() & _HOLDING_FIELDS:
+            bump_reservations_version(db, scope.restaurant_id)
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        if not _booked(exc):
+            raise
+        raise HTTPException(status_code=409, detail=BOOKED_DETAIL)
+    return row
@@ -1,11 +1,28 @@
-from app.api.dependencies import get_current_user, get_db
+from app.api.dependencies import (
+    RestaurantScope,
+    get_current_user,
+    get_db,
+    restaurant_scope,
+)
+from app.api.routing import SessionRoute
+from app.core.compression import negotiate
+from app.core.ownership import owned_restaurants
+from app.db.writes import insert_row, update_row
 from app.models.restaurant import Restaurant
 from app.models.user import User
-from app.schemas.restaurant import RestaurantCreate, RestaurantOut
-from fastapi import APIRouter, Depends, HTTPException
+from app.schemas.menu import MenuCategoryOut
+from app.schemas.restaurant import (
+    RestaurantCreate,
+    RestaurantOut,
+    RestaurantUpdate,
+)
+from app.services.menu_cache import full_menu
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
-router = APIRouter(prefix="/restaurants", tags=["restaurants"])
+router = APIRouter(
+    prefix="/restaurants", tags=["restaurants"], route_class=SessionRoute
+)
 
 
 # ---------------- CREATE ----------------
@@ -15,16 +32,11 @@ def create_restaurant(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    new_restaurant = Restaurant(
-        user_id=current_user.id,
-        name=restaurant.name,
-        time_zone=restaurant.time_zone,
-        currency=restaurant.currency,
-        location=restaurant.location,
+    new_restaurant = insert_row(
+        db, Restaurant, user_id=current_user.id, **restaurant.model_dump()
     )
-    db.add(new_restaurant)
     db.commit()
-    db.refresh(new_restaurant)
+    owned_restaurants.invalidate(new_restaurant.user_id)
     return new_restaurant
 
 
@@ -36,8 +48,8 @@ def list_restaurants(
     include_deleted: bool = False,  # optional query param
 ):
     query = db.query(Restaurant).filter(Restaurant.user_id == current_user.id)
-    if not include_deleted:
-        query = query.filter(Restaurant.is_deleted.is_(False))
+    if include_deleted:
+        query = query.execution_options(include_deleted=True)
     return query.all()
 
 
@@ -61,6 +73,31 @@ def get_restaurant(
     return restaurant
 
 
+# ---------------- READ (FULL MENU) ----------------
+@router.get("/{restaurant_id}/menu", response_model=list[MenuCategoryOut])
+def get_full_menu(
+    request: Request,
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    payload = full_menu(db, scope.restaurant_id)
+    # Served precompressed from the cache; the compression middleware
+    # leaves responses that already carry a Content-Encoding alone.
+    encoding = negotiate(request.headers.get("accept-encoding", ""))
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(
+        payload.body(encoding),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def _owned_restaurant(restaurant_id: int, user: User) -> list:
+    return [Restaurant.id == restaurant_id, Restaurant.user_id == user.id]
+
+
 # ---------------- UPDATE ----------------
 @router.put("/{restaurant_id}", response_model=RestaurantOut)
 def update_restaurant(
@@ -69,24 +106,35 @@ def update_restaurant(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    restaurant = (
-        db.query(Restaurant)
-        .filter(
-            Restaurant.id == restaurant_id,
-            Restaurant.user_id == current_user.id,
-            Restaurant.is_deleted.is_(False),  # don’t update deleted
-        )
-        .first()
+    restaurant = update_row(
+        db,
+        Restaurant,
+        _owned_restaurant(restaurant_id, current_user),
+        data.model_dump(),
     )
-
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
+    db.commit()
+    return restaurant
 
-    for key, value in data.dict().items():
-        setattr(restaurant, key, value)
 
+# ---------------- PARTIAL UPDATE ----------------
+@router.patch("/{restaurant_id}", response_model=RestaurantOut)
+def patch_restaurant(
+    restaurant_id: int,
+    data: RestaurantUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    restaurant = update_row(
+        db,
+        Restaurant,
+        _owned_restaurant(restaurant_id, current_user),
+        data.model_dump(exclude_unset=True, exclude_none=True),
+    )
+    if not restaurant:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
     db.commit()
-    db.refresh(restaurant)
     return restaurant
 
 
@@ -97,23 +145,17 @@ def soft_delete_restaurant(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    restaurant = (
-        db.query(Restaurant)
-        .filter(
-            Restaurant.id == restaurant_id,
-            Restaurant.user_id == current_user.id,
-            Restaurant.is_deleted.is_(
-                False
-            ),  # only delete if not already deleted
-        )
-        .first()
+    restaurant = update_row(
+        db,
+        Restaurant,
+        _owned_restaurant(restaurant_id, current_user),
+        {"is_deleted": True},
     )
-
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
 
-    restaurant.is_deleted = True
     db.commit()
+    owned_restaurants.invalidate(restaurant.user_id)
     return {"message": f"Restaurant {restaurant_id} soft deleted successfully"}
 
 
@@ -124,22 +166,21 @@ def restore_restaurant(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    restaurant = (
-        db.query(Restaurant)
-        .filter(
-            Restaurant.id == restaurant_id,
-            Restaurant.user_id == current_user.id,
+    restaurant = update_row(
+        db,
+        Restaurant,
+        [
+            *_owned_restaurant(restaurant_id, current_user),
             Restaurant.is_deleted.is_(True),  # only restore if deleted
-        )
-        .first()
+        ],
+        {"is_deleted": False},
+        include_deleted=True,
     )
-
     if not restaurant:
         raise HTTPException(
             status_code=404, detail="Restaurant not found or not deleted"
         )
 
-    restaurant.is_deleted = False
     db.commit()
-    db.refresh(restaurant)
+    owned_restaurants.invalidate(restaurant.user_id)
     return restaurant
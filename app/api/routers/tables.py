@@ -1,61 +1,62 @@
-from app.api.dependencies import get_current_user, get_db
-from app.models.restaurant import Restaurant
+from app.api.dependencies import (
+    RestaurantScope,
+    get_current_user,
+    get_db,
+    owned_restaurant_ids,
+    release_db,
+    restaurant_scope,
+    table_scope,
+)
+from app.api.routing import SessionRoute
+from app.db.writes import insert_row, update_row
 from app.models.table import RestaurantTable
 from app.models.user import User
-from app.schemas.table import TableCreate, TableOut
-from fastapi import APIRouter, Depends, HTTPException
+from app.schemas.table import TableCreate, TableOut, TableQROut, TableUpdate
+from app.services.qr_codes import qr_zip, table_link, table_qr_png
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-router = APIRouter(prefix="/tables", tags=["tables"])
+router = APIRouter(prefix="/tables", tags=["tables"], route_class=SessionRoute)
 
 
 # Create table for a restaurant
 @router.post("/{restaurant_id}", response_model=TableOut)
 def create_table(
-    restaurant_id: int,
     table: TableCreate,
+    scope: RestaurantScope = Depends(restaurant_scope),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
-    restaurant = (
-        db.query(Restaurant)
-        .filter(
-            Restaurant.id == restaurant_id,
-            Restaurant.user_id == current_user.id,
-        )
-        .first()
-    )
-    if not restaurant:
-        raise HTTPException(status_code=404, detail="Restaurant not found")
-
-    new_table = RestaurantTable(
-        restaurant_id=restaurant.id, table_number=table.table_number
+    new_table = insert_row(
+        db,
+        RestaurantTable,
+        restaurant_id=scope.restaurant_id,
+        **table.model_dump(),
     )
-    db.add(new_table)
     db.commit()
-    db.refresh(new_table)
     return new_table
 
 
 # List tables of a restaurant
 @router.get("/{restaurant_id}", response_model=list[TableOut])
 def list_tables(
-    restaurant_id: int,
+    scope: RestaurantScope = Depends(restaurant_scope),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
     return (
         db.query(RestaurantTable)
-        .join(Restaurant)
-        .filter(
-            Restaurant.id == restaurant_id,
-            Restaurant.user_id == current_user.id,
-            RestaurantTable.is_deleted.is_(False),
-        )
+        .filter(RestaurantTable.restaurant_id == scope.restaurant_id)
         .all()
     )
 
 
+def _owned_table(table_id: int, user: User) -> list:
+    return [
+        RestaurantTable.id == table_id,
+        RestaurantTable.restaurant_id.in_(owned_restaurant_ids(user.id)),
+    ]
+
+
 # # Update table number
 @router.put("/{table_id}", response_model=TableOut)
 def update_table(
@@ -64,22 +65,35 @@ def update_table(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    db_table = (
-        db.query(RestaurantTable)
-        .join(Restaurant)
-        .filter(
-            RestaurantTable.id == table_id,
-            Restaurant.user_id == current_user.id,
-            RestaurantTable.is_deleted.is_(False),
-        )
-        .first()
+    db_table = update_row(
+        db,
+        RestaurantTable,
+        _owned_table(table_id, current_user),
+        {"table_number": table.table_number},
     )
     if not db_table:
         raise HTTPException(status_code=404, detail="Table not found")
+    db.commit()
+    return db_table
+
 
-    db_table.table_number = table.table_number
+# Partial update (number, status, seats)
+@router.patch("/{table_id}", response_model=TableOut)
+def patch_table(
+    table_id: int,
+    table: TableUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    db_table = update_row(
+        db,
+        RestaurantTable,
+        _owned_table(table_id, current_user),
+        table.model_dump(exclude_unset=True, exclude_none=True),
+    )
+    if not db_table:
+        raise HTTPException(status_code=404, detail="Table not found")
     db.commit()
-    db.refresh(db_table)
     return db_table
 
 
@@ -90,19 +104,85 @@ def delete_table(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    db_table = (
-        db.query(RestaurantTable)
-        .join(Restaurant)
-        .filter(
-            RestaurantTable.id == table_id,
-            Restaurant.user_id == current_user.id,
-            RestaurantTable.is_deleted.is_(False),
-        )
-        .first()
+    db_table = update_row(
+        db,
+        RestaurantTable,
+        _owned_table(table_id, current_user),
+        {"is_deleted": True},
     )
     if not db_table:
         raise HTTPException(status_code=404, detail="Table not found")
 
-    db_table.is_deleted = True
     db.commit()
     return {"message": f"Table {table_id} soft deleted successfully"}
+
+
+# Signed link for the table's QR code; rotate=true voids printed copies
+@router.post("/{table_id}/qr", response_model=TableQROut)
+def create_table_qr(
+    table_id: int,
+    rotate: bool = False,
+    scope: RestaurantScope = Depends(table_scope),
+    db: Session = Depends(get_db),
+):
+    if rotate:
+        table = update_row(
+            db,
+            RestaurantTable,
+            [RestaurantTable.id == table_id],
+            {"qr_version": RestaurantTable.qr_version + 1},
+        )
+        db.commit()
+    else:
+        table = db.get(RestaurantTable, table_id)
+    link, _ = table_link(table)
+    return {
+        "table_id": table.id,
+        "table_number": table.table_number,
+        "qr_version": table.qr_version,
+        "url": link,
+        "png_url": f"/tables/{table.id}/qr.png?v={table.qr_version}",
+    }
+
+
+# QR code PNG; a given version never changes, so clients may keep it
+@router.get("/{table_id}/qr.png")
+def get_table_qr_png(
+    table_id: int,
+    scope: RestaurantScope = Depends(table_scope),
+    db: Session = Depends(get_db),
+):
+    table = db.get(RestaurantTable, table_id)
+    # Don't hold a pooled connection while waiting on the renderer
+    release_db(db)
+    # Rendered in the QR process pool (or read from cache); this handler
+    # runs in the threadpool, so the wait never blocks the event loop
+    png = table_qr_png(table)
+    return Response(
+        png,
+        media_type="image/png",
+        headers={
+            "Cache-Control": "private, max-age=31536000, immutable",
+            "ETag": f'"{table.id}-{table.qr_version}"',
+        },
+    )
+
+
+# Every live table's QR code of a restaurant, as a streamed ZIP
+@router.get("/{restaurant_id}/qr-codes.zip")
+def get_restaurant_qr_zip(
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    tables = (
+        db.query(RestaurantTable)
+        .filter(RestaurantTable.restaurant_id == scope.restaurant_id)
+        .order_by(RestaurantTable.table_number)
+        .all()
+    )
+    filename = f"restaurant-{scope.restaurant_id}-qr-codes.zip"
+    return StreamingResponse(
+        qr_zip(tables),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,186 @@
+import secrets
+from typing import Literal
+
+from app.api.dependencies import (
+    RestaurantScope,
+    get_db,
+    restaurant_scope,
+    webhook_scope,
+)
+from app.api.routing import SessionRoute
+from app.core.broadcast import publish
+from app.crud.customer import decode_cursor, encode_cursor
+from app.db.writes import insert_row, update_row
+from app.models.webhook import WebhookDelivery, WebhookSubscription
+from app.schemas.webhook import (
+    WebhookCreate,
+    WebhookCreated,
+    WebhookDeliveryPage,
+    WebhookOut,
+    WebhookUpdate,
+)
+from app.services.webhooks import WAKE_TOPIC, UnsafeURLError, check_url
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+router = APIRouter(tags=["webhooks"], route_class=SessionRoute)
+
+
+def _check_url(url: str) -> None:
+    try:
+        check_url(url)
+    except UnsafeURLError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+
+_DELIVERY_STATES = {
+    "pending": (
+        WebhookDelivery.delivered_at.is_(None),
+        WebhookDelivery.failed_at.is_(None),
+    ),
+    "delivered": (WebhookDelivery.delivered_at.is_not(None),),
+    "failed": (WebhookDelivery.failed_at.is_not(None),),
+}
+
+
+# Subscribe an endpoint to some of the restaurant's events
+@router.post(
+    "/restaurants/{restaurant_id}/webhooks", response_model=WebhookCreated
+)
+def create_webhook(
+    webhook: WebhookCreate,
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    _check_url(str(webhook.url))
+    row = insert_row(
+        db,
+        WebhookSubscription,
+        restaurant_id=scope.restaurant_id,
+        url=str(webhook.url),
+        events=sorted(set(webhook.events)),
+        secret=secrets.token_hex(32),
+    )
+    db.commit()
+    return row
+
+
+# List the restaurant's subscriptions
+@router.get(
+    "/restaurants/{restaurant_id}/webhooks", response_model=list[WebhookOut]
+)
+def list_webhooks(
+    scope: RestaurantScope = Depends(restaurant_scope),
+    db: Session = Depends(get_db),
+):
+    return db.scalars(
+        select(WebhookSubscription)
+        .where(WebhookSubscription.restaurant_id == scope.restaurant_id)
+        .order_by(WebhookSubscription.id)
+    ).all()
+
+
+# Change the URL or events, or pause (is_active=false) a subscription
+@router.patch("/webhooks/{webhook_id}", response_model=WebhookOut)
+def update_webhook(
+    webhook_id: int,
+    webhook: WebhookUpdate,
+    scope: RestaurantScope = Depends(webhook_scope),
+    db: Session = Depends(get_db),
+):
+    values = webhook.model_dump(exclude_unset=True, exclude_none=True)
+    if "url" in values:
+        values["url"] = str(values["url"])
+        _check_url(values["url"])
+    if "events" in values:
+        values["events"] = sorted(set(values["events"]))
+    row = update_row(
+        db,
+        WebhookSubscription,
+        [WebhookSubscription.id == webhook_id],
+        values,
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="Webhook not found")
+    if values.get("is_active"):
+        # Deliveries held while paused go out now
+        publish(db, WAKE_TOPIC, "resumed", {})
+    db.commit()
+    return row
+
+
+# Unsubscribe; undelivered events are dropped with it
+@router.delete("/webhooks/{webhook_id}")
+def delete_webhook(
+    webhook_id: int,
+    scope: RestaurantScope = Depends(webhook_scope),
+    db: Session = Depends(get_db),
+):
+    db.execute(
+        delete(WebhookSubscription).where(WebhookSubscription.id == webhook_id)
+    )
+    db.commit()
+    return {"message": f"Webhook {webhook_id} deleted successfully"}
+
+
+# A subscription's deliveries, newest first, one keyset page at a time;
+# state=failed lists the dead letters
+@router.get(
+    "/webhooks/{webhook_id}/deliveries", response_model=WebhookDeliveryPage
+)
+def list_deliveries(
+    webhook_id: int,
+    state: Literal["pending", "delivered", "failed"] | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    scope: RestaurantScope = Depends(webhook_scope),
+    db: Session = Depends(get_db),
+):
+    stmt = select(WebhookDelivery).where(
+        WebhookDelivery.subscription_id == webhook_id
+    )
+    if state is not None:
+        stmt = stmt.where(*_DELIVERY_STATES[state])
+    if cursor:
+        try:
+            (before,) = decode_cursor(cursor, int)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(WebhookDelivery.id < before)
+    rows = db.scalars(
+        stmt.order_by(WebhookDelivery.id.desc()).limit(limit + 1)
+    ).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].id)
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+# Send dead letters again (all of them, or the ids given) from attempt one
+@router.post("/webhooks/{webhook_id}/redeliver")
+def redeliver(
+    webhook_id: int,
+    delivery_ids: list[int] | None = Body(default=None, embed=True),
+    scope: RestaurantScope = Depends(webhook_scope),
+    db: Session = Depends(get_db),
+):
+    stmt = update(WebhookDelivery).where(
+        WebhookDelivery.subscription_id == webhook_id,
+        WebhookDelivery.failed_at.is_not(None),
+    )
+    if delivery_ids is not None:
+        stmt = stmt.where(WebhookDelivery.id.in_(delivery_ids))
+    requeued = db.execute(
+        stmt.values(
+            failed_at=None,
+            attempts=0,
+            available_at=func.now(),
+            last_error=None,
+        )
+    ).rowcount
+    if requeued:
+        publish(db, WAKE_TOPIC, "redeliver", {})
+    db.commit()
+    return {"requeued": requeued}
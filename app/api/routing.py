@@ -0,0 +1,47 @@
+import functools
+import inspect
+
+from app.api.dependencies import release_db
+from fastapi.routing import APIRoute
+from sqlalchemy.orm import Session
+
+
+def _release_sessions(values) -> None:
+    for value in values:
+        if isinstance(value, Session):
+            release_db(value)
+
+
+def _releasing(endpoint):
+    # Same signature (and sync/async kind) as the endpoint, so FastAPI
+    # resolves its parameters and picks the threadpool exactly as before
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def handler(**values):
+            result = await endpoint(**values)
+            _release_sessions(values.values())
+            return result
+
+    else:
+
+        @functools.wraps(endpoint)
+        def handler(**values):
+            result = endpoint(**values)
+            _release_sessions(values.values())
+            return result
+
+    return handler
+
+
+class SessionRoute(APIRoute):
+    """Route whose handler gives back its DB connection when it returns.
+
+    FastAPI tears ``get_db`` down only after the response model has been
+    validated and serialized, so a plain route holds a pooled connection
+    through that as well. Here the handler's ``db`` session is released
+    (see ``release_db``) as soon as the handler returns.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _releasing(endpoint), **kwargs)
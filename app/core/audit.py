@@ -0,0 +1,188 @@
+import atexit
+import fcntl
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+
+from app.core.config import get_settings
+from app.db.session import get_engine
+from app.models.audit import AuditEntry
+from sqlalchemy.dialects.postgresql import insert
+
+logger = logging.getLogger(__name__)
+
+STOP_TIMEOUT_SECONDS = 10.0
+
+
+def _write(entries: list[dict]) -> int:
+    # Multi-row INSERTs of AUDIT_BATCH_SIZE rows, all in one transaction;
+    # ids already written (a replay after a crash) are skipped
+    size = get_settings().AUDIT_BATCH_SIZE
+    stmt = insert(AuditEntry).on_conflict_do_nothing(index_elements=["id"])
+    with get_engine().begin() as conn:
+        for start in range(0, len(entries), size):
+            end = start + size
+            conn.execute(stmt, entries[start:end])
+    return len(entries)
+
+
+def _dump(entry: dict) -> str:
+    return json.dumps(
+        {
+            **entry,
+            "id": str(entry["id"]),
+            "occurred_at": entry["occurred_at"].isoformat(),
+        }
+    )
+
+
+def _load(line: str) -> dict:
+    entry = json.loads(line)
+    entry["id"] = uuid.UUID(entry["id"])
+    entry["occurred_at"] = datetime.fromisoformat(entry["occurred_at"])
+    return entry
+
+
+class AuditLog:
+    """Write-behind buffer between captured changes and ``audit_log``.
+
+    Committed entries (see ``app.db.audit``) wait in memory; a daemon
+    thread per worker writes them every ``AUDIT_FLUSH_SECONDS``, or as
+    soon as ``AUDIT_BATCH_SIZE`` are waiting, so requests never wait on
+    the log. If they can't be written they are appended to the spill
+    file (``AUDIT_SPILL_PATH``, shared by the workers and locked), which
+    the next successful flush of any worker writes back and removes;
+    should that fail too, they wait in memory for the next flush.
+    """
+
+    def __init__(self):
+        self._pending: list[dict] = []
+        self._lock = threading.Lock()
+        # One flush at a time, whether from the thread or stop()
+        self._flushing = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._exit_hook = False
+
+    def record(self, entries: list[dict]) -> None:
+        with self._lock:
+            self._pending.extend(entries)
+            full = len(self._pending) >= get_settings().AUDIT_BATCH_SIZE
+            self._start()
+        if full:
+            self._wake.set()
+
+    def _start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="audit", daemon=True
+            )
+            self._thread.start()
+            if not self._exit_hook:
+                # Scripts and job runners exit without a lifespan
+                atexit.register(self.stop)
+                self._exit_hook = True
+
+    def stop(self) -> None:
+        """Stop the thread and write (or spill) whatever is still waiting."""
+        self._stopping.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(STOP_TIMEOUT_SECONDS)
+        self.flush()
+
+    def _run(self) -> None:
+        interval = get_settings().AUDIT_FLUSH_SECONDS
+        while not self._stopping.is_set():
+            self._wake.wait(interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Write waiting and spilled entries; returns how many were sent."""
+        with self._flushing:
+            with self._lock:
+                entries, self._pending = self._pending, []
+            written = 0
+            try:
+                written += self._replay()
+                if entries:
+                    written += _write(entries)
+            except Exception:
+                # Not only database errors: whatever stops the write, the
+                # entries are already taken off the queue and must be kept
+                logger.exception(
+                    "audit log write failed, spilling %s entries",
+                    len(entries),
+                )
+                try:
+                    self._spill(entries)
+                except Exception:
+                    # Keep them for the next flush rather than drop them
+                    logger.exception(
+                        "audit spill failed, keeping %s entries in memory",
+                        len(entries),
+                    )
+                    with self._lock:
+                        self._pending[:0] = entries
+            return written
+
+    def _spill(self, entries: list[dict]) -> None:
+        if not entries:
+            return
+        path = get_settings().AUDIT_SPILL_PATH
+        lines = "".join(_dump(entry) + "\n" for entry in entries)
+        while True:
+            with open(path, "a") as spill:
+                fcntl.flock(spill, fcntl.LOCK_EX)
+                if os.fstat(spill.fileno()).st_nlink == 0:
+                    # Replayed and removed while we waited for the lock
+                    continue
+                spill.write(lines)
+                spill.flush()
+                os.fsync(spill.fileno())
+                return
+
+    def _replay(self) -> int:
+        path = get_settings().AUDIT_SPILL_PATH
+        try:
+            spill = open(path)
+        except FileNotFoundError:
+            return 0
+        with spill:
+            try:
+                fcntl.flock(spill, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another worker is spilling or replaying it
+                return 0
+            if os.fstat(spill.fileno()).st_nlink == 0:
+                return 0
+            entries = []
+            for line in spill:
+                try:
+                    entries.append(_load(line))
+                except ValueError:
+                    # A write cut short by a crash
+                    logger.warning("skipping damaged audit spill line")
+            written = _write(entries) if entries else 0
+            os.unlink(path)
+        logger.info("replayed %s spilled audit entries", written)
+        return written
+
+
+audit_log = AuditLog()
+
+
+if __name__ == "__main__":
+    from app.db.base import load_models
+
+    # Write back a spill file left by workers that are no longer running
+    logging.basicConfig(level=logging.INFO)
+    load_models()
+    print(audit_log.flush())
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from contextlib import asynccontextmanager
+
+from app.db.session import get_engine
+from sqlalchemy import func
+from sqlalchemy import select as sql_select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "app_events"
+# NOTIFY payloads must stay under 8000 bytes
+MAX_PAYLOAD = 7_900
+POLL_SECONDS = 5.0
+RETRY_SECONDS = 2.0
+
+
+def publish(db: Session, topic: str, event: str, data: dict) -> None:
+    """Queue an event for every worker's subscribers to ``topic``.
+
+    Sent with ``pg_notify`` in the caller's transaction, so it is
+    delivered only if (and when) that transaction commits.
+    """
+    payload = json.dumps({"topic": topic, "event": event, "data": data})
+    if len(payload.encode()) > MAX_PAYLOAD:
+        # Too big to inline; clients refetch on a bare event
+        payload = json.dumps({"topic": topic, "event": event, "data": None})
+    db.execute(sql_select(func.pg_notify(CHANNEL, payload)))
+
+
+class Broadcaster:
+    """Fans Postgres notifications out to asyncio subscribers.
+
+    One daemon thread per worker holds a dedicated connection (detached
+    from the pool) that LISTENs on ``CHANNEL``; it starts with the first
+    subscriber.
+    """
+
+    def __init__(self):
+        self._subscribers: dict[str, set] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    @asynccontextmanager
+    async def subscribe(self, topic: str):
+        queue: asyncio.Queue = asyncio.Queue(maxsize=100)
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(topic, set()).add(subscriber)
+            self._start()
+        try:
+            yield queue
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(topic, set())
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    self._subscribers.pop(topic, None)
+
+    def _start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._listen, name="broadcast", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def _dispatch(self, raw: str) -> None:
+        message = json.loads(raw)
+        with self._lock:
+            subscribers = list(self._subscribers.get(message["topic"], ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(_offer, queue, message)
+
+    def _listen(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                conn = get_engine().raw_connection()
+                conn.detach()
+            except Exception:
+                logger.exception("broadcast listener could not connect")
+                self._stopping.wait(RETRY_SECONDS)
+                continue
+            try:
+                dbapi_conn = conn.dbapi_connection
+                dbapi_conn.autocommit = True
+                with dbapi_conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                while not self._stopping.is_set():
+                    ready, _, _ = select.select(
+                        [dbapi_conn], [], [], POLL_SECONDS
+                    )
+                    if not ready:
+                        continue
+                    dbapi_conn.poll()
+                    while dbapi_conn.notifies:
+                        notify = dbapi_conn.notifies.pop(0)
+                        self._dispatch(notify.payload)
+            except Exception:
+                logger.exception("broadcast listener failed, reconnecting")
+                self._stopping.wait(RETRY_SECONDS)
+            finally:
+                conn.close()
+
+
+def _offer(queue: asyncio.Queue, message: dict) -> None:
+    # A client too slow to drain its queue misses events, not the worker
+    if not queue.full():
+        queue.put_nowait(message)
+
+
+broadcaster = Broadcaster()
@@ -0,0 +1,158 @@
+import zlib
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+    "text/",
+)
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _Brotli:
+    def __init__(self, level: int):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _Zstd:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+# encoding -> (compressor, level per response, level for cached payloads);
+# listed in order of preference when the client accepts several equally
+CODECS = {}
+if brotli is not None:
+    CODECS["br"] = (_Brotli, 4, 9)
+if zstandard is not None:
+    CODECS["zstd"] = (_Zstd, 3, 12)
+CODECS["gzip"] = (_Gzip, 6, 9)
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Best supported encoding for an ``Accept-Encoding`` header."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip()] = quality
+
+    best, best_quality = None, 0.0
+    for name in CODECS:
+        quality = accepted.get(name, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def compress(data: bytes, encoding: str, cached: bool = False) -> bytes:
+    """One-shot compression; ``cached`` trades CPU for a smaller body."""
+    codec, level, cached_level = CODECS[encoding]
+    compressor = codec(cached_level if cached else level)
+    return compressor.compress(data) + compressor.finish()
+
+
+class _Responder(IdentityResponder):
+    def __init__(self, app: ASGIApp, minimum_size: int, encoding: str):
+        super().__init__(app, minimum_size)
+        codec, level, _ = CODECS[encoding]
+        self.content_encoding = encoding
+        self.compressor = codec(level)
+
+    async def send_with_compression(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get(
+                "content-type", ""
+            )
+            await super().send_with_compression(message)
+            if not content_type.startswith(COMPRESSIBLE_TYPES):
+                self.content_type_is_excluded = True
+            return
+        await super().send_with_compression(message)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        data = self.compressor.compress(body)
+        # Flush every chunk of a streamed body so the client sees it now
+        return data + (
+            self.compressor.flush() if more_body else self.compressor.finish()
+        )
+
+
+class CompressionMiddleware:
+    """Compress responses with the best of br, zstd and gzip the client
+    accepts.
+
+    Bodies under ``minimum_size``, non-text content types and responses
+    that already carry a ``Content-Encoding`` (such as precompressed cache
+    entries) are sent as they are. Streamed responses are compressed chunk
+    by chunk.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _Responder(self.app, self.minimum_size, encoding)
+        await responder(scope, receive, send)
@@ -6,9 +6,125 @@ class Settings(BaseSettings):
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_WAIT_SECONDS: float = 30.0
+    # A key still without a response after this long belongs to a request
+    # whose process died; the next retry claims it afresh
+    IDEMPOTENCY_LEASE_SECONDS: int = 300
+    # Per-worker pool; app.serve shrinks it to fit DB_MAX_CONNECTIONS
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Connection limit of the database (or pooler) across all workers
+    DB_MAX_CONNECTIONS: int = 60
+    # Kept free for migrations, cron jobs and admin sessions
+    DB_RESERVED_CONNECTIONS: int = 5
+    HOST: str = "0.0.0.0"
+    PORT: int = 8080
+    # Worker processes; defaults to the CPU count
+    WEB_CONCURRENCY: int | None = None
+    # Recycle a worker after this many requests (0 disables)
+    MAX_REQUESTS: int = 10_000
+    MAX_REQUESTS_JITTER: int = 1_000
+    OWNERSHIP_CACHE_TTL_SECONDS: int = 60
+    # Sub-requests allowed in one POST /batch, and how many of its reads
+    # may run at once (each on its own pooled connection)
+    BATCH_MAX_REQUESTS: int = 25
+    BATCH_READ_CONCURRENCY: int = 4
+    # A sub-request still waiting after this long is answered 504
+    BATCH_REQUEST_TIMEOUT_SECONDS: float = 10.0
+    # Responses smaller than this are sent uncompressed
+    COMPRESSION_MIN_SIZE: int = 1024
+    # Full-menu payloads kept in memory per worker
+    MENU_CACHE_SIZE: int = 256
+    # Run the background job runner in each web worker; with False, run
+    # ``python -m app.core.jobs`` for the durable queues instead
+    JOBS_RUN: bool = True
+    # Fallback poll of durable queues; commits normally wake them at once
+    JOBS_POLL_SECONDS: float = 10.0
+    # A claimed durable job is retried if not finished within this
+    JOBS_LEASE_SECONDS: int = 300
+    JOBS_KEEP_FINISHED_HOURS: int = 72
+    # Base of the links printed in table QR codes
+    PUBLIC_BASE_URL: str = "http://localhost:8080"
+    # Processes rendering QR PNGs, and where rendered PNGs are kept
+    # (default: a directory under the system temp dir)
+    QR_RENDER_WORKERS: int = 2
+    QR_CACHE_DIR: str | None = None
+    # Rendered PNGs also kept in memory per worker
+    QR_MEMORY_CACHE_SIZE: int = 512
+    # place_order only looks this far back for a table's open order, so
+    # older months' order partitions are never scanned; partition
+    # maintenance closes orders left open longer as abandoned
+    OPEN_ORDER_MAX_AGE_HOURS: int = 48
+    # Monthly order partitions created ahead, and the age in months after
+    # which the job runner's hourly maintenance archives a month (0 never)
+    PARTITION_MONTHS_AHEAD: int = 3
+    ARCHIVE_AFTER_MONTHS: int = 12
+    # Where archived months are written as gzipped CSV
+    ARCHIVE_DIR: str = "archive"
+    # Soft-deleted rows are purged this long after deletion, at most
+    # PURGE_MAX_BATCHES batches of PURGE_BATCH_SIZE per table per hour
+    SOFT_DELETE_RETENTION_DAYS: int = 30
+    PURGE_BATCH_SIZE: int = 500
+    PURGE_MAX_BATCHES: int = 20
+    # Audit entries are written every AUDIT_FLUSH_SECONDS or once
+    # AUDIT_BATCH_SIZE are waiting; the spill file keeps them while the
+    # database is unavailable
+    AUDIT_FLUSH_SECONDS: float = 2.0
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_SPILL_PATH: str = "audit-spill.jsonl"
+    # Webhook dispatch (run with the job runner): requests carry up to
+    # WEBHOOK_BATCH_SIZE events, each endpoint gets at most
+    # WEBHOOK_ENDPOINT_CONCURRENCY requests at once, over at most
+    # WEBHOOK_MAX_CONNECTIONS pooled connections per process
+    WEBHOOK_BATCH_SIZE: int = 50
+    WEBHOOK_ENDPOINT_CONCURRENCY: int = 2
+    WEBHOOK_MAX_CONNECTIONS: int = 50
+    WEBHOOK_TIMEOUT_SECONDS: float = 10.0
+    # Deliveries claimed per round; a claimed delivery is sent again if
+    # not settled within the lease
+    WEBHOOK_CLAIM_SIZE: int = 200
+    WEBHOOK_LEASE_SECONDS: int = 300
+    # Fallback poll; commits normally wake the dispatcher, which waits
+    # WEBHOOK_LINGER_SECONDS for more events to batch with
+    WEBHOOK_POLL_SECONDS: float = 10.0
+    WEBHOOK_LINGER_SECONDS: float = 0.25
+    # Retry backoff doubles from WEBHOOK_BACKOFF_SECONDS (jittered) up to
+    # the max; a delivery is dead-lettered after WEBHOOK_MAX_ATTEMPTS
+    WEBHOOK_BACKOFF_SECONDS: float = 5.0
+    WEBHOOK_MAX_BACKOFF_SECONDS: float = 3600.0
+    WEBHOOK_MAX_ATTEMPTS: int = 10
+    WEBHOOK_KEEP_DELIVERED_HOURS: int = 72
+    # Endpoints must resolve to public addresses, checked on subscribing
+    # and before every send; enable only to try a local receiver
+    WEBHOOK_ALLOW_PRIVATE_ADDRESSES: bool = False
+    # How far ahead reservations can be made
+    RESERVATION_HORIZON_DAYS: int = 90
+    # How far in the past a booking (e.g. a walk-in entered late) may start
+    RESERVATION_START_GRACE_MINUTES: int = 15
+    # Pool connections opened during startup warm-up
+    WARMUP_POOL_CONNECTIONS: int = 5
+    # Router modules to mount (see app.main.ROUTERS); None mounts them all
+    ENABLED_ROUTERS: set[str] | None = None
 
     class Config:
         env_file = ".env"
 
 
-settings = Settings()
+_settings: Settings | None = None
+
+
+def get_settings() -> Settings:
+    """Settings for this process, read from the environment on first use."""
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
+
+
+def use_settings(settings: Settings) -> Settings:
+    """Make ``settings`` the process-wide settings (see ``create_app``)."""
+    global _settings
+    _settings = settings
+    return settings
@@ -0,0 +1,258 @@
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import get_settings
+from app.core.security import decode_token
+from app.db.session import SessionLocal
+from app.models.idempotency import IdempotencyKey
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+
+HEADER = "Idempotency-Key"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+POLL_SECONDS = 0.05
+# Response headers not replayed; length/encoding are recomputed
+_UNREPLAYED_HEADERS = {
+    b"content-length",
+    b"content-encoding",
+    b"transfer-encoding",
+}
+
+
+def _stale():
+    # Keys past their TTL, and claims abandoned without a response
+    settings = get_settings()
+    now = datetime.now(timezone.utc)
+    return or_(
+        IdempotencyKey.created_at
+        < now - timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+        IdempotencyKey.status_code.is_(None)
+        & (
+            IdempotencyKey.created_at
+            < now - timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+        ),
+    )
+
+
+def _claim(user_id: int, key: str, fingerprint: str):
+    """Insert the key, or return the row of an earlier request with it.
+
+    Returns ``(claimed_at, None)`` when this request now owns the key, and
+    ``(None, row)`` otherwise; ``claimed_at`` identifies this claim to
+    ``_store`` and ``_release``.
+    """
+    with SessionLocal() as db:
+        db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                _stale(),
+            )
+        )
+        claimed_at = db.execute(
+            insert(IdempotencyKey)
+            .values(user_id=user_id, key=key, fingerprint=fingerprint)
+            .on_conflict_do_nothing()
+            .returning(IdempotencyKey.created_at)
+        ).scalar()
+        db.commit()
+        if claimed_at is not None:
+            return claimed_at, None
+        return (
+            None,
+            db.execute(
+                select(IdempotencyKey).where(
+                    IdempotencyKey.user_id == user_id,
+                    IdempotencyKey.key == key,
+                )
+            ).scalar_one_or_none(),
+        )
+
+
+def _lookup(user_id: int, key: str):
+    with SessionLocal() as db:
+        return db.execute(
+            select(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id, IdempotencyKey.key == key
+            )
+        ).scalar_one_or_none()
+
+
+def _mine(user_id: int, key: str, claimed_at: datetime):
+    # A request outliving its lease must not touch the retry's claim
+    return (
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key,
+        IdempotencyKey.created_at == claimed_at,
+    )
+
+
+def _store(
+    user_id: int,
+    key: str,
+    claimed_at: datetime,
+    response: Response,
+    body: bytes,
+):
+    # Pairs rather than a dict, so repeated headers (set-cookie) survive
+    headers = [
+        [name.decode("latin-1"), value.decode("latin-1")]
+        for name, value in response.raw_headers
+        if name not in _UNREPLAYED_HEADERS
+    ]
+    with SessionLocal() as db:
+        db.execute(
+            update(IdempotencyKey)
+            .where(*_mine(user_id, key, claimed_at))
+            .values(
+                status_code=response.status_code, headers=headers, body=body
+            )
+        )
+        db.commit()
+
+
+def _release(user_id: int, key: str, claimed_at: datetime):
+    with SessionLocal() as db:
+        db.execute(
+            delete(IdempotencyKey).where(*_mine(user_id, key, claimed_at))
+        )
+        db.commit()
+
+
+def prune_idempotency_keys() -> int:
+    """Delete expired keys and abandoned claims; run by housekeeping."""
+    with SessionLocal() as db:
+        deleted = db.execute(delete(IdempotencyKey).where(_stale())).rowcount
+        db.commit()
+    return deleted
+
+
+def _with_headers(response: Response, headers) -> Response:
+    # Keeps repeated headers, which ``headers=`` would collapse
+    response.raw_headers = [
+        *(
+            (name, value)
+            for name, value in headers
+            if name.lower() not in _UNREPLAYED_HEADERS
+        ),
+        (b"content-length", str(len(response.body)).encode()),
+    ]
+    return response
+
+
+def _replay(record: IdempotencyKey) -> Response:
+    stored = record.headers or []
+    if isinstance(stored, dict):
+        # Stored before headers were kept as pairs
+        stored = stored.items()
+    response = _with_headers(
+        Response(content=record.body, status_code=record.status_code),
+        [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in stored
+        ],
+    )
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    """Run a write at most once per (user, ``Idempotency-Key``).
+
+    The first request claims the key with an ``INSERT ... ON CONFLICT DO
+    NOTHING`` and stores its response; retries replay that response without
+    reaching the route. A duplicate that arrives while the first is still
+    running waits for it instead of executing. Keys live in the database so
+    retries landing on another worker are covered too.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        key = request.headers.get(HEADER)
+        if not key or request.method not in WRITE_METHODS:
+            return await call_next(request)
+
+        auth = request.headers.get("Authorization", "")
+        payload = decode_token(auth[7:]) if auth[:7] == "Bearer " else None
+        if not payload:
+            # Unauthenticated requests are rejected by the route anyway
+            return await call_next(request)
+        if len(key) > 255:
+            return JSONResponse(
+                {"detail": f"{HEADER} must be at most 255 characters"},
+                status_code=400,
+            )
+
+        user_id = int(payload["sub"])
+        body = await request.body()
+        fingerprint = hashlib.sha256(
+            b"\0".join(
+                [
+                    request.method.encode(),
+                    request.url.path.encode(),
+                    request.url.query.encode(),
+                    body,
+                ]
+            )
+        ).hexdigest()
+
+        claimed_at, record = await run_in_threadpool(
+            _claim, user_id, key, fingerprint
+        )
+        if record is not None:
+            return await self._previous(record, user_id, key, fingerprint)
+
+        try:
+            response = await call_next(request)
+            content = b"".join(
+                [chunk async for chunk in response.body_iterator]
+            )
+        except BaseException:
+            await run_in_threadpool(_release, user_id, key, claimed_at)
+            raise
+
+        if response.status_code >= 500:
+            # Let the client retry server errors for real
+            await run_in_threadpool(_release, user_id, key, claimed_at)
+        else:
+            await run_in_threadpool(
+                _store, user_id, key, claimed_at, response, content
+            )
+        return _with_headers(
+            Response(
+                content=content,
+                status_code=response.status_code,
+                background=response.background,
+            ),
+            response.raw_headers,
+        )
+
+    async def _previous(self, record, user_id, key, fingerprint):
+        if record.fingerprint != fingerprint:
+            return JSONResponse(
+                {"detail": f"{HEADER} was used for a different request"},
+                status_code=422,
+            )
+
+        deadline = time.monotonic() + get_settings().IDEMPOTENCY_WAIT_SECONDS
+        while record is not None and record.status_code is None:
+            if time.monotonic() > deadline:
+                return JSONResponse(
+                    {"detail": "Original request is still in progress"},
+                    status_code=409,
+                )
+            await asyncio.sleep(POLL_SECONDS)
+            record = await run_in_threadpool(_lookup, user_id, key)
+
+        if record is None:
+            # The first attempt failed and gave the key up
+            return JSONResponse(
+                {"detail": "Original request failed, retry it"},
+                status_code=409,
+            )
+        return _replay(record)
@@ -0,0 +1,489 @@
+import asyncio
+import importlib
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable
+
+from app.core.broadcast import broadcaster, publish
+from app.core.config import get_settings
+from app.core.idempotency import prune_idempotency_keys
+from app.core.webhooks import dispatcher
+from app.db.session import SessionLocal, get_engine
+from app.models.job import HousekeepingRun, Job
+from app.services.partitions import run_maintenance
+from app.services.purge import purge_deleted
+from app.services.webhooks import prune_deliveries
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Modules whose jobs register themselves on import, like MODEL_MODULES
+JOB_MODULES = ("app.services.payments", "app.services.reports")
+# Broadcast topic that wakes a durable queue's workers on commit
+WAKE_TOPIC = "jobs"
+MAX_BACKOFF_SECONDS = 3600
+# Each housekeeping task runs this often across the whole deployment;
+# every process checks whether one is due this often
+PRUNE_INTERVAL_SECONDS = 3600
+HOUSEKEEPING_CHECK_SECONDS = 60
+# Housekeeping runs in one process at a time under this advisory lock
+_HOUSEKEEPING_LOCK_KEY = 0x686B6565
+
+
+@dataclass(frozen=True)
+class QueueSpec:
+    name: str
+    # Jobs of this queue run at most this many at a time per process
+    concurrency: int = 1
+    # Durable queues live in the jobs table; the rest in memory
+    durable: bool = False
+    # In-memory queues refuse new jobs beyond this (see QueueFull)
+    capacity: int = 1000
+
+
+QUEUES = (
+    QueueSpec("default", concurrency=4, capacity=1000),
+    QueueSpec("payments", concurrency=2, durable=True),
+    QueueSpec("reports", concurrency=1, durable=True),
+)
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    name: str
+    queue: str
+    func: Callable[[Session, dict], None]
+    max_attempts: int
+
+
+class QueueFull(RuntimeError):
+    """An in-memory queue is at capacity; the caller must shed the job."""
+
+
+_jobs: dict[str, JobSpec] = {}
+_queues = {spec.name: spec for spec in QUEUES}
+
+
+def job(name: str, queue: str = "default", max_attempts: int = 5):
+    """Register ``func(db, payload)`` as the job ``name``.
+
+    The runner opens ``db`` and commits it after ``func`` returns; for a
+    durable job that commit also marks the job finished, so database
+    work done by the job happens exactly once.
+    """
+    if queue not in _queues:
+        raise ValueError(f"Unknown job queue {queue!r}")
+
+    def register(fn):
+        _jobs[name] = JobSpec(name, queue, fn, max_attempts)
+        return fn
+
+    return register
+
+
+def load_jobs() -> None:
+    for module in JOB_MODULES:
+        importlib.import_module(module)
+
+
+def enqueue(db: Session, name: str, payload: dict) -> None:
+    """Add a durable job in the caller's transaction (an outbox).
+
+    The job row and its wake-up notification commit or roll back with
+    the caller's own writes; nothing runs until then.
+    """
+    spec = _jobs[name]
+    if not _queues[spec.queue].durable:
+        raise ValueError(f"Job {name!r} is not on a durable queue")
+    db.add(Job(queue=spec.queue, name=name, payload=payload))
+    publish(db, WAKE_TOPIC, spec.queue, {})
+
+
+def _backoff(attempts: int) -> float:
+    return min(2**attempts, MAX_BACKOFF_SECONDS)
+
+
+@dataclass
+class _QueueState:
+    spec: QueueSpec
+    items: asyncio.Queue | None = None
+    wake: asyncio.Event | None = None
+    # enqueue id -> monotonic enqueue time of in-memory jobs not yet
+    # started (including those waiting out a retry backoff)
+    waiting: dict[int, float] = field(default_factory=dict)
+    running: int = 0
+    completed: int = 0
+    retried: int = 0
+    failed: int = 0
+    rejected: int = 0
+
+
+class JobRunner:
+    """Runs registered jobs on asyncio worker tasks.
+
+    Each queue gets ``concurrency`` workers. Job functions are
+    synchronous and run in threads, each with its own session.
+    In-memory queues take jobs from ``submit`` (bounded by ``capacity``);
+    durable queues claim rows from the jobs table with ``FOR UPDATE SKIP
+    LOCKED`` under a lease, so any number of processes can share them
+    and a job whose process died is picked up again when its lease ends.
+    """
+
+    def __init__(self, queues=QUEUES):
+        self._states = {spec.name: _QueueState(spec) for spec in queues}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    async def start(self, durable_only: bool = False) -> None:
+        load_jobs()
+        self._loop = asyncio.get_running_loop()
+        durable = False
+        for state in self._states.values():
+            spec = state.spec
+            if spec.durable:
+                durable = True
+                state.wake = asyncio.Event()
+                worker = self._durable_worker
+            elif durable_only:
+                continue
+            else:
+                state.items = asyncio.Queue()
+                worker = self._memory_worker
+            for _ in range(spec.concurrency):
+                self._tasks.append(asyncio.create_task(worker(state)))
+        if durable:
+            self._tasks.append(asyncio.create_task(self._listen()))
+            self._tasks.append(asyncio.create_task(self._prune()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._loop = None
+        dropped = sum(len(state.waiting) for state in self._states.values())
+        if dropped:
+            logger.warning("dropped %s in-memory jobs on shutdown", dropped)
+
+    def submit(self, name: str, payload: dict) -> None:
+        """Queue an in-memory job; safe to call from any thread.
+
+        Raises ``QueueFull`` when the job's queue is at capacity. The job
+        is lost if the process stops first, so use ``enqueue`` for work
+        that must happen.
+        """
+        spec = _jobs[name]
+        state = self._states[spec.queue]
+        if state.spec.durable:
+            raise ValueError(f"Job {name!r} is on a durable queue")
+        if self._loop is None:
+            raise RuntimeError("Job runner is not running")
+        with self._lock:
+            if len(state.waiting) >= state.spec.capacity:
+                state.rejected += 1
+                raise QueueFull(f"Job queue {spec.queue!r} is full")
+            job_id = next(self._ids)
+            state.waiting[job_id] = time.monotonic()
+        self._loop.call_soon_threadsafe(
+            state.items.put_nowait, (job_id, name, payload, 1)
+        )
+
+    def _run(self, spec: JobSpec, payload: dict, job_id=None) -> None:
+        with SessionLocal() as db:
+            spec.func(db, payload)
+            if job_id is not None:
+                db.execute(
+                    update(Job)
+                    .where(Job.id == job_id)
+                    .values(finished_at=func.now())
+                )
+            db.commit()
+
+    async def _memory_worker(self, state: _QueueState) -> None:
+        while True:
+            job_id, name, payload, attempt = await state.items.get()
+            spec = _jobs[name]
+            with self._lock:
+                state.waiting.pop(job_id, None)
+                state.running += 1
+            try:
+                await asyncio.to_thread(self._run, spec, payload)
+            except Exception:
+                logger.exception("job %s failed (attempt %s)", name, attempt)
+                with self._lock:
+                    if attempt < spec.max_attempts:
+                        state.retried += 1
+                        state.waiting[job_id] = time.monotonic()
+                        self._loop.call_later(
+                            _backoff(attempt),
+                            state.items.put_nowait,
+                            (job_id, name, payload, attempt + 1),
+                        )
+                    else:
+                        state.failed += 1
+            else:
+                state.completed += 1
+            finally:
+                with self._lock:
+                    state.running -= 1
+
+    def _claim(self, queue: str) -> Job | None:
+        lease = timedelta(seconds=get_settings().JOBS_LEASE_SECONDS)
+        due = (
+            select(Job.id)
+            .where(
+                Job.queue == queue,
+                Job.finished_at.is_(None),
+                Job.failed_at.is_(None),
+                Job.available_at <= func.now(),
+            )
+            .order_by(Job.available_at, Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        with SessionLocal(expire_on_commit=False) as db:
+            claimed = db.execute(
+                update(Job)
+                .where(Job.id == due)
+                .values(
+                    attempts=Job.attempts + 1,
+                    available_at=func.now() + lease,
+                )
+                .returning(Job)
+            ).scalar()
+            db.commit()
+        return claimed
+
+    def _run_durable(self, state: _QueueState) -> bool:
+        claimed = self._claim(state.spec.name)
+        if claimed is None:
+            return False
+        spec = _jobs.get(claimed.name)
+        with self._lock:
+            state.running += 1
+        try:
+            if spec is None:
+                raise LookupError(f"No job registered as {claimed.name!r}")
+            self._run(spec, claimed.payload, claimed.id)
+        except Exception as exc:
+            logger.exception(
+                "job %s #%s failed (attempt %s)",
+                claimed.name,
+                claimed.id,
+                claimed.attempts,
+            )
+            exhausted = spec is None or claimed.attempts >= spec.max_attempts
+            values = {"last_error": repr(exc)[:1000]}
+            if exhausted:
+                values["failed_at"] = func.now()
+            else:
+                values["available_at"] = func.now() + timedelta(
+                    seconds=_backoff(claimed.attempts)
+                )
+            with SessionLocal() as db:
+                db.execute(
+                    update(Job).where(Job.id == claimed.id).values(**values)
+                )
+                db.commit()
+            with self._lock:
+                if exhausted:
+                    state.failed += 1
+                else:
+                    state.retried += 1
+        else:
+            with self._lock:
+                state.completed += 1
+        finally:
+            with self._lock:
+                state.running -= 1
+        return True
+
+    async def _durable_worker(self, state: _QueueState) -> None:
+        poll = get_settings().JOBS_POLL_SECONDS
+        while True:
+            state.wake.clear()
+            try:
+                claimed = await asyncio.to_thread(self._run_durable, state)
+            except Exception:
+                logger.exception("job queue %s unavailable", state.spec.name)
+                claimed = False
+            if not claimed:
+                try:
+                    await asyncio.wait_for(state.wake.wait(), poll)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _listen(self) -> None:
+        async with broadcaster.subscribe(WAKE_TOPIC) as wake:
+            while True:
+                message = await wake.get()
+                state = self._states.get(message["event"])
+                if state is not None and state.wake is not None:
+                    state.wake.set()
+
+    async def _prune(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(run_housekeeping)
+            except Exception:
+                logger.exception("housekeeping unavailable")
+            await asyncio.sleep(HOUSEKEEPING_CHECK_SECONDS)
+
+    def metrics(self) -> dict:
+        """Per-queue depth, age of the oldest waiting job and counters.
+
+        Durable queues report the jobs table (all processes); counters
+        and ``running`` are for this process only.
+        """
+        now = time.monotonic()
+        out = {}
+        with self._lock:
+            for name, state in self._states.items():
+                out[name] = {
+                    "durable": state.spec.durable,
+                    "concurrency": state.spec.concurrency,
+                    "depth": len(state.waiting),
+                    "oldest_age_seconds": round(
+                        now - min(state.waiting.values(), default=now), 3
+                    ),
+                    "running": state.running,
+                    "completed": state.completed,
+                    "retried": state.retried,
+                    "failed": state.failed,
+                    "rejected": state.rejected,
+                }
+        durable = [name for name, row in out.items() if row["durable"]]
+        if durable:
+            with SessionLocal() as db:
+                rows = db.execute(
+                    select(
+                        Job.queue,
+                        func.count(),
+                        func.extract(
+                            "epoch", func.now() - func.min(Job.created_at)
+                        ),
+                    )
+                    .where(
+                        Job.queue.in_(durable),
+                        Job.finished_at.is_(None),
+                        Job.failed_at.is_(None),
+                    )
+                    .group_by(Job.queue)
+                ).all()
+            for queue, depth, age in rows:
+                out[queue]["depth"] = depth
+                out[queue]["oldest_age_seconds"] = round(float(age), 3)
+        return out
+
+
+def prune_finished() -> int:
+    """Delete durable jobs finished longer ago than the retention."""
+    keep = timedelta(hours=get_settings().JOBS_KEEP_FINISHED_HOURS)
+    with SessionLocal() as db:
+        deleted = db.execute(
+            delete(Job).where(Job.finished_at < func.now() - keep)
+        ).rowcount
+        db.commit()
+    return deleted
+
+
+# Run hourly by whichever process with durable queues gets to them first
+HOUSEKEEPING = (
+    prune_finished,
+    prune_deliveries,
+    prune_idempotency_keys,
+    run_maintenance,
+    purge_deleted,
+)
+
+
+def run_housekeeping() -> list[str]:
+    """Run the ``HOUSEKEEPING`` tasks that are due; return their names.
+
+    Every process with durable queues calls this each minute. Only the
+    one holding the advisory lock goes on, and last runs are kept in
+    ``housekeeping_runs``, so each task runs about hourly however many
+    workers there are and however often they restart.
+    """
+    interval = timedelta(seconds=PRUNE_INTERVAL_SECONDS)
+    with get_engine().connect() as conn:
+        locked = conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"),
+            {"key": _HOUSEKEEPING_LOCK_KEY},
+        ).scalar()
+        if not locked:
+            conn.rollback()
+            return []
+        try:
+            recent = set(
+                conn.execute(
+                    select(HousekeepingRun.task).where(
+                        HousekeepingRun.last_run_at > func.now() - interval
+                    )
+                ).scalars()
+            )
+            conn.commit()
+            ran = []
+            for task in HOUSEKEEPING:
+                name = task.__name__
+                if name in recent:
+                    continue
+                try:
+                    task()
+                except Exception:
+                    # Counted as run: a broken task waits for the next hour
+                    logger.exception("housekeeping %s failed", name)
+                run = insert(HousekeepingRun).values(
+                    task=name, last_run_at=func.now()
+                )
+                conn.execute(
+                    run.on_conflict_do_update(
+                        index_elements=["task"],
+                        set_={"last_run_at": run.excluded.last_run_at},
+                    )
+                )
+                conn.commit()
+                ran.append(name)
+            return ran
+        finally:
+            conn.rollback()
+            conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"),
+                {"key": _HOUSEKEEPING_LOCK_KEY},
+            )
+            conn.commit()
+
+
+runner = JobRunner()
+
+
+async def _run_standalone() -> None:
+    await runner.start(durable_only=True)
+    await dispatcher.start()
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    # Durable queues (and webhook dispatch) only, for deployments that set
+    # JOBS_RUN=false on the web workers; in-memory jobs always run in the
+    # process submitting them
+    from app.core import jobs
+    from app.db.base import load_models
+
+    logging.basicConfig(level=logging.INFO)
+    load_models()
+    # Via the package module, where job modules register themselves
+    asyncio.run(jobs._run_standalone())
@@ -0,0 +1,40 @@
+import threading
+import time
+
+from app.core.config import get_settings
+
+
+class OwnershipCache:
+    """Per-user set of owned, non-deleted restaurant ids.
+
+    Entries are dropped by ``invalidate`` whenever this process creates,
+    soft-deletes or restores a restaurant, and expire after
+    ``OWNERSHIP_CACHE_TTL_SECONDS`` so changes made by other workers are
+    picked up too. Until then reads may see a restaurant another worker
+    deleted; writes re-read ownership with their scope query instead
+    (see ``app.api.dependencies``).
+    """
+
+    def __init__(self):
+        self._entries: dict[int, tuple[float, frozenset[int]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> frozenset[int] | None:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, user_id: int, restaurant_ids) -> frozenset[int]:
+        ids = frozenset(restaurant_ids)
+        expires = time.monotonic() + get_settings().OWNERSHIP_CACHE_TTL_SECONDS
+        with self._lock:
+            self._entries[user_id] = (expires, ids)
+        return ids
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+owned_restaurants = OwnershipCache()
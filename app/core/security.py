@@ -1,7 +1,11 @@
+import base64
+import hashlib
+import hmac
+import secrets
 from datetime import datetime, timedelta
 from typing import Optional
 
-from app.core.config import settings
+from app.core.config import get_settings
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
@@ -16,9 +20,10 @@ def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
 
-def create_access_token(
-    subject: dict, expires_minutes: int = settings.ACCESS_TOKEN_EXPIRE_MINUTES
-):
+def create_access_token(subject: dict, expires_minutes: int | None = None):
+    settings = get_settings()
+    if expires_minutes is None:
+        expires_minutes = settings.ACCESS_TOKEN_EXPIRE_MINUTES
     expire = datetime.utcnow() + timedelta(minutes=expires_minutes)
     to_encode = subject.copy()
     to_encode.update({"exp": expire})
@@ -28,9 +33,33 @@ def create_access_token(
 
 
 def decode_token(token: str) -> Optional[dict]:
+    settings = get_settings()
     try:
         return jwt.decode(
             token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
         )
     except JWTError:
         return None
+
+
+def create_refresh_token() -> tuple[str, str]:
+    """A random refresh token and the digest to store for it."""
+    token = secrets.token_urlsafe(32)
+    return token, hash_refresh_token(token)
+
+
+def hash_refresh_token(token: str) -> str:
+    # The token is 256 random bits, so a fast digest is enough here
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def sign_payload(payload: str) -> str:
+    """Short URL-safe HMAC of ``payload``, for links printed on paper."""
+    digest = hmac.new(
+        get_settings().JWT_SECRET.encode(), payload.encode(), hashlib.sha256
+    ).digest()
+    return base64.urlsafe_b64encode(digest[:16]).rstrip(b"=").decode()
+
+
+def verify_payload(payload: str, signature: str) -> bool:
+    return hmac.compare_digest(sign_payload(payload), signature)
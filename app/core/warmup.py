@@ -0,0 +1,122 @@
+import logging
+import time
+from datetime import datetime, timezone
+
+from app.api.dependencies import _owned_ids
+from app.core.security import pwd_context
+from app.db.session import SessionLocal, get_engine
+from app.models.category import Category
+from app.models.menu import MenuItem
+from app.models.order import Order
+from app.models.restaurant import Restaurant
+from app.models.table import RestaurantTable
+from app.models.user import User
+from app.services.option_rules import compile_rules
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import configure_mappers
+
+logger = logging.getLogger(__name__)
+
+# Matches nothing; only the statement shape matters for the compiled cache
+_NO_ID = -1
+
+
+def _open_pool(connections: int) -> None:
+    # Check out several connections at once so the pool really opens them
+    engine = get_engine()
+    held = []
+    try:
+        for _ in range(connections):
+            held.append(engine.connect())
+    finally:
+        for conn in held:
+            conn.close()
+
+
+def _compile_hot_queries() -> None:
+    """Run the routers' hottest query shapes once to fill the SQL cache.
+
+    Each query mirrors one issued by a handler (same entities, joins and
+    filters) so later requests hit the engine's compiled cache.
+    """
+    with SessionLocal() as db:
+        db.query(User).filter(User.id == _NO_ID).first()
+        # restaurant_scope on an ownership cache miss
+        db.execute(select(User, _owned_ids).where(User.id == _NO_ID)).first()
+        db.execute(select(User).where(User.id == _NO_ID)).first()
+        db.query(User).filter(User.email == "").first()
+        db.query(Restaurant).filter(
+            Restaurant.id == _NO_ID, Restaurant.user_id == _NO_ID
+        ).first()
+        db.query(Restaurant).filter(Restaurant.user_id == _NO_ID).all()
+        db.query(RestaurantTable).join(Restaurant).filter(
+            Restaurant.id == _NO_ID,
+            Restaurant.user_id == _NO_ID,
+        ).all()
+        db.query(RestaurantTable).filter(
+            RestaurantTable.id == _NO_ID,
+            RestaurantTable.restaurant_id == _NO_ID,
+        ).first()
+        db.query(Category).join(Restaurant).filter(
+            Restaurant.id == _NO_ID,
+            Restaurant.user_id == _NO_ID,
+        ).all()
+        db.query(MenuItem).join(Category).join(Restaurant).filter(
+            Category.id == _NO_ID,
+            Restaurant.user_id == _NO_ID,
+        ).all()
+        # place_order on a menu rules cache miss
+        compile_rules(db, _NO_ID)
+        db.query(Order).filter(
+            Order.table_id == _NO_ID,
+            Order.restaurant_id == _NO_ID,
+            Order.is_completed.is_(False),
+            Order.created_at >= datetime.now(timezone.utc),
+        ).with_for_update().first()
+
+
+def _build_schemas(app: FastAPI) -> None:
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or route.response_field is None:
+            continue
+        model = route.response_model
+        args = getattr(model, "__args__", None) or (model,)
+        for arg in args:
+            if isinstance(arg, type) and issubclass(arg, BaseModel):
+                arg.model_rebuild()
+    # Also builds the JSON schema of every body and response model
+    app.openapi()
+
+
+def warm_up(app: FastAPI) -> None:
+    """Pay first-request costs before the worker reports ready."""
+    settings = app.state.settings
+    steps = [
+        (
+            "pool",
+            lambda: _open_pool(
+                min(settings.WARMUP_POOL_CONNECTIONS, settings.DB_POOL_SIZE)
+            ),
+        ),
+        ("mappers", configure_mappers),
+        ("queries", _compile_hot_queries),
+        ("schemas", lambda: _build_schemas(app)),
+        # Loads the bcrypt backend; the hash itself is thrown away
+        ("bcrypt", pwd_context.dummy_verify),
+    ]
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            # A failed step only costs its first-request latency later
+            logger.exception("warm-up step %s failed", name)
+        else:
+            logger.info(
+                "warm-up %s took %.0f ms",
+                name,
+                (time.perf_counter() - started) * 1000,
+            )
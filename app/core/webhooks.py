@@ -0,0 +1,359 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from app.core.broadcast import broadcaster
+from app.core.config import get_settings
+from app.db.session import get_engine
+from app.models.webhook import WebhookDelivery, WebhookSubscription
+from app.services.webhooks import (
+    SIGNATURE_HEADER,
+    TIMESTAMP_HEADER,
+    WAKE_TOPIC,
+    UnsafeURLError,
+    public_address,
+    sign,
+)
+from sqlalchemy import bindparam, func, select, update
+
+logger = logging.getLogger(__name__)
+
+# In-flight sends get this long to finish when the dispatcher stops;
+# the rest are sent again once their lease runs out
+STOP_GRACE_SECONDS = 5.0
+
+
+class _PinnedTransport(httpx.AsyncHTTPTransport):
+    """Connects to the public address checked for each request's host.
+
+    The URL's host is swapped for that address, while the Host header
+    and TLS server name (so certificate checks) keep the name.
+    """
+
+    async def handle_async_request(self, request: httpx.Request):
+        host = request.url.host
+        address = await asyncio.to_thread(
+            public_address, host, request.url.port
+        )
+        request.url = request.url.copy_with(host=address)
+        request.extensions = {**request.extensions, "sni_hostname": host}
+        return await super().handle_async_request(request)
+
+
+@dataclass
+class _Batch:
+    subscription_id: int
+    url: str
+    secret: str
+    # (id, event, payload, created_at, attempts) of each delivery
+    deliveries: list[tuple]
+
+
+def _backoff(attempts: int) -> float:
+    # Exponential with "equal jitter": at least half the step, so
+    # retries neither bunch up nor come back at once
+    settings = get_settings()
+    step = min(
+        settings.WEBHOOK_BACKOFF_SECONDS * 2 ** (attempts - 1),
+        settings.WEBHOOK_MAX_BACKOFF_SECONDS,
+    )
+    return step / 2 + random.uniform(0, step / 2)
+
+
+def _body(batch: _Batch) -> bytes:
+    return json.dumps(
+        {
+            "events": [
+                {
+                    "id": delivery_id,
+                    "event": event,
+                    "created_at": created_at.isoformat(),
+                    "data": payload,
+                }
+                for delivery_id, event, payload, created_at, _ in (
+                    batch.deliveries
+                )
+            ]
+        },
+        separators=(",", ":"),
+    ).encode()
+
+
+class WebhookDispatcher:
+    """Sends owed webhook deliveries from asyncio tasks.
+
+    Due deliveries are claimed from ``webhook_deliveries`` with ``FOR
+    UPDATE SKIP LOCKED`` under a lease, like durable jobs, so any number
+    of processes can share them. Each endpoint's deliveries are
+    coalesced into batches of up to ``WEBHOOK_BATCH_SIZE`` events per
+    signed POST, sent over one pooled ``httpx.AsyncClient``, with at
+    most ``WEBHOOK_ENDPOINT_CONCURRENCY`` requests in flight per
+    endpoint; a claim keeps no more batches than an endpoint has free
+    slots (one at its limit is left out), so a slow endpoint holds up
+    nobody else and no batch waits out its lease unsent. Connections go
+    to the public address checked for the host, never a re-resolved
+    one. Failed batches are retried with jittered
+    backoff and dead-lettered (``failed_at``) after
+    ``WEBHOOK_MAX_ATTEMPTS``.
+    """
+
+    def __init__(self):
+        self._client: httpx.AsyncClient | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._sends: set[asyncio.Task] = set()
+        self._wake: asyncio.Event | None = None
+        # subscription id -> batches claimed and not yet settled
+        self._in_flight: dict[int, int] = {}
+        self._limits: dict[int, asyncio.Semaphore] = {}
+        self._counts = {"sent": 0, "delivered": 0, "retried": 0, "dead": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._client is not None
+
+    async def start(self) -> None:
+        settings = get_settings()
+        self._client = httpx.AsyncClient(
+            timeout=settings.WEBHOOK_TIMEOUT_SECONDS,
+            transport=_PinnedTransport(
+                limits=httpx.Limits(
+                    max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+                    max_keepalive_connections=(
+                        settings.WEBHOOK_MAX_CONNECTIONS
+                    ),
+                )
+            ),
+            headers={"User-Agent": "restaurant-webhooks"},
+            follow_redirects=False,
+        )
+        self._wake = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._dispatch()),
+            asyncio.create_task(self._listen()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        if self._sends:
+            _, pending = await asyncio.wait(
+                self._sends, timeout=STOP_GRACE_SECONDS
+            )
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        await self._client.aclose()
+        self._client = None
+
+    def _claim(self, in_flight: dict[int, int]) -> list[_Batch]:
+        # At most each endpoint's free slots of batches are kept, so none
+        # waits on the endpoint's semaphore while its lease runs out
+        settings = get_settings()
+        lease = timedelta(seconds=settings.WEBHOOK_LEASE_SECONDS)
+        limit = settings.WEBHOOK_ENDPOINT_CONCURRENCY
+        saturated = [sid for sid, n in in_flight.items() if n >= limit]
+        due = (
+            select(WebhookDelivery.id)
+            .join(WebhookSubscription)
+            .where(
+                WebhookDelivery.delivered_at.is_(None),
+                WebhookDelivery.failed_at.is_(None),
+                WebhookDelivery.available_at <= func.now(),
+                WebhookSubscription.is_active.is_(True),
+                WebhookDelivery.subscription_id.not_in(saturated),
+            )
+            .order_by(WebhookDelivery.available_at, WebhookDelivery.id)
+            .limit(settings.WEBHOOK_CLAIM_SIZE)
+            .with_for_update(of=WebhookDelivery, skip_locked=True)
+        )
+        with get_engine().begin() as conn:
+            rows = conn.execute(
+                update(WebhookDelivery)
+                .where(
+                    WebhookDelivery.id.in_(due.scalar_subquery()),
+                    WebhookSubscription.id == WebhookDelivery.subscription_id,
+                )
+                .values(
+                    attempts=WebhookDelivery.attempts + 1,
+                    available_at=func.now() + lease,
+                )
+                .returning(
+                    WebhookDelivery.subscription_id,
+                    WebhookSubscription.url,
+                    WebhookSubscription.secret,
+                    WebhookDelivery.id,
+                    WebhookDelivery.event,
+                    WebhookDelivery.payload,
+                    WebhookDelivery.created_at,
+                    WebhookDelivery.attempts,
+                )
+            ).all()
+
+            # Oldest first within each endpoint, cut into request-sized
+            # runs; the rest are handed back untried
+            by_endpoint: dict[int, _Batch] = {}
+            slots = {}
+            batches, surplus = [], []
+            size = settings.WEBHOOK_BATCH_SIZE
+            for sid, url, secret, *delivery in sorted(
+                rows, key=lambda r: r[3]
+            ):
+                batch = by_endpoint.get(sid)
+                if batch is None or len(batch.deliveries) >= size:
+                    slots.setdefault(sid, limit - in_flight.get(sid, 0))
+                    if slots[sid] <= 0:
+                        surplus.append(delivery[0])
+                        continue
+                    slots[sid] -= 1
+                    batch = by_endpoint[sid] = _Batch(sid, url, secret, [])
+                    batches.append(batch)
+                batch.deliveries.append(tuple(delivery))
+            if surplus:
+                conn.execute(
+                    update(WebhookDelivery)
+                    .where(WebhookDelivery.id.in_(surplus))
+                    .values(
+                        attempts=WebhookDelivery.attempts - 1,
+                        available_at=func.now(),
+                    )
+                )
+        return batches
+
+    def _settle(
+        self, batch: _Batch, ok: bool, status: int | None, error: str | None
+    ) -> dict[str, int]:
+        # Returns how many deliveries were delivered, retried and dead
+        ids = [delivery[0] for delivery in batch.deliveries]
+        counts = {"delivered": 0, "retried": 0, "dead": 0}
+        with get_engine().begin() as conn:
+            if ok:
+                conn.execute(
+                    update(WebhookDelivery)
+                    .where(WebhookDelivery.id.in_(ids))
+                    .values(delivered_at=func.now(), last_status=status)
+                )
+                counts["delivered"] = len(ids)
+                return counts
+            max_attempts = get_settings().WEBHOOK_MAX_ATTEMPTS
+            now = datetime.now(timezone.utc)
+            settled = []
+            for delivery_id, *_, attempts in batch.deliveries:
+                dead = attempts >= max_attempts
+                delay = 0 if dead else _backoff(attempts)
+                settled.append(
+                    {
+                        "delivery_id": delivery_id,
+                        "failed_at": now if dead else None,
+                        "available_at": now + timedelta(seconds=delay),
+                    }
+                )
+                counts["dead" if dead else "retried"] += 1
+            conn.execute(
+                update(WebhookDelivery)
+                .where(WebhookDelivery.id == bindparam("delivery_id"))
+                .values(
+                    failed_at=bindparam("failed_at"),
+                    available_at=bindparam("available_at"),
+                    last_status=status,
+                    last_error=error,
+                ),
+                settled,
+            )
+        return counts
+
+    async def _send(self, batch: _Batch) -> None:
+        sid = batch.subscription_id
+        limit = self._limits.setdefault(
+            sid,
+            asyncio.Semaphore(get_settings().WEBHOOK_ENDPOINT_CONCURRENCY),
+        )
+        try:
+            async with limit:
+                body = _body(batch)
+                timestamp = str(int(time.time()))
+                status, error = None, None
+                try:
+                    response = await self._client.post(
+                        batch.url,
+                        content=body,
+                        headers={
+                            "Content-Type": "application/json",
+                            TIMESTAMP_HEADER: timestamp,
+                            SIGNATURE_HEADER: sign(
+                                batch.secret, timestamp, body
+                            ),
+                        },
+                    )
+                    status = response.status_code
+                    if not response.is_success:
+                        error = f"HTTP {status}"
+                except UnsafeURLError as exc:
+                    error = str(exc)[:1000]
+                except httpx.HTTPError as exc:
+                    error = repr(exc)[:1000]
+                counts = await asyncio.to_thread(
+                    self._settle, batch, error is None, status, error
+                )
+                self._counts["sent"] += 1
+                for key, count in counts.items():
+                    self._counts[key] += count
+        except Exception:
+            # Left leased; sent again once the lease runs out
+            logger.exception("webhook batch for subscription %s failed", sid)
+        finally:
+            self._in_flight[sid] -= 1
+            if not self._in_flight[sid]:
+                del self._in_flight[sid]
+            # Room for this endpoint's next batch
+            self._wake.set()
+
+    async def _dispatch(self) -> None:
+        settings = get_settings()
+        while True:
+            self._wake.clear()
+            try:
+                batches = await asyncio.to_thread(
+                    self._claim, dict(self._in_flight)
+                )
+            except Exception:
+                logger.exception("webhook deliveries unavailable")
+                batches = []
+            for batch in batches:
+                sid = batch.subscription_id
+                self._in_flight[sid] = self._in_flight.get(sid, 0) + 1
+                task = asyncio.create_task(self._send(batch))
+                self._sends.add(task)
+                task.add_done_callback(self._sends.discard)
+            if not batches:
+                try:
+                    await asyncio.wait_for(
+                        self._wake.wait(), settings.WEBHOOK_POLL_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    continue
+                # Let events committed around the same time share requests
+                await asyncio.sleep(settings.WEBHOOK_LINGER_SECONDS)
+
+    async def _listen(self) -> None:
+        async with broadcaster.subscribe(WAKE_TOPIC) as wake:
+            while True:
+                await wake.get()
+                self._wake.set()
+
+    def metrics(self) -> dict:
+        """Counters for this process, and endpoints with sends in flight."""
+        return {
+            **self._counts,
+            "running": self.running,
+            "in_flight": dict(self._in_flight),
+        }
+
+
+dispatcher = WebhookDispatcher()
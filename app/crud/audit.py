@@ -0,0 +1,52 @@
+import uuid
+from datetime import datetime
+
+from app.crud.customer import decode_cursor, encode_cursor
+from app.models.audit import AuditEntry
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+
+def search_audit(
+    db: Session,
+    restaurant_id: int,
+    entity: str | None = None,
+    entity_id: int | None = None,
+    actor_id: int | None = None,
+    since: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = 50,
+) -> tuple[list[AuditEntry], str | None]:
+    """One keyset page of a restaurant's audit log, newest first.
+
+    Served by the (restaurant_id, occurred_at, id) index, or the
+    (restaurant_id, entity, entity_id, occurred_at) one for one row's
+    history; the cursor is the last entry's (occurred_at, id).
+    """
+    stmt = select(AuditEntry).where(AuditEntry.restaurant_id == restaurant_id)
+    if entity is not None:
+        stmt = stmt.where(AuditEntry.entity == entity)
+    if entity_id is not None:
+        stmt = stmt.where(AuditEntry.entity_id == entity_id)
+    if actor_id is not None:
+        stmt = stmt.where(AuditEntry.actor_id == actor_id)
+    if since is not None:
+        stmt = stmt.where(AuditEntry.occurred_at >= since)
+    if cursor:
+        try:
+            occurred_at, last_id = decode_cursor(cursor, str, str)
+            after = (datetime.fromisoformat(occurred_at), uuid.UUID(last_id))
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+        stmt = stmt.where(
+            tuple_(AuditEntry.occurred_at, AuditEntry.id) < tuple_(*after)
+        )
+    stmt = stmt.order_by(AuditEntry.occurred_at.desc(), AuditEntry.id.desc())
+    rows = db.execute(stmt.limit(limit + 1)).scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.occurred_at.isoformat(), str(last.id))
+    return rows, next_cursor
@@ -0,0 +1,126 @@
+import base64
+import json
+import math
+import re
+
+from app.models.customer import Customer
+from sqlalchemy import Double, and_, cast, func, literal, or_, select
+from sqlalchemy.orm import Session
+
+# Below this many characters trigrams can't narrow the search, so short
+# queries fall back to a name prefix match
+MIN_FUZZY_LENGTH = 3
+_DIGITS = re.compile(r"[\d\s\-+().]+")
+
+
+def encode_cursor(*key) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _is_a(value, kind: type) -> bool:
+    # JSON has no bool/int or int/float distinction worth trusting
+    if isinstance(value, bool):
+        return kind is bool
+    if kind is float:
+        # NaN and overflowing exponents (1e999) compare with nothing
+        return isinstance(value, (int, float)) and math.isfinite(value)
+    return isinstance(value, kind)
+
+
+def decode_cursor(cursor: str, *kinds: type) -> list:
+    """The sort key ``encode_cursor`` packed, checked against ``kinds``.
+
+    Raises ``ValueError`` unless the key holds one value of each of
+    ``kinds``, in order, so a forged cursor never reaches the database.
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, RecursionError):
+        # RecursionError: a forged key nested a few thousand lists deep
+        raise ValueError("Invalid cursor")
+    if (
+        not isinstance(key, list)
+        or len(key) != len(kinds)
+        or not all(map(_is_a, key, kinds))
+    ):
+        raise ValueError("Invalid cursor")
+    return key
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_customers(
+    db: Session,
+    restaurant_id: int,
+    query: str | None = None,
+    cursor: str | None = None,
+    limit: int = 20,
+) -> tuple[list[Customer], str | None]:
+    """One keyset page of a restaurant's live customers.
+
+    - no query: everyone, by id;
+    - a phone-like query: phone numbers containing those digits, by id;
+    - short text: names starting with it, by id;
+    - longer text: names containing it or fuzzily matching one of its
+      words (pg_trgm ``<%``), best matches first.
+
+    Each filter is served by the (restaurant_id, column) trigram GIN
+    indexes, and the cursor is the last row's sort key, so later pages
+    cost the same as the first.
+    """
+    stmt = select(Customer).where(Customer.restaurant_id == restaurant_id)
+    query = (query or "").strip()
+    score = None
+
+    if query and _DIGITS.fullmatch(query) and re.search(r"\d", query):
+        digits = re.sub(r"\D", "", query)
+        stmt = stmt.where(
+            Customer.phone.like(f"%{_escape_like(digits)}%", escape="\\")
+        )
+    elif query and len(query) < MIN_FUZZY_LENGTH:
+        prefix = _escape_like(query.lower())
+        stmt = stmt.where(
+            func.lower(Customer.name).like(f"{prefix}%", escape="\\")
+        )
+    elif query:
+        # float8 so the score survives the round trip through the cursor
+        score = cast(
+            func.word_similarity(literal(query), Customer.name), Double
+        )
+        stmt = stmt.where(
+            or_(
+                Customer.name.ilike(f"%{_escape_like(query)}%", escape="\\"),
+                literal(query).op("<%")(Customer.name),
+            )
+        )
+
+    if score is None:
+        if cursor:
+            (last_id,) = decode_cursor(cursor, int)
+            stmt = stmt.where(Customer.id > last_id)
+        stmt = stmt.order_by(Customer.id)
+        rows = db.execute(stmt.limit(limit + 1)).scalars().all()
+        keys = [(row.id,) for row in rows]
+    else:
+        # Best score first, ties by id; the cursor holds the last score
+        stmt = stmt.add_columns(score.label("score"))
+        if cursor:
+            last_score, last_id = decode_cursor(cursor, float, int)
+            stmt = stmt.where(
+                or_(
+                    score < last_score,
+                    and_(score == last_score, Customer.id > last_id),
+                )
+            )
+        stmt = stmt.order_by(score.desc(), Customer.id)
+        scored = db.execute(stmt.limit(limit + 1)).all()
+        rows = [row.Customer for row in scored]
+        keys = [(row.score, row.Customer.id) for row in scored]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(*keys[limit - 1])
+    return rows, next_cursor
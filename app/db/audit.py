@@ -0,0 +1,174 @@
+import enum
+import uuid
+from datetime import date, datetime, timezone
+
+from app.core.audit import audit_log
+from sqlalchemy import Connection, event, inspect
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql import ClauseElement
+
+# session.info keys: who is making the session's changes, and in which
+# restaurant (for rows that don't carry one), and the captured entries
+# waiting for the transaction's outcome
+AUDIT_ACTOR = "audit_actor"
+AUDIT_RESTAURANT = "audit_restaurant"
+_PENDING = "audit_pending"
+
+
+class Audited:
+    """Rows whose inserts, updates and deletes go to the audit log.
+
+    Flushed changes are captured from the session, and ORM ``insert``,
+    ``update`` and ``delete`` statements from their RETURNING rows (a
+    statement without RETURNING is not recorded; an update can name the
+    columns it writes with the ``audit_columns`` execution option).
+    Entries are handed to ``app.core.audit`` only when the transaction
+    commits.
+    """
+
+    # Columns whose changes are not worth an entry
+    audit_ignore: tuple[str, ...] = ()
+    # Column holding the row's restaurant
+    audit_restaurant: str = "restaurant_id"
+
+
+def set_actor(
+    db: Session, user_id: int | None, restaurant_id: int | None = None
+) -> None:
+    """Attribute the session's changes to ``user_id`` (and a restaurant)."""
+    db.info[AUDIT_ACTOR] = user_id
+    if restaurant_id is not None:
+        db.info[AUDIT_RESTAURANT] = restaurant_id
+
+
+def _json_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _capture(session: Session, cls, action: str, row, written) -> None:
+    key = cls.__mapper__.primary_key[0].key
+    if row.get(key) is None:
+        return
+    changes = {
+        name: _json_value(value)
+        for name, value in written.items()
+        if name != key and name not in cls.audit_ignore
+        # SQL expressions (func.now()) have no value until reloaded
+        and not isinstance(value, ClauseElement)
+    }
+    if action == "update" and not changes:
+        return
+    restaurant_id = row.get(cls.audit_restaurant)
+    if restaurant_id is None:
+        restaurant_id = session.info.get(AUDIT_RESTAURANT)
+    session.info.setdefault(_PENDING, []).append(
+        {
+            "id": uuid.uuid4(),
+            "occurred_at": datetime.now(timezone.utc),
+            "actor_id": session.info.get(AUDIT_ACTOR),
+            "restaurant_id": restaurant_id,
+            "entity": cls.__tablename__,
+            "entity_id": row[key],
+            "action": action,
+            "changes": changes,
+        }
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_flush(session: Session, flush_context) -> None:
+    for obj in session.new:
+        if isinstance(obj, Audited):
+            state = inspect(obj)
+            values = {
+                attr.key: state.dict[attr.key]
+                for attr in state.mapper.column_attrs
+                if attr.key in state.dict
+            }
+            _capture(session, type(obj), "insert", state.dict, values)
+    for obj in session.dirty:
+        if isinstance(obj, Audited):
+            state = inspect(obj)
+            # History is only read for loaded attributes, so this never
+            # loads anything
+            written = {}
+            for attr in state.mapper.column_attrs:
+                added = state.attrs[attr.key].history.added
+                if added:
+                    written[attr.key] = added[0]
+            _capture(session, type(obj), "update", state.dict, written)
+    for obj in session.deleted:
+        if isinstance(obj, Audited):
+            state = inspect(obj)
+            _capture(session, type(obj), "delete", state.dict, {})
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _capture_statement(state: ORMExecuteState) -> None:
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    mapper = state.bind_mapper
+    if mapper is None or not issubclass(mapper.class_, Audited):
+        return
+    if not state.statement.exported_columns:
+        return
+    # Run the statement here, keep a copy of its RETURNING rows and hand
+    # the caller an identical result
+    frozen = state.invoke_statement().freeze()
+    columns = set(mapper.local_table.c.keys())
+    if state.is_insert:
+        action = "insert"
+    elif state.is_update:
+        action = "update"
+    else:
+        action = "delete"
+    # Statements may name the columns they wrote (see update_row); the
+    # rest of the RETURNING row only locates it
+    written_columns = state.execution_options.get("audit_columns", columns)
+    for row in frozen().mappings():
+        values = {name: row[name] for name in row.keys() if name in columns}
+        written = {
+            name: value
+            for name, value in values.items()
+            if action != "delete" and name in written_columns
+        }
+        _capture(state.session, mapper.class_, action, values, written)
+    return frozen()
+
+
+def _owns_transaction(session: Session) -> bool:
+    # A session bound to a caller's Connection (an atomic batch) commits
+    # only a savepoint; the caller decides with publish/discard_pending
+    return not isinstance(session.bind, Connection)
+
+
+def publish_pending(session: Session) -> None:
+    """Hand the session's captured entries to the audit log."""
+    entries = session.info.pop(_PENDING, None)
+    if entries:
+        audit_log.record(entries)
+
+
+def discard_pending(session: Session) -> None:
+    """Drop captured entries whose changes were rolled back."""
+    session.info.pop(_PENDING, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session) -> None:
+    if _owns_transaction(session):
+        publish_pending(session)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_uncommitted(session: Session, transaction) -> None:
+    # Runs after after_commit, so anything left was rolled back or the
+    # session closed mid-transaction
+    if transaction.parent is None and _owns_transaction(session):
+        discard_pending(session)
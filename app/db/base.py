@@ -1,3 +1,5 @@
+import importlib
+
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -5,12 +7,31 @@ class Base(DeclarativeBase):
     pass
 
 
-from app.models import (  # noqa
-    category,
-    customer,
-    menu,
-    order,
-    restaurant,
-    table,
-    user,
+MODEL_MODULES = (
+    "audit",
+    "category",
+    "customer",
+    "idempotency",
+    "job",
+    "menu",
+    "option",
+    "order",
+    "payment",
+    "refresh_token",
+    "report",
+    "reservation",
+    "restaurant",
+    "table",
+    "user",
+    "webhook",
 )
+
+
+def load_models() -> None:
+    """Import every model module so relationships and metadata resolve.
+
+    Called by ``create_app`` and Alembic instead of at import time, so
+    importing ``Base`` stays cheap.
+    """
+    for name in MODEL_MODULES:
+        importlib.import_module(f"app.models.{name}")
@@ -1,6 +1,44 @@
-from app.core.config import settings
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from app.core.config import Settings, get_settings
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.orm import Session, sessionmaker
 
-engine = create_engine(settings.DATABASE_URL, echo=False, future=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+_engine: Engine | None = None
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+
+
+def init_engine(settings: Settings | None = None) -> Engine:
+    """Create the engine, normally from the app lifespan.
+
+    Anything that needs a connection before startup ran (scripts, a
+    ``TestClient`` used without ``with``) gets the engine created lazily.
+    """
+    global _engine
+    if _engine is None:
+        settings = settings or get_settings()
+        _engine = create_engine(
+            settings.DATABASE_URL,
+            echo=False,
+            future=True,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_pre_ping=True,
+        )
+        _session_factory.configure(bind=_engine)
+    return _engine
+
+
+def get_engine() -> Engine:
+    return _engine or init_engine()
+
+
+def dispose_engine() -> None:
+    global _engine
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
+
+
+def SessionLocal(**options) -> Session:
+    if _engine is None:
+        init_engine()
+    return _session_factory(**options)
@@ -0,0 +1,45 @@
+from sqlalchemy import TIMESTAMP, Boolean, Column, event, func
+from sqlalchemy.orm import ORMExecuteState, Session, with_loader_criteria
+from sqlalchemy.orm.attributes import get_history
+
+
+class SoftDelete:
+    """Rows hidden from ORM queries once their ``is_deleted`` is set.
+
+    Every ORM select run through a ``Session`` (including relationship
+    and ``Session.get`` loads) skips deleted rows of these models. Pass
+    ``execution_options(include_deleted=True)`` to see them. Bulk
+    ``update``/``delete`` statements and refreshes of already loaded rows
+    are not filtered (``app.db.writes.update_row`` filters for itself).
+    ``deleted_at`` is stamped on flush whenever ``is_deleted`` changes;
+    the purge job uses it for retention.
+    """
+
+    is_deleted = Column(Boolean, default=False)
+    deleted_at = Column(TIMESTAMP(timezone=True))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _hide_deleted(state: ORMExecuteState) -> None:
+    if (
+        state.is_select
+        and not state.is_column_load
+        and not state.execution_options.get("include_deleted", False)
+    ):
+        state.statement = state.statement.options(
+            with_loader_criteria(
+                SoftDelete,
+                lambda cls: cls.is_deleted.is_(False),
+                include_aliases=True,
+            )
+        )
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_deleted(session: Session, flush_context, instances) -> None:
+    for obj in session.dirty:
+        if (
+            isinstance(obj, SoftDelete)
+            and get_history(obj, "is_deleted").added
+        ):
+            obj.deleted_at = func.now() if obj.is_deleted else None
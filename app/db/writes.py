@@ -0,0 +1,56 @@
+from app.db.soft_delete import SoftDelete
+from sqlalchemy import Row, func, insert, select, update
+from sqlalchemy.orm import Session
+
+
+def row_columns(model) -> tuple:
+    """Every column of ``model``'s table, to return whole rows."""
+    return tuple(model.__table__.c)
+
+
+def insert_row(db: Session, model, **values) -> Row:
+    """INSERT one row and return it, defaults included, in one statement.
+
+    The result is a plain row rather than a session object, so the
+    commit that follows does not expire it and serializing it needs no
+    refresh.
+    """
+    return db.execute(
+        insert(model).values(**values).returning(*row_columns(model))
+    ).one()
+
+
+def update_row(
+    db: Session,
+    model,
+    where,
+    values: dict,
+    include_deleted: bool = False,
+) -> Row | None:
+    """UPDATE the row matching ``where`` and return it, or None if none.
+
+    ``where`` is a list of conditions; fold ownership into it so the
+    check and the write are one statement. Only the columns in
+    ``values`` are written; with no values the row is only selected.
+    Soft-deleted rows are not matched unless ``include_deleted``, and
+    changing ``is_deleted`` stamps ``deleted_at`` as a flush would.
+    """
+    if issubclass(model, SoftDelete):
+        if not include_deleted:
+            where = [*where, model.is_deleted.is_(False)]
+        if "is_deleted" in values:
+            values = {
+                **values,
+                "deleted_at": func.now() if values["is_deleted"] else None,
+            }
+    if not values:
+        return db.execute(select(*row_columns(model)).where(*where)).first()
+    return db.execute(
+        update(model)
+        .where(*where)
+        .values(**values)
+        .returning(*row_columns(model))
+        .execution_options(
+            synchronize_session=False, audit_columns=tuple(values)
+        )
+    ).first()
@@ -1,18 +1,134 @@
-from app.api.routers import auth, categories, menu, orders, restaurants, tables
-from dotenv import load_dotenv
+import asyncio
+import importlib
+from contextlib import asynccontextmanager
+
+from app.core.config import Settings, get_settings, use_settings
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+# Router modules under app.api.routers, mounted in this order
+ROUTERS = (
+    "auth",
+    "restaurants",
+    "categories",
+    "menu",
+    "options",
+    "tables",
+    "reservations",
+    "customer",
+    "orders",
+    "payments",
+    "reports",
+    "analytics",
+    "audit",
+    "webhooks",
+    "batch",
+)
+
+
+# The services below (and their httpx, segno, ...) are imported when
+# the app is built or started, not by ``import app.main``
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.core.audit import audit_log
+    from app.core.broadcast import broadcaster
+    from app.core.jobs import runner
+    from app.core.webhooks import dispatcher
+    from app.db.session import dispose_engine, init_engine
+    from app.services.qr_codes import shutdown_renderer
+
+    init_engine(app.state.settings)
+    # Warm up in the background: the worker is live straight away and
+    # /ready flips once first-request costs have been paid.
+    app.state.ready = asyncio.Event()
+    warming = asyncio.create_task(_warm_up(app))
+    if app.state.settings.JOBS_RUN:
+        await runner.start()
+        await dispatcher.start()
+    yield
+    warming.cancel()
+    if dispatcher.running:
+        await dispatcher.stop()
+    if runner.running:
+        await runner.stop()
+    broadcaster.stop()
+    shutdown_renderer()
+    # Last, so entries from the runner's final jobs are written too
+    audit_log.stop()
+    dispose_engine()
+
+
+async def _warm_up(app: FastAPI):
+    from app.core.warmup import warm_up
+
+    await asyncio.to_thread(warm_up, app)
+    app.state.ready.set()
+
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """Build an app bound to ``settings`` (default: from env/.env).
+
+    Nothing touches the database at import or build time; the engine is
+    created in the lifespan. Only routers named in
+    ``settings.ENABLED_ROUTERS`` are imported and mounted.
+    """
+    from app.core.compression import CompressionMiddleware
+    from app.core.idempotency import IdempotencyMiddleware
+    from app.core.jobs import runner
+    from app.core.webhooks import dispatcher
+    from app.db.base import load_models
+    from app.db.session import dispose_engine
+
+    if settings is not None:
+        use_settings(settings)
+        dispose_engine()
+    settings = get_settings()
+    load_models()
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.settings = settings
+    app.add_middleware(IdempotencyMiddleware)
+    # Added last so it wraps everything, including replayed responses
+    app.add_middleware(
+        CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE
+    )
+
+    enabled = settings.ENABLED_ROUTERS
+    for name in ROUTERS:
+        if enabled is None or name in enabled:
+            module = importlib.import_module(f"app.api.routers.{name}")
+            app.include_router(module.router)
+
+    @app.get("/")
+    def read_root():
+        return {"message": "Hello, FastAPI is running!"}
+
+    @app.get("/ready")
+    def ready():
+        event = getattr(app.state, "ready", None)
+        if event is None or not event.is_set():
+            return JSONResponse({"ready": False}, status_code=503)
+        return {"ready": True}
+
+    @app.get("/jobs/metrics")
+    def job_metrics():
+        return runner.metrics()
+
+    @app.get("/webhooks/metrics")
+    def webhook_metrics():
+        return dispatcher.metrics()
+
+    return app
 
-load_dotenv()
 
-app = FastAPI()
-app.include_router(auth.router)
-app.include_router(restaurants.router)
-app.include_router(categories.router)
-app.include_router(menu.router)
-app.include_router(tables.router)
-app.include_router(orders.router)
+_app: FastAPI | None = None
 
 
-@app.get("/")
-def read_root():
-    return {"message": "Hello, FastAPI is running!"}
+def __getattr__(name: str):
+    # Keep ``uvicorn app.main:app`` working without building at import
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,38 @@
+from app.db.base import Base
+from sqlalchemy import TIMESTAMP, Column, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+
+class AuditEntry(Base):
+    """One recorded insert, update or delete of an ``Audited`` row.
+
+    Written behind the change by ``app.core.audit``, so an entry shows up
+    a moment after its transaction commits. The id is made when the
+    change is captured, which keeps a replayed spill file from writing
+    an entry twice.
+    """
+
+    __tablename__ = "audit_log"
+    __table_args__ = (
+        # A restaurant's log newest first, and one row's history
+        Index("ix_audit_log_restaurant", "restaurant_id", "occurred_at", "id"),
+        Index(
+            "ix_audit_log_entity",
+            "restaurant_id",
+            "entity",
+            "entity_id",
+            "occurred_at",
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    occurred_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    # None for changes made outside a user's request (jobs, scripts)
+    actor_id = Column(Integer)
+    restaurant_id = Column(Integer)
+    # The row's table name and primary key
+    entity = Column(String(50), nullable=False)
+    entity_id = Column(Integer)
+    action = Column(String(10), nullable=False)
+    # Columns written and their new values; empty for a delete
+    changes = Column(JSONB, nullable=False)
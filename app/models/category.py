@@ -1,15 +1,16 @@
+from app.db.audit import Audited
 from app.db.base import Base
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
+from app.db.soft_delete import SoftDelete
+from sqlalchemy import Column, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship
 
 
-class Category(Base):
+class Category(Audited, SoftDelete, Base):
     __tablename__ = "categories"
 
     id = Column(Integer, primary_key=True, index=True)
     restaurant_id = Column(Integer, ForeignKey("restaurants.id"))
     name = Column(String, nullable=False)
-    is_deleted = Column(Boolean, default=False)
 
     restaurant = relationship("Restaurant", back_populates="categories")
     menu_items = relationship("MenuItem", back_populates="category")
@@ -0,0 +1,82 @@
+from app.db.base import Base
+from app.db.soft_delete import SoftDelete
+from sqlalchemy import (
+    TIMESTAMP,
+    Boolean,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+    text,
+)
+from sqlalchemy.orm import relationship
+
+
+class Customer(SoftDelete, Base):
+    __tablename__ = "customers"
+
+    id = Column(Integer, primary_key=True, index=True)
+    restaurant_id = Column(
+        Integer, ForeignKey("restaurants.id"), nullable=False
+    )
+    name = Column(String)
+    # Normalised to digits with an optional leading "+"
+    phone = Column(String)
+    email = Column(String)
+    notes = Column(String)
+    loyalty_points = Column(Integer, nullable=False, default=0)
+    is_deleted = Column(Boolean, nullable=False, default=False)
+    created_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+    updated_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=text("now()"),
+        onupdate=func.now(),
+    )
+
+    restaurant = relationship("Restaurant")
+
+    __table_args__ = (
+        # One live customer per phone / email in a restaurant
+        Index(
+            "uq_customers_restaurant_phone",
+            "restaurant_id",
+            "phone",
+            unique=True,
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index(
+            "uq_customers_restaurant_email",
+            "restaurant_id",
+            func.lower(email),
+            unique=True,
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        # Short name prefixes, too short for trigrams
+        Index(
+            "ix_customers_name_prefix",
+            "restaurant_id",
+            func.lower(name).label("name_lower"),
+            postgresql_ops={"name_lower": "text_pattern_ops"},
+        ),
+        # Trigram search within one restaurant (needs pg_trgm and
+        # btree_gin): substring, fuzzy and word-similarity matches
+        Index(
+            "ix_customers_name_trgm",
+            "restaurant_id",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_customers_phone_trgm",
+            "restaurant_id",
+            "phone",
+            postgresql_using="gin",
+            postgresql_ops={"phone": "gin_trgm_ops"},
+        ),
+    )
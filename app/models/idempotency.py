@@ -0,0 +1,32 @@
+from app.db.base import Base
+from sqlalchemy import (
+    TIMESTAMP,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    # Housekeeping deletes by age (app.core.idempotency)
+    __table_args__ = (Index("ix_idempotency_keys_created_at", "created_at"),)
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    # sha256 of method, path, query string and body; a reused key must
+    # match it
+    fingerprint = Column(String(64), nullable=False)
+    # NULL until the first request has finished
+    status_code = Column(Integer)
+    # [name, value] pairs, in order
+    headers = Column(JSONB)
+    body = Column(LargeBinary)
+    created_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
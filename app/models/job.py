@@ -0,0 +1,50 @@
+from app.db.base import Base
+from sqlalchemy import TIMESTAMP, Column, Index, Integer, String, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+class Job(Base):
+    """A durable background job (see ``app.core.jobs``).
+
+    Written in the same transaction as the change that caused it, so the
+    job exists exactly when that change committed.
+    """
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Only unfinished jobs are ever scanned, per queue, oldest due first
+        Index(
+            "ix_jobs_pending",
+            "queue",
+            "available_at",
+            "id",
+            postgresql_where=text("finished_at IS NULL AND failed_at IS NULL"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    queue = Column(String(50), nullable=False, server_default="default")
+    name = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(String)
+    # Not claimed before this: pushed forward by a claim (the lease) and
+    # by the backoff after a failure
+    available_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+    finished_at = Column(TIMESTAMP(timezone=True))
+    # Set once attempts are exhausted; the job is never retried again
+    failed_at = Column(TIMESTAMP(timezone=True))
+    created_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+
+
+class HousekeepingRun(Base):
+    """When each housekeeping task last ran, across all processes."""
+
+    __tablename__ = "housekeeping_runs"
+
+    task = Column(String(100), primary_key=True)
+    last_run_at = Column(TIMESTAMP(timezone=True), nullable=False)
@@ -1,9 +1,11 @@
+from app.db.audit import Audited
 from app.db.base import Base
+from app.db.soft_delete import SoftDelete
 from sqlalchemy import Boolean, Column, Float, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship
 
 
-class MenuItem(Base):
+class MenuItem(Audited, SoftDelete, Base):
     __tablename__ = "menu_items"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -12,7 +14,11 @@ class MenuItem(Base):
     name = Column(String, nullable=False)
     price = Column(Float, nullable=False)
     is_available = Column(Boolean, default=True)
-    is_deleted = Column(Boolean, default=False)
 
     category = relationship("Category", back_populates="menu_items")
     restaurant = relationship("Restaurant", back_populates="menu_items")
+    option_groups = relationship(
+        "OptionGroup",
+        secondary="item_option_groups",
+        back_populates="menu_items",
+    )
@@ -0,0 +1,67 @@
+from app.db.base import Base
+from app.db.soft_delete import SoftDelete
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Float,
+    ForeignKey,
+    Integer,
+    String,
+    Table,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import relationship
+
+# Which option groups (e.g. "Size", "Extras") each menu item offers
+item_option_groups = Table(
+    "item_option_groups",
+    Base.metadata,
+    Column(
+        "menu_item_id",
+        Integer,
+        ForeignKey("menu_items.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "option_group_id",
+        Integer,
+        ForeignKey("option_groups.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+)
+
+
+class OptionGroup(SoftDelete, Base):
+    __tablename__ = "option_groups"
+    __table_args__ = (UniqueConstraint("restaurant_id", "name"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    restaurant_id = Column(
+        Integer, ForeignKey("restaurants.id"), nullable=False
+    )
+    name = Column(String, nullable=False)
+    min_select = Column(Integer, nullable=False, default=0)
+    max_select = Column(Integer, nullable=False, default=1)
+    # Same as min_select >= 1
+    required = Column(Boolean, nullable=False, default=False)
+
+    options = relationship("Option", back_populates="group")
+    menu_items = relationship(
+        "MenuItem",
+        secondary=item_option_groups,
+        back_populates="option_groups",
+    )
+
+
+class Option(SoftDelete, Base):
+    __tablename__ = "options"
+
+    id = Column(Integer, primary_key=True, index=True)
+    option_group_id = Column(
+        Integer, ForeignKey("option_groups.id"), nullable=False
+    )
+    name = Column(String, nullable=False)
+    price_delta = Column(Float, nullable=False, default=0.0)
+    is_available = Column(Boolean, default=True)
+
+    group = relationship("OptionGroup", back_populates="options")
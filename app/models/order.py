@@ -1,33 +1,130 @@
+from app.db.audit import Audited
 from app.db.base import Base
-from sqlalchemy import Boolean, Column, Float, ForeignKey, Integer
+from sqlalchemy import (
+    TIMESTAMP,
+    Boolean,
+    Column,
+    Float,
+    ForeignKey,
+    ForeignKeyConstraint,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    text,
+)
 from sqlalchemy.orm import relationship
 
+# orders, order_items and order_item_options are range-partitioned by
+# month on the order's created_at (see app.services.partitions). Lines
+# and options carry a copy of it, so a whole month can be detached and
+# archived at once. Postgres keys must include the partition column; the
+# mappers still identify rows by id alone.
 
-class Order(Base):
+
+class Order(Audited, Base):
     __tablename__ = "orders"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Indexed (like the other keys to soft-deletable rows) so purging
+    # those rows doesn't scan the order history
     restaurant_id = Column(
-        Integer, ForeignKey("restaurants.id"), nullable=False
+        Integer, ForeignKey("restaurants.id"), nullable=False, index=True
     )
     table_id = Column(
-        Integer, ForeignKey("restaurant_tables.id"), nullable=False
+        Integer, ForeignKey("restaurant_tables.id"), nullable=False, index=True
     )  # must select table
     total_amount = Column(Float, default=0.0)
     is_completed = Column(Boolean, default=False)
+    # Set when maintenance closes an order left open past
+    # OPEN_ORDER_MAX_AGE_HOURS without being paid in full
+    abandoned_at = Column(TIMESTAMP(timezone=True))
+    created_at = Column(
+        TIMESTAMP(timezone=True),
+        primary_key=True,
+        nullable=False,
+        server_default=text("now()"),
+    )
 
     restaurant = relationship("Restaurant", back_populates="orders")
     table = relationship("RestaurantTable")
     items = relationship("OrderItem", back_populates="order")
+    payments = relationship("Payment", back_populates="order")
+
+    __table_args__ = (
+        # Open-order lookup per table; each month's index holds only
+        # that month's orders still open, so closed months cost nothing
+        Index(
+            "ix_orders_open_table",
+            "restaurant_id",
+            "table_id",
+            postgresql_where=is_completed.is_(False),
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
 
 
 class OrderItem(Base):
     __tablename__ = "order_items"
 
-    id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
-    menu_item_id = Column(Integer, ForeignKey("menu_items.id"), nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    order_id = Column(Integer, nullable=False)
+    # The order's created_at: partition key and half of the order FK
+    order_created_at = Column(
+        TIMESTAMP(timezone=True), primary_key=True, nullable=False
+    )
+    menu_item_id = Column(
+        Integer, ForeignKey("menu_items.id"), nullable=False, index=True
+    )
     quantity = Column(Integer, default=1)
+    # Sorted chosen option ids ("3,7"); "" when there are none
+    options_key = Column(String, nullable=False, default="", server_default="")
+    # Copied from the menu item when first ordered, so later menu edits
+    # never change an existing bill; unit_price includes option deltas
+    name = Column(String, nullable=False)
+    unit_price = Column(Float, nullable=False)
 
     order = relationship("Order", back_populates="items")
     menu_item = relationship("MenuItem")
+    options = relationship("OrderItemOption", back_populates="order_item")
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["order_id", "order_created_at"],
+            ["orders.id", "orders.created_at"],
+        ),
+        # One line per menu item and option choice per order; repeat
+        # orders add to its quantity
+        UniqueConstraint(
+            "order_id", "order_created_at", "menu_item_id", "options_key"
+        ),
+        {"postgresql_partition_by": "RANGE (order_created_at)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
+
+
+class OrderItemOption(Base):
+    __tablename__ = "order_item_options"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    order_item_id = Column(Integer, nullable=False, index=True)
+    order_created_at = Column(
+        TIMESTAMP(timezone=True), primary_key=True, nullable=False
+    )
+    option_id = Column(Integer, ForeignKey("options.id", ondelete="SET NULL"))
+    # Snapshots, as for the order line itself
+    name = Column(String, nullable=False)
+    price_delta = Column(Float, nullable=False, default=0.0)
+
+    order_item = relationship("OrderItem", back_populates="options")
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["order_item_id", "order_created_at"],
+            ["order_items.id", "order_items.order_created_at"],
+            ondelete="CASCADE",
+        ),
+        {"postgresql_partition_by": "RANGE (order_created_at)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
@@ -0,0 +1,62 @@
+from app.db.base import Base
+from sqlalchemy import (
+    TIMESTAMP,
+    CheckConstraint,
+    Column,
+    Enum,
+    Float,
+    ForeignKeyConstraint,
+    Integer,
+    String,
+    UniqueConstraint,
+    text,
+)
+from sqlalchemy.orm import relationship
+
+PAYMENT_METHODS = ("CASH", "CARD", "UPI", "OTHER")
+PAYMENT_STATUSES = ("PENDING", "CAPTURED", "REFUNDED", "FAILED")
+
+
+class Payment(Base):
+    __tablename__ = "payments"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["order_id", "order_created_at"],
+            ["orders.id", "orders.created_at"],
+            ondelete="CASCADE",
+        ),
+        # A retried capture finds the first attempt instead of paying twice
+        UniqueConstraint("order_id", "idempotency_key"),
+        CheckConstraint("amount >= 0", name="ck_payments_amount"),
+        CheckConstraint(
+            "refunded_amount >= 0 AND refunded_amount <= amount",
+            name="ck_payments_refunded_amount",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, nullable=False, index=True)
+    # Second half of the key of the (partitioned) order
+    order_created_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    method = Column(
+        Enum(*PAYMENT_METHODS, name="payment_method"), nullable=False
+    )
+    status = Column(
+        Enum(*PAYMENT_STATUSES, name="payment_status"),
+        nullable=False,
+        server_default="PENDING",
+    )
+    amount = Column(Float, nullable=False)
+    refunded_amount = Column(
+        Float, nullable=False, default=0.0, server_default="0"
+    )
+    idempotency_key = Column(String(255), nullable=False)
+    # Reference from the card terminal / UPI app, if any
+    txn_ref = Column(String)
+    paid_at = Column(TIMESTAMP(timezone=True))
+    refunded_at = Column(TIMESTAMP(timezone=True))
+    created_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+
+    order = relationship("Order", back_populates="payments")
@@ -0,0 +1,18 @@
+from app.db.base import Base
+from sqlalchemy import TIMESTAMP, Column, ForeignKey, Integer, String, text
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # sha256 of the token; the token itself is never stored
+    token_hash = Column(String(64), nullable=False, unique=True)
+    # All tokens rotated from one login share a family
+    family_id = Column(String(32), nullable=False, index=True)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    revoked_at = Column(TIMESTAMP(timezone=True))
+    created_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
@@ -0,0 +1,38 @@
+from app.db.base import Base
+from sqlalchemy import Column, Date, Float, ForeignKey, Integer
+
+
+# Rollups go with the restaurant or menu item they describe, so they never
+# hold up a purge (app.services.purge)
+class DailySales(Base):
+    __tablename__ = "daily_sales"
+
+    restaurant_id = Column(
+        Integer,
+        ForeignKey("restaurants.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # Local day in the restaurant's own time zone
+    sales_date = Column(Date, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    item_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+
+class DailyItemSales(Base):
+    __tablename__ = "daily_item_sales"
+
+    restaurant_id = Column(
+        Integer,
+        ForeignKey("restaurants.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    sales_date = Column(Date, primary_key=True)
+    menu_item_id = Column(
+        Integer,
+        ForeignKey("menu_items.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
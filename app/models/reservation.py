@@ -0,0 +1,86 @@
+import enum
+
+from app.db.audit import Audited
+from app.db.base import Base
+from sqlalchemy import (
+    TIMESTAMP,
+    CheckConstraint,
+    Column,
+    Computed,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSTZRANGE, ExcludeConstraint
+
+
+class ReservationStatus(str, enum.Enum):
+    BOOKED = "BOOKED"
+    SEATED = "SEATED"
+    COMPLETED = "COMPLETED"
+    CANCELLED = "CANCELLED"
+    NO_SHOW = "NO_SHOW"
+
+
+# Statuses that hold the table; the others free it
+HOLDING_STATUSES = (ReservationStatus.BOOKED, ReservationStatus.SEATED)
+
+
+class Reservation(Audited, Base):
+    __tablename__ = "reservations"
+    # Derived from starts_at and ends_at
+    audit_ignore = ("period",)
+    __table_args__ = (
+        CheckConstraint("ends_at > starts_at", name="ck_reservations_period"),
+        # No two holding reservations of a table overlap, checked by
+        # Postgres itself (the "=" on an integer needs btree_gist)
+        ExcludeConstraint(
+            ("table_id", "="),
+            ("period", "&&"),
+            name="ex_reservations_table_period",
+            using="gist",
+            where=text("status IN ('BOOKED', 'SEATED')"),
+        ),
+        # Reservations of a restaurant within a window
+        Index(
+            "ix_reservations_restaurant_period",
+            "restaurant_id",
+            "period",
+            postgresql_using="gist",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    restaurant_id = Column(
+        Integer,
+        ForeignKey("restaurants.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    table_id = Column(
+        Integer, ForeignKey("restaurant_tables.id"), nullable=False
+    )
+    customer_id = Column(Integer, ForeignKey("customers.id"))
+    guest_name = Column(String(100), nullable=False)
+    phone = Column(String(20))
+    party_size = Column(Integer, nullable=False)
+    starts_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    ends_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    # [starts_at, ends_at): back-to-back bookings don't overlap
+    period = Column(
+        TSTZRANGE,
+        Computed("tstzrange(starts_at, ends_at, '[)')", persisted=True),
+        nullable=False,
+    )
+    status = Column(
+        Enum(ReservationStatus),
+        nullable=False,
+        default=ReservationStatus.BOOKED,
+        server_default="BOOKED",
+    )
+    notes = Column(String(500))
+    created_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
@@ -1,10 +1,16 @@
+from app.db.audit import Audited
 from app.db.base import Base
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
+from app.db.soft_delete import SoftDelete
+from sqlalchemy import Column, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship
 
 
-class Restaurant(Base):
+class Restaurant(Audited, SoftDelete, Base):
     __tablename__ = "restaurants"
+    # Version bumps follow menu edits and bookings that are logged
+    # themselves
+    audit_ignore = ("menu_version", "reservations_version")
+    audit_restaurant = "id"
 
     id = Column(Integer, primary_key=True, index=True)
     # restaurant_id = Column(Integer, ForeignKey("restaurants.id"))
@@ -13,7 +19,14 @@ class Restaurant(Base):
     time_zone = Column(String, default="Asia/Kolkata")
     currency = Column(String, default="INR")
     location = Column(String, nullable=False)
-    is_deleted = Column(Boolean, default=False)
+    # Bumped on every menu change; keys cached menus
+    menu_version = Column(
+        Integer, nullable=False, default=1, server_default="1"
+    )
+    # Bumped on every reservation change; keys cached availability
+    reservations_version = Column(
+        Integer, nullable=False, default=1, server_default="1"
+    )
 
     owner = relationship("User", back_populates="restaurants")
     categories = relationship("Category", back_populates="restaurant")
@@ -1,7 +1,9 @@
 import enum
 
+from app.db.audit import Audited
 from app.db.base import Base
-from sqlalchemy import Boolean, Column, Enum, ForeignKey, Integer
+from app.db.soft_delete import SoftDelete
+from sqlalchemy import Column, Enum, ForeignKey, Integer
 from sqlalchemy.orm import relationship
 
 
@@ -12,7 +14,7 @@ class TableStatus(str, enum.Enum):
     INACTIVE = "INACTIVE"
 
 
-class RestaurantTable(Base):
+class RestaurantTable(Audited, SoftDelete, Base):
     __tablename__ = "restaurant_tables"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -21,6 +23,10 @@ class RestaurantTable(Base):
     )
     table_number = Column(Integer, nullable=False)
     status = Column(Enum(TableStatus), nullable=False, default="AVAILABLE")
-    is_deleted = Column(Boolean, default=False)
+    # Most guests the table takes; reservations are matched against it
+    seats = Column(Integer, nullable=False, default=4, server_default="4")
+    # Part of the signed link in the table's QR code; bumping it voids
+    # every printed copy
+    qr_version = Column(Integer, nullable=False, default=1, server_default="1")
 
     restaurant = relationship("Restaurant", back_populates="tables")
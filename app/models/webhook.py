@@ -0,0 +1,84 @@
+from app.db.base import Base
+from sqlalchemy import (
+    TIMESTAMP,
+    BigInteger,
+    Boolean,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+
+
+class WebhookSubscription(Base):
+    __tablename__ = "webhook_subscriptions"
+
+    id = Column(Integer, primary_key=True)
+    # Purging the restaurant takes its subscriptions along
+    restaurant_id = Column(
+        Integer,
+        ForeignKey("restaurants.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    url = Column(String(2048), nullable=False)
+    # Signs every request (see app.services.webhooks.sign)
+    secret = Column(String(64), nullable=False)
+    events = Column(ARRAY(String(50)), nullable=False)
+    # Paused subscriptions get no new events; queued ones wait
+    is_active = Column(
+        Boolean, nullable=False, default=True, server_default="true"
+    )
+    created_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+
+
+class WebhookDelivery(Base):
+    """One event owed to one subscription (see ``app.core.webhooks``).
+
+    Written in the transaction that produced the event, so it exists
+    exactly when that change committed. Delivered at least once;
+    receivers dedupe on the id.
+    """
+
+    __tablename__ = "webhook_deliveries"
+    __table_args__ = (
+        # Only undelivered, live rows are ever scanned, oldest due first
+        Index(
+            "ix_webhook_deliveries_pending",
+            "available_at",
+            "id",
+            postgresql_where=text(
+                "delivered_at IS NULL AND failed_at IS NULL"
+            ),
+        ),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    subscription_id = Column(
+        Integer,
+        ForeignKey("webhook_subscriptions.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    event = Column(String(50), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    # Not sent before this: pushed forward by a claim (the lease) and by
+    # the backoff after a failed attempt
+    available_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+    delivered_at = Column(TIMESTAMP(timezone=True))
+    # Dead-lettered once attempts are exhausted; only a redelivery
+    # request sends it again
+    failed_at = Column(TIMESTAMP(timezone=True))
+    last_status = Column(Integer)
+    last_error = Column(String)
+    created_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
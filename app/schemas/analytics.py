@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+
+
+class RestaurantRevenueOut(BaseModel):
+    restaurant_id: int
+    name: str
+    revenue: float
+    previous_revenue: float
+    change_pct: float | None
+
+
+class ItemMixOut(BaseModel):
+    menu_item_id: int
+    name: str
+    quantity: int
+    revenue: float
+    share: float
+
+
+class BasketSizeOut(BaseModel):
+    orders: int
+    mean_items: float
+    median_items: float
+    p90_items: float
+    mean_revenue: float
+
+
+class HeatmapOut(BaseModel):
+    # revenue[weekday][hour], weekday 0 = Sunday, in restaurant local time
+    revenue: list[list[float]]
@@ -0,0 +1,24 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class AuditEntryOut(BaseModel):
+    id: UUID
+    occurred_at: datetime
+    actor_id: int | None = None
+    restaurant_id: int | None = None
+    entity: str
+    entity_id: int | None = None
+    action: str
+    changes: dict
+
+    class Config:
+        from_attributes = True
+
+
+class AuditPage(BaseModel):
+    items: list[AuditEntryOut]
+    # Pass back as ?cursor= for the next page; None on the last page
+    next_cursor: str | None = None
@@ -0,0 +1,29 @@
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+
+class SubRequest(BaseModel):
+    # Echoed back so clients can match responses; defaults to the index
+    id: str | None = None
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    # Path of an existing route, optionally with a query string
+    path: str = Field(pattern=r"^/")
+    body: Any = None
+
+
+class BatchRequest(BaseModel):
+    requests: list[SubRequest] = Field(min_length=1)
+    # Run everything in one transaction; any failure rolls all of it back
+    atomic: bool = False
+
+
+class SubResponse(BaseModel):
+    id: str
+    status: int
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    responses: list[SubResponse]
+    rolled_back: bool = False
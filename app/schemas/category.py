@@ -9,6 +9,11 @@ class CategoryCreate(CategoryBase):
     pass
 
 
+# PATCH body; only the fields sent are written (null leaves one as is)
+class CategoryUpdate(BaseModel):
+    name: str | None = None
+
+
 class CategoryOut(CategoryBase):
     id: int
     is_deleted: bool
@@ -0,0 +1,49 @@
+import re
+from datetime import datetime
+
+from pydantic import BaseModel, EmailStr, field_validator
+
+_PHONE_NOISE = re.compile(r"[\s\-().]")
+
+
+def normalize_phone(phone: str | None) -> str | None:
+    if phone is None:
+        return None
+    phone = _PHONE_NOISE.sub("", phone)
+    if not re.fullmatch(r"\+?\d{4,15}", phone):
+        raise ValueError("Invalid phone number")
+    return phone
+
+
+class CustomerBase(BaseModel):
+    name: str | None = None
+    phone: str | None = None
+    email: EmailStr | None = None
+    notes: str | None = None
+
+    _normalize_phone = field_validator("phone")(normalize_phone)
+
+
+class CustomerCreate(CustomerBase):
+    pass
+
+
+class CustomerUpdate(CustomerBase):
+    loyalty_points: int | None = None
+
+
+class CustomerOut(CustomerBase):
+    id: int
+    restaurant_id: int
+    loyalty_points: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class CustomerPage(BaseModel):
+    items: list[CustomerOut]
+    # Pass back as ?cursor= for the next page; None on the last page
+    next_cursor: str | None = None
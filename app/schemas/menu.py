@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 
 
 class MenuItemBase(BaseModel):
@@ -11,9 +11,48 @@ class MenuItemCreate(MenuItemBase):
     pass
 
 
+# PATCH body; only the fields sent are written (null leaves one as is)
+class MenuItemUpdate(BaseModel):
+    name: str | None = None
+    price: float | None = None
+    is_available: bool | None = None
+
+
 class MenuItemOut(MenuItemBase):
     id: int
     is_deleted: bool
 
     class Config:
         orm_mode = True
+
+
+class MenuCategoryOut(BaseModel):
+    id: int
+    name: str
+    items: list[MenuItemOut]
+
+
+class MenuAvailabilityUpdate(BaseModel):
+    is_available: bool
+    # Filters; items matching all of the given ones are updated
+    item_ids: list[int] | None = None
+    category_id: int | None = None
+    # Case-insensitive substring of the item name
+    name: str | None = Field(default=None, min_length=1)
+
+    @model_validator(mode="after")
+    def check_selector(self):
+        if not (self.item_ids or self.category_id or self.name):
+            raise ValueError("Give item_ids, category_id or name")
+        return self
+
+
+class MenuAvailabilityItem(BaseModel):
+    id: int
+    name: str
+    is_available: bool
+
+
+class MenuAvailabilityOut(BaseModel):
+    menu_version: int
+    items: list[MenuAvailabilityItem]
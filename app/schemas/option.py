@@ -0,0 +1,56 @@
+from pydantic import BaseModel, Field, model_validator
+
+
+class OptionBase(BaseModel):
+    name: str
+    price_delta: float = 0.0
+    is_available: bool = True
+
+
+class OptionCreate(OptionBase):
+    pass
+
+
+# PATCH body; only the fields sent are written (null leaves one as is)
+class OptionUpdate(BaseModel):
+    name: str | None = None
+    price_delta: float | None = None
+    is_available: bool | None = None
+
+
+class OptionOut(OptionBase):
+    id: int
+    is_deleted: bool
+
+    class Config:
+        from_attributes = True
+
+
+class OptionGroupBase(BaseModel):
+    name: str
+    min_select: int = Field(default=0, ge=0)
+    max_select: int = Field(default=1, ge=1)
+    required: bool = False
+
+    @model_validator(mode="after")
+    def check_limits(self):
+        if max(self.min_select, int(self.required)) > self.max_select:
+            raise ValueError("min_select cannot exceed max_select")
+        return self
+
+
+class OptionGroupCreate(OptionGroupBase):
+    options: list[OptionCreate] = []
+
+
+class OptionGroupOut(OptionGroupBase):
+    id: int
+    is_deleted: bool
+    options: list[OptionOut]
+
+    class Config:
+        from_attributes = True
+
+
+class ItemOptionGroups(BaseModel):
+    option_group_ids: list[int]
@@ -1,12 +1,16 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 # For creating individual menu items in an order
 class OrderItemCreate(BaseModel):
     menu_item_id: int
-    quantity: int
+    # Added into an existing line's quantity, so never zero or negative
+    quantity: int = Field(ge=1)
+    # Chosen modifiers, checked against the item's option groups
+    option_ids: List[int] = []
 
 
 # Request schema for placing an order
@@ -15,11 +19,24 @@ class OrderCreate(BaseModel):
     items: List[OrderItemCreate]
 
 
+# Response schema for chosen options
+class OrderItemOptionOut(BaseModel):
+    option_id: int | None
+    name: str
+    price_delta: float
+
+    class Config:
+        orm_mode = True
+
+
 # Response schema for order items
 class OrderItemOut(BaseModel):
     id: int
     menu_item_id: int
+    name: str
+    unit_price: float
     quantity: int
+    options: List[OrderItemOptionOut] = []
 
     class Config:
         orm_mode = True
@@ -32,6 +49,7 @@ class OrderOut(BaseModel):
     table_id: int
     total_amount: float
     is_completed: bool
+    abandoned_at: Optional[datetime] = None
     items: List[OrderItemOut]
 
     class Config:
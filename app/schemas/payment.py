@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class PaymentCreate(BaseModel):
+    order_id: int
+    method: Literal["CASH", "CARD", "UPI", "OTHER"]
+    amount: float = Field(gt=0)
+    # Chosen by the client and reused on retries; a capture with a key
+    # already seen for the order returns the original payment
+    idempotency_key: str = Field(min_length=1, max_length=255)
+    txn_ref: str | None = None
+
+
+class RefundCreate(BaseModel):
+    # Defaults to everything not yet refunded
+    amount: float | None = Field(default=None, gt=0)
+
+
+class PaymentOut(BaseModel):
+    id: int
+    order_id: int
+    method: str
+    status: str
+    amount: float
+    refunded_amount: float
+    idempotency_key: str
+    txn_ref: str | None
+    paid_at: datetime | None
+    refunded_at: datetime | None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class CaptureOut(BaseModel):
+    payment: PaymentOut
+    order_total: float
+    amount_paid: float
+    balance_due: float
+    order_completed: bool
@@ -0,0 +1,20 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class DailySalesOut(BaseModel):
+    sales_date: date
+    order_count: int
+    item_count: int
+    revenue: float
+
+    class Config:
+        from_attributes = True
+
+
+class TopItemOut(BaseModel):
+    menu_item_id: int
+    name: str
+    quantity: int
+    revenue: float
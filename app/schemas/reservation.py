@@ -0,0 +1,79 @@
+from datetime import datetime
+from enum import Enum
+
+from app.schemas.customer import normalize_phone
+from pydantic import AwareDatetime, BaseModel, Field, field_validator
+
+
+class ReservationStatusEnum(str, Enum):
+    BOOKED = "BOOKED"
+    SEATED = "SEATED"
+    COMPLETED = "COMPLETED"
+    CANCELLED = "CANCELLED"
+    NO_SHOW = "NO_SHOW"
+
+
+class ReservationCreate(BaseModel):
+    # None books the smallest table that seats the party and is free for
+    # the whole time
+    table_id: int | None = None
+    customer_id: int | None = None
+    guest_name: str = Field(min_length=1, max_length=100)
+    phone: str | None = None
+    party_size: int = Field(ge=1)
+    starts_at: AwareDatetime
+    ends_at: AwareDatetime
+    notes: str | None = Field(default=None, max_length=500)
+
+    _normalize_phone = field_validator("phone")(normalize_phone)
+
+
+# PATCH body; only the fields sent are written (null leaves one as is).
+# CANCELLED, COMPLETED and NO_SHOW free the table.
+class ReservationUpdate(BaseModel):
+    table_id: int | None = None
+    guest_name: str | None = Field(default=None, min_length=1, max_length=100)
+    phone: str | None = None
+    party_size: int | None = Field(default=None, ge=1)
+    starts_at: AwareDatetime | None = None
+    ends_at: AwareDatetime | None = None
+    status: ReservationStatusEnum | None = None
+    notes: str | None = Field(default=None, max_length=500)
+
+    _normalize_phone = field_validator("phone")(normalize_phone)
+
+
+class ReservationOut(BaseModel):
+    id: int
+    restaurant_id: int
+    table_id: int
+    customer_id: int | None = None
+    guest_name: str
+    phone: str | None = None
+    party_size: int
+    starts_at: datetime
+    ends_at: datetime
+    status: ReservationStatusEnum
+    notes: str | None = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class FreeTable(BaseModel):
+    id: int
+    table_number: int
+    seats: int
+
+
+class AvailabilitySlot(BaseModel):
+    starts_at: datetime
+    ends_at: datetime
+    # Smallest first
+    tables: list[FreeTable]
+
+
+class AvailabilityOut(BaseModel):
+    party_size: int
+    slots: list[AvailabilitySlot]
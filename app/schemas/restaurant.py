@@ -12,6 +12,14 @@ class RestaurantCreate(RestaurantBase):
     pass
 
 
+# PATCH body; only the fields sent are written (null leaves one as is)
+class RestaurantUpdate(BaseModel):
+    name: str | None = None
+    time_zone: str | None = None
+    currency: str | None = None
+    location: str | None = None
+
+
 class RestaurantOut(RestaurantBase):
     id: int
     is_deleted: bool
@@ -1,6 +1,6 @@
 from enum import Enum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class TableStatusEnum(str, Enum):
@@ -13,16 +13,20 @@ class TableStatusEnum(str, Enum):
 class TableBase(BaseModel):
     table_number: int
     status: TableStatusEnum
+    seats: int
 
 
 class TableCreate(BaseModel):
     table_number: int
     status: TableStatusEnum = TableStatusEnum.AVAILABLE
+    seats: int = Field(default=4, ge=1)
 
 
+# PATCH body; only the fields sent are written (null leaves one as is)
 class TableUpdate(BaseModel):
-    table_number: str | None = None
+    table_number: int | None = None
     status: TableStatusEnum | None = None
+    seats: int | None = Field(default=None, ge=1)
 
 
 class TableOut(TableBase):
@@ -31,3 +35,12 @@ class TableOut(TableBase):
 
     class Config:
         orm_mode = True
+
+
+class TableQROut(BaseModel):
+    table_id: int
+    table_number: int
+    qr_version: int
+    # What the printed code encodes
+    url: str
+    png_url: str
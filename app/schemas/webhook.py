@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field, HttpUrl
+
+WebhookEvent = Literal["order.placed", "payment.captured", "payment.refunded"]
+
+
+class WebhookCreate(BaseModel):
+    url: HttpUrl
+    events: list[WebhookEvent] = Field(min_length=1)
+
+
+# PATCH body; only the fields sent are written (null leaves one as is)
+class WebhookUpdate(BaseModel):
+    url: HttpUrl | None = None
+    events: list[WebhookEvent] | None = Field(default=None, min_length=1)
+    is_active: bool | None = None
+
+
+class WebhookOut(BaseModel):
+    id: int
+    restaurant_id: int
+    url: str
+    events: list[str]
+    is_active: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class WebhookCreated(WebhookOut):
+    # Shown once; verifies the X-Webhook-Signature of every request
+    secret: str
+
+
+class WebhookDeliveryOut(BaseModel):
+    id: int
+    subscription_id: int
+    event: str
+    payload: dict
+    attempts: int
+    available_at: datetime
+    delivered_at: datetime | None = None
+    failed_at: datetime | None = None
+    last_status: int | None = None
+    last_error: str | None = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class WebhookDeliveryPage(BaseModel):
+    items: list[WebhookDeliveryOut]
+    # Pass back as ?cursor= for the next page; None on the last page
+    next_cursor: str | None = None
@@ -0,0 +1,113 @@
+"""Production server: ``python -m app.serve``.
+
+Runs gunicorn with uvicorn workers when gunicorn is installed (preloading
+the app so workers fork from a warm import), otherwise uvicorn's own
+process manager. Worker count comes from ``WEB_CONCURRENCY`` or the CPU
+count, and every worker's SQLAlchemy pool is sized so that all workers
+together stay within ``DB_MAX_CONNECTIONS``.
+"""
+
+import importlib.util
+import logging
+import os
+
+from app.core.config import Settings, get_settings
+
+logger = logging.getLogger("app.serve")
+
+# Connections each worker holds outside its pool: the broadcast listener
+# detaches its LISTEN connection (app.core.broadcast)
+UNPOOLED_CONNECTIONS = 1
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def worker_count(settings: Settings) -> int:
+    workers = settings.WEB_CONCURRENCY or os.cpu_count() or 1
+    # Every worker needs its unpooled connections plus one in the pool
+    budget = settings.DB_MAX_CONNECTIONS - settings.DB_RESERVED_CONNECTIONS
+    return max(1, min(workers, budget // (UNPOOLED_CONNECTIONS + 1)))
+
+
+def pool_sizes(settings: Settings, workers: int) -> tuple[int, int]:
+    """``(pool_size, max_overflow)`` per worker within the connection cap."""
+    budget = settings.DB_MAX_CONNECTIONS - settings.DB_RESERVED_CONNECTIONS
+    per_worker = max(1, budget // workers - UNPOOLED_CONNECTIONS)
+    pool_size = min(settings.DB_POOL_SIZE, per_worker)
+    max_overflow = min(settings.DB_MAX_OVERFLOW, per_worker - pool_size)
+    return pool_size, max_overflow
+
+
+def _run_gunicorn(settings: Settings, workers: int) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    class Server(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{settings.HOST}:{settings.PORT}",
+                "workers": workers,
+                # Picks uvloop and httptools when they are installed
+                "worker_class": "uvicorn.workers.UvicornWorker",
+                # Safe: create_app opens no connections, and each worker
+                # builds its own engine in the lifespan after the fork.
+                "preload_app": True,
+                "max_requests": settings.MAX_REQUESTS,
+                "max_requests_jitter": settings.MAX_REQUESTS_JITTER,
+                "graceful_timeout": 30,
+                "keepalive": 5,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import create_app
+
+            return create_app()
+
+    Server().run()
+
+
+def _run_uvicorn(settings: Settings, workers: int) -> None:
+    import uvicorn
+
+    uvicorn.run(
+        "app.main:create_app",
+        factory=True,
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=workers,
+        loop="uvloop" if _installed("uvloop") else "asyncio",
+        http="httptools" if _installed("httptools") else "h11",
+        limit_max_requests=settings.MAX_REQUESTS or None,
+    )
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+    workers = worker_count(settings)
+    pool_size, max_overflow = pool_sizes(settings, workers)
+    # Workers read their pool size from the environment
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+    settings.DB_POOL_SIZE = pool_size
+    settings.DB_MAX_OVERFLOW = max_overflow
+
+    logger.info(
+        "starting %d workers, pool %d+%d each (%d of %d connections)",
+        workers,
+        pool_size,
+        max_overflow,
+        workers * (pool_size + max_overflow),
+        settings.DB_MAX_CONNECTIONS,
+    )
+    if _installed("gunicorn"):
+        _run_gunicorn(settings, workers)
+    else:
+        _run_uvicorn(settings, workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+import argparse
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+from app.models.order import Order, OrderItem
+from app.models.restaurant import Restaurant
+from sqlalchemy import extract, func, select
+from sqlalchemy.orm import Session
+
+BATCH_SIZE = 50_000
+
+
+@dataclass
+class OrderLines:
+    """Order history as parallel column arrays, one entry per order line."""
+
+    order_id: np.ndarray
+    restaurant_id: np.ndarray
+    menu_item_id: np.ndarray
+    quantity: np.ndarray
+    revenue: np.ndarray
+    # Local (restaurant time zone) day-of-week, 0 = Sunday, and hour
+    weekday: np.ndarray
+    hour: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.order_id)
+
+
+_COLUMNS = (
+    ("order_id", np.int64),
+    ("restaurant_id", np.int64),
+    ("menu_item_id", np.int64),
+    ("quantity", np.int64),
+    ("revenue", np.float64),
+    ("weekday", np.int8),
+    ("hour", np.int8),
+)
+
+
+def synthetic_lines(
+    count: int,
+    restaurants: int = 20,
+    items: int = 500,
+    lines_per_order: int = 3,
+    seed: int = 0,
+) -> OrderLines:
+    """``count`` random order lines, for benchmarks and tests."""
+    rng = np.random.default_rng(seed)
+    quantity = rng.integers(1, 5, count)
+    return OrderLines(
+        order_id=np.arange(count) // lines_per_order,
+        restaurant_id=rng.integers(1, restaurants + 1, count),
+        menu_item_id=rng.integers(1, items + 1, count),
+        quantity=quantity,
+        revenue=quantity * rng.uniform(20, 500, count).round(2),
+        weekday=rng.integers(0, 7, count).astype(np.int8),
+        hour=rng.integers(0, 24, count).astype(np.int8),
+    )
+
+
+def load_order_lines(
+    db: Session,
+    restaurant_ids: list[int],
+    start: datetime,
+    end: datetime,
+) -> OrderLines:
+    """Pull order lines in ``[start, end)`` straight into NumPy columns.
+
+    Rows come from a Core select streamed in ``BATCH_SIZE`` partitions, so no
+    ORM objects are built and each batch is converted with one array call.
+    """
+    local_ts = func.timezone(
+        func.coalesce(Restaurant.time_zone, "UTC"), Order.created_at
+    )
+    stmt = (
+        select(
+            OrderItem.order_id,
+            Order.restaurant_id,
+            OrderItem.menu_item_id,
+            OrderItem.quantity,
+            (OrderItem.quantity * OrderItem.unit_price).label("revenue"),
+            extract("dow", local_ts).label("weekday"),
+            extract("hour", local_ts).label("hour"),
+        )
+        .join(
+            Order,
+            (Order.id == OrderItem.order_id)
+            & (Order.created_at == OrderItem.order_created_at),
+        )
+        .join(Restaurant, Restaurant.id == Order.restaurant_id)
+        .where(
+            Order.restaurant_id.in_(restaurant_ids),
+            Order.created_at >= start,
+            Order.created_at < end,
+            # Repeated on the lines so their partitions are pruned too
+            OrderItem.order_created_at >= start,
+            OrderItem.order_created_at < end,
+        )
+    )
+
+    chunks = []
+    result = db.execute(stmt, execution_options={"yield_per": BATCH_SIZE})
+    for rows in result.partitions():
+        chunks.append(np.array(rows, dtype=np.float64))
+    if chunks:
+        table = np.concatenate(chunks)
+    else:
+        table = np.empty((0, len(_COLUMNS)))
+    return OrderLines(
+        **{
+            name: table[:, i].astype(dtype)
+            for i, (name, dtype) in enumerate(_COLUMNS)
+        }
+    )
+
+
+def concat(parts: list[OrderLines]) -> OrderLines:
+    """One ``OrderLines`` holding the lines of all ``parts``."""
+    if len(parts) == 1:
+        return parts[0]
+    return OrderLines(
+        **{
+            name: np.concatenate([getattr(part, name) for part in parts])
+            for name, _ in _COLUMNS
+        }
+    )
+
+
+def _group(keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Distinct ``keys`` and each element's group index.
+
+    Ids are usually dense, so an offset bincount avoids the sort that
+    ``np.unique`` needs; sparse keys fall back to it.
+    """
+    if not len(keys):
+        return keys, keys
+    low = keys.min()
+    span = int(keys.max() - low) + 1
+    if span > 4 * len(keys):
+        return np.unique(keys, return_inverse=True)
+    offset = keys - low
+    present = np.flatnonzero(np.bincount(offset, minlength=span))
+    lookup = np.empty(span, dtype=np.int64)
+    lookup[present] = np.arange(len(present))
+    return present + low, lookup[offset]
+
+
+def revenue_by_restaurant(
+    lines: OrderLines, restaurant_ids: list[int]
+) -> np.ndarray:
+    """Total revenue per restaurant, aligned with ``restaurant_ids``."""
+    ids = np.asarray(restaurant_ids, dtype=np.int64)
+    order = np.argsort(ids)
+    pos = np.searchsorted(ids, lines.restaurant_id, sorter=order)
+    return np.bincount(order[pos], weights=lines.revenue, minlength=len(ids))
+
+
+def item_mix(lines: OrderLines) -> tuple[np.ndarray, ...]:
+    """Quantity and revenue per menu item, best sellers first."""
+    items, inverse = _group(lines.menu_item_id)
+    quantity = np.bincount(inverse, weights=lines.quantity)
+    revenue = np.bincount(inverse, weights=lines.revenue)
+    rank = np.argsort(-quantity, kind="stable")
+    return items[rank], quantity[rank], revenue[rank]
+
+
+def basket_sizes(lines: OrderLines) -> tuple[np.ndarray, np.ndarray]:
+    """Items and revenue per order."""
+    _, inverse = _group(lines.order_id)
+    return (
+        np.bincount(inverse, weights=lines.quantity),
+        np.bincount(inverse, weights=lines.revenue),
+    )
+
+
+def hourly_heatmap(lines: OrderLines) -> np.ndarray:
+    """7x24 revenue grid indexed by local weekday (0 = Sunday) and hour."""
+    cell = lines.weekday.astype(np.int64) * 24 + lines.hour
+    return np.bincount(cell, weights=lines.revenue, minlength=7 * 24).reshape(
+        7, 24
+    )
+
+
+def _aggregate_in_python(lines: OrderLines, restaurant_ids: list[int]):
+    # The row-at-a-time loop the array group-bys replace
+    by_restaurant = dict.fromkeys(restaurant_ids, 0.0)
+    by_item = defaultdict(lambda: [0, 0.0])
+    by_order = defaultdict(lambda: [0, 0.0])
+    heatmap = [[0.0] * 24 for _ in range(7)]
+    for order_id, restaurant_id, item_id, quantity, revenue, day, hour in zip(
+        *(getattr(lines, name).tolist() for name, _ in _COLUMNS)
+    ):
+        by_restaurant[restaurant_id] += revenue
+        by_item[item_id][0] += quantity
+        by_item[item_id][1] += revenue
+        by_order[order_id][0] += quantity
+        by_order[order_id][1] += revenue
+        heatmap[day][hour] += revenue
+    return by_restaurant, by_item, by_order, heatmap
+
+
+def _aggregate(lines: OrderLines, restaurant_ids: list[int]):
+    return (
+        revenue_by_restaurant(lines, restaurant_ids),
+        item_mix(lines),
+        basket_sizes(lines),
+        hourly_heatmap(lines),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time the analytics group-bys against a Python loop "
+        "over synthetic order lines."
+    )
+    parser.add_argument("--lines", type=int, default=3_000_000)
+    parser.add_argument("--restaurants", type=int, default=20)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    lines = synthetic_lines(
+        args.lines, args.restaurants, args.items, seed=args.seed
+    )
+    restaurant_ids = list(range(1, args.restaurants + 1))
+    started = time.perf_counter()
+    revenue, *_ = _aggregate(lines, restaurant_ids)
+    vectorized = time.perf_counter() - started
+    started = time.perf_counter()
+    by_restaurant, *_ = _aggregate_in_python(lines, restaurant_ids)
+    looped = time.perf_counter() - started
+    assert np.allclose(revenue, [by_restaurant[i] for i in restaurant_ids])
+    print(
+        f"{len(lines):,} lines: numpy {vectorized:.2f}s, "
+        f"python {looped:.2f}s ({looped / vectorized:.0f}x)"
+    )
@@ -0,0 +1,157 @@
+import csv
+import io
+import json
+import zlib
+from collections.abc import Iterator
+from datetime import datetime
+
+from app.db.session import get_engine
+from app.models.order import Order, OrderItem
+from sqlalchemy import select
+
+FETCH_SIZE = 2_000
+CHUNK_SIZE = 64 * 1024
+
+CSV_COLUMNS = [
+    "order_id",
+    "table_id",
+    "created_at",
+    "is_completed",
+    "total_amount",
+    "order_item_id",
+    "menu_item_id",
+    "item_name",
+    "quantity",
+    "unit_price",
+]
+
+
+def _export_query(
+    restaurant_id: int,
+    start: datetime | None,
+    end: datetime | None,
+    completed: bool | None,
+):
+    stmt = (
+        select(
+            Order.id.label("order_id"),
+            Order.table_id,
+            Order.created_at,
+            Order.is_completed,
+            Order.total_amount,
+            OrderItem.id.label("order_item_id"),
+            OrderItem.menu_item_id,
+            OrderItem.name.label("item_name"),
+            OrderItem.quantity,
+            OrderItem.unit_price,
+        )
+        .where(Order.restaurant_id == restaurant_id)
+        .order_by(Order.id, OrderItem.id)
+    )
+    # Lines share their order's partition key; bounding it on both sides
+    # of the join lets Postgres skip months outside the range
+    line_of_order = (OrderItem.order_id == Order.id) & (
+        OrderItem.order_created_at == Order.created_at
+    )
+    if start is not None:
+        stmt = stmt.where(Order.created_at >= start)
+        line_of_order &= OrderItem.order_created_at >= start
+    if end is not None:
+        stmt = stmt.where(Order.created_at < end)
+        line_of_order &= OrderItem.order_created_at < end
+    stmt = stmt.outerjoin(OrderItem, line_of_order)
+    if completed is not None:
+        stmt = stmt.where(Order.is_completed.is_(completed))
+    return stmt
+
+
+def _rows(stmt) -> Iterator:
+    # Server-side cursor: rows are fetched FETCH_SIZE at a time and never
+    # pass through a Session, so memory stays flat whatever the export size.
+    with get_engine().connect() as conn:
+        result = conn.execution_options(
+            stream_results=True, yield_per=FETCH_SIZE
+        ).execute(stmt)
+        yield from result
+
+
+def _csv_lines(rows) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for row in rows:
+        writer.writerow(
+            [
+                row.created_at.isoformat() if name == "created_at" else value
+                for name, value in zip(CSV_COLUMNS, row)
+            ]
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_lines(rows) -> Iterator[str]:
+    # Rows arrive ordered by order id, so each order's lines are adjacent
+    # and only one order is held in memory at a time.
+    current = None
+    for row in rows:
+        if current is None or current["id"] != row.order_id:
+            if current is not None:
+                yield json.dumps(current) + "\n"
+            current = {
+                "id": row.order_id,
+                "table_id": row.table_id,
+                "created_at": row.created_at.isoformat(),
+                "is_completed": row.is_completed,
+                "total_amount": row.total_amount,
+                "items": [],
+            }
+        if row.order_item_id is not None:
+            current["items"].append(
+                {
+                    "id": row.order_item_id,
+                    "menu_item_id": row.menu_item_id,
+                    "name": row.item_name,
+                    "quantity": row.quantity,
+                    "unit_price": row.unit_price,
+                }
+            )
+    if current is not None:
+        yield json.dumps(current) + "\n"
+
+
+def _chunked(lines: Iterator[str], compress: bool) -> Iterator[bytes]:
+    gzip = zlib.compressobj(wbits=31) if compress else None
+    pending = []
+    size = 0
+    for line in lines:
+        data = line.encode()
+        pending.append(data)
+        size += len(data)
+        if size >= CHUNK_SIZE:
+            chunk = b"".join(pending)
+            pending, size = [], 0
+            chunk = gzip.compress(chunk) if gzip else chunk
+            if chunk:
+                yield chunk
+    chunk = b"".join(pending)
+    if gzip:
+        chunk = gzip.compress(chunk) + gzip.flush()
+    if chunk:
+        yield chunk
+
+
+def export_orders(
+    restaurant_id: int,
+    fmt: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    completed: bool | None = None,
+    compress: bool = False,
+) -> Iterator[bytes]:
+    """Stream a restaurant's orders and lines as CSV or NDJSON bytes."""
+    rows = _rows(_export_query(restaurant_id, start, end, completed))
+    lines = _ndjson_lines(rows) if fmt == "ndjson" else _csv_lines(rows)
+    return _chunked(lines, compress)
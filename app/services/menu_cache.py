@@ -0,0 +1,180 @@
+import argparse
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.compression import CODECS, compress
+from app.core.config import get_settings
+from app.models.category import Category
+from app.models.menu import MenuItem
+from app.models.restaurant import Restaurant
+from app.schemas.menu import MenuCategoryOut
+from pydantic import TypeAdapter
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+_menu_adapter = TypeAdapter(list[MenuCategoryOut])
+
+
+class CachedPayload:
+    """Serialized JSON plus its compressed forms, built on first use."""
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self._encoded: dict[str, bytes] = {}
+
+    def body(self, encoding: str | None) -> bytes:
+        if encoding is None:
+            return self.raw
+        body = self._encoded.get(encoding)
+        if body is None:
+            body = compress(self.raw, encoding, cached=True)
+            self._encoded[encoding] = body
+        return body
+
+
+class MenuCache:
+    """LRU of per-menu data keyed by ``(restaurant_id, menu_version)``.
+
+    A menu change bumps ``Restaurant.menu_version`` in the same transaction,
+    so stale entries are simply never asked for again and age out.
+    """
+
+    def __init__(self, size: int | None = None):
+        # None: MENU_CACHE_SIZE
+        self._size = size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            size = self._size or get_settings().MENU_CACHE_SIZE
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+        return value
+
+
+menu_cache = MenuCache()
+
+
+def bump_menu_version(db: Session, restaurant_id) -> int | None:
+    """Invalidate cached menus and return the new version.
+
+    ``restaurant_id`` may be a subquery.
+    """
+    return db.execute(
+        update(Restaurant)
+        .where(Restaurant.id == restaurant_id)
+        .values(menu_version=Restaurant.menu_version + 1)
+        .returning(Restaurant.menu_version)
+    ).scalar()
+
+
+def full_menu(db: Session, restaurant_id: int) -> CachedPayload:
+    version = (
+        db.query(Restaurant.menu_version)
+        .filter(Restaurant.id == restaurant_id)
+        .scalar()
+    )
+    key = (restaurant_id, version)
+    payload = menu_cache.get(key)
+    if payload is not None:
+        return payload
+
+    categories = (
+        db.query(Category)
+        .filter(Category.restaurant_id == restaurant_id)
+        .order_by(Category.id)
+        .all()
+    )
+    items = (
+        db.query(MenuItem)
+        .join(Category, MenuItem.category_id == Category.id)
+        .filter(Category.restaurant_id == restaurant_id)
+        .order_by(MenuItem.id)
+        .all()
+    )
+    by_category = {category.id: [] for category in categories}
+    for item in items:
+        by_category[item.category_id].append(item)
+    tree = [
+        MenuCategoryOut.model_validate(
+            {
+                "id": category.id,
+                "name": category.name,
+                "items": by_category[category.id],
+            },
+            from_attributes=True,
+        )
+        for category in categories
+    ]
+    return menu_cache.put(key, CachedPayload(_menu_adapter.dump_json(tree)))
+
+
+def synthetic_menu(
+    categories: int = 10, items: int = 15, seed: int = 0
+) -> bytes:
+    """JSON of a random ``categories`` x ``items`` menu, for benchmarks
+    and tests."""
+    rng = random.Random(seed)
+    dishes = ("Paneer", "Dal", "Masala", "Tikka", "Biryani", "Dosa", "Naan")
+    tree = [
+        MenuCategoryOut(
+            id=category,
+            name=f"Category {category}",
+            items=[
+                {
+                    "id": category * items + item,
+                    "name": f"{rng.choice(dishes)} {rng.choice(dishes)}",
+                    "price": round(rng.uniform(40, 600), 2),
+                    "is_available": rng.random() > 0.1,
+                    "is_deleted": False,
+                }
+                for item in range(items)
+            ],
+        )
+        for category in range(1, categories + 1)
+    ]
+    return _menu_adapter.dump_json(tree)
+
+
+def _per_call(run, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - started) / repeat
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare compressing a synthetic menu per response "
+        "with serving its cached compressed bytes."
+    )
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--items", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    raw = synthetic_menu(args.categories, args.items)
+    print(f"{args.categories} x {args.items} menu: {len(raw):,} B raw JSON")
+    for encoding, (_, level, cached_level) in CODECS.items():
+        live = compress(raw, encoding)
+        live_time = _per_call(lambda: compress(raw, encoding), args.repeat)
+        payload = CachedPayload(raw)
+        cached = payload.body(encoding)
+        hit_time = _per_call(lambda: payload.body(encoding), args.repeat)
+        print(
+            f"{encoding:>5}  on the fly (level {level}) {len(live):,} B "
+            f"{live_time * 1e6:.0f} us | cached (level {cached_level}) "
+            f"{len(cached):,} B {hit_time * 1e6:.1f} us"
+        )
@@ -0,0 +1,190 @@
+from dataclasses import dataclass, field
+
+from app.models.category import Category
+from app.models.menu import MenuItem
+from app.models.option import Option, OptionGroup, item_option_groups
+from app.models.restaurant import Restaurant
+from app.services.menu_cache import MenuCache
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+
+class OptionError(ValueError):
+    """An order line's option choice breaks the menu's rules."""
+
+
+@dataclass(frozen=True)
+class GroupRule:
+    id: int
+    name: str
+    min_select: int
+    max_select: int
+
+
+@dataclass(frozen=True)
+class OptionRule:
+    id: int
+    group_id: int
+    name: str
+    price_delta: float
+    is_available: bool
+
+
+@dataclass
+class ItemRule:
+    id: int
+    name: str
+    price: float
+    is_available: bool = True
+    groups: tuple[GroupRule, ...] = ()
+
+
+@dataclass
+class PricedLine:
+    menu_item_id: int
+    name: str
+    unit_price: float
+    options: tuple[OptionRule, ...]
+
+    @property
+    def options_key(self) -> str:
+        return ",".join(str(option.id) for option in self.options)
+
+
+@dataclass
+class MenuRules:
+    """Everything needed to validate and price order lines, in memory."""
+
+    items: dict[int, ItemRule] = field(default_factory=dict)
+    options: dict[int, OptionRule] = field(default_factory=dict)
+
+    def price(self, menu_item_id: int, option_ids: list[int]) -> PricedLine:
+        """Check one line's option choice and price it.
+
+        Raises ``KeyError`` for an unknown menu item and ``OptionError``
+        for a sold-out item or an option choice the item's groups do not
+        allow.
+        """
+        item = self.items[menu_item_id]
+        if not item.is_available:
+            raise OptionError(f"{item.name} is not available")
+        if len(set(option_ids)) != len(option_ids):
+            raise OptionError("An option was chosen more than once")
+
+        allowed = {group.id for group in item.groups}
+        chosen = []
+        counts: dict[int, int] = {}
+        for option_id in option_ids:
+            option = self.options.get(option_id)
+            if option is None or option.group_id not in allowed:
+                raise OptionError(
+                    f"Option {option_id} is not offered for {item.name}"
+                )
+            if not option.is_available:
+                raise OptionError(f"{option.name} is not available")
+            chosen.append(option)
+            counts[option.group_id] = counts.get(option.group_id, 0) + 1
+
+        for group in item.groups:
+            count = counts.get(group.id, 0)
+            if count < group.min_select:
+                raise OptionError(
+                    f"Choose at least {group.min_select} of {group.name}"
+                )
+            if count > group.max_select:
+                raise OptionError(
+                    f"Choose at most {group.max_select} of {group.name}"
+                )
+
+        chosen.sort(key=lambda option: option.id)
+        return PricedLine(
+            menu_item_id=item.id,
+            name=item.name,
+            unit_price=item.price
+            + sum(option.price_delta for option in chosen),
+            options=tuple(chosen),
+        )
+
+
+# Compiled rules per (restaurant_id, menu_version); every menu or option
+# change bumps the version, so entries never need invalidating
+rules_cache = MenuCache()
+
+
+def compile_rules(db: Session, restaurant_id: int) -> MenuRules:
+    """Build a restaurant's rules with three set-based queries."""
+    rules = MenuRules()
+    items = db.execute(
+        select(
+            MenuItem.id,
+            MenuItem.name,
+            MenuItem.price,
+            MenuItem.is_available,
+        )
+        .join(Category, MenuItem.category_id == Category.id)
+        .where(Category.restaurant_id == restaurant_id)
+    ).all()
+    for row in items:
+        # NULL predates the column's default and counts as available
+        rules.items[row.id] = ItemRule(
+            row.id, row.name, row.price, row.is_available is not False
+        )
+
+    groups = db.execute(
+        select(
+            item_option_groups.c.menu_item_id,
+            OptionGroup.id,
+            OptionGroup.name,
+            OptionGroup.min_select,
+            OptionGroup.max_select,
+            OptionGroup.required,
+        )
+        .join(
+            item_option_groups,
+            item_option_groups.c.option_group_id == OptionGroup.id,
+        )
+        .where(OptionGroup.restaurant_id == restaurant_id)
+        .order_by(OptionGroup.id)
+    ).all()
+    compiled: dict[int, GroupRule] = {}
+    for row in groups:
+        group = compiled.get(row.id)
+        if group is None:
+            group = compiled[row.id] = GroupRule(
+                row.id,
+                row.name,
+                max(row.min_select, int(row.required)),
+                row.max_select,
+            )
+        item = rules.items.get(row.menu_item_id)
+        if item is not None:
+            item.groups += (group,)
+
+    options = db.execute(
+        select(
+            Option.id,
+            Option.option_group_id,
+            Option.name,
+            Option.price_delta,
+            Option.is_available,
+        )
+        .join(OptionGroup, Option.option_group_id == OptionGroup.id)
+        .where(OptionGroup.restaurant_id == restaurant_id)
+    ).all()
+    for row in options:
+        rules.options[row.id] = OptionRule(
+            row.id,
+            row.option_group_id,
+            row.name,
+            row.price_delta,
+            bool(row.is_available),
+        )
+    return rules
+
+
+def menu_rules(db: Session, restaurant: Restaurant) -> MenuRules:
+    key = (restaurant.id, restaurant.menu_version)
+    rules = rules_cache.get(key)
+    if rules is None:
+        rules = rules_cache.put(key, compile_rules(db, restaurant.id))
+    return rules
@@ -0,0 +1,314 @@
+import argparse
+import gzip
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+
+from app.core.config import get_settings
+from app.db.session import get_engine
+from app.models.payment import Payment
+from sqlalchemy import Connection, delete, select, text
+
+logger = logging.getLogger(__name__)
+
+# Partitioned parents and their partition key, referenced tables first
+PARTITIONED = (
+    ("orders", "created_at"),
+    ("order_items", "order_created_at"),
+    ("order_item_options", "order_created_at"),
+)
+_MONTHLY = re.compile(r"^orders_p(\d{4})_(\d{2})$")
+# Any process may run maintenance; this advisory lock makes it one at a time
+_LOCK_KEY = 0x6F726472
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month: date) -> datetime:
+    # Month boundaries are UTC midnights
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def ensure_partitions(
+    conn: Connection, months_ahead: int, today: date | None = None
+) -> list[str]:
+    """Create the default and monthly partitions up to ``months_ahead``.
+
+    Creating next months' partitions ahead of time keeps rows out of the
+    default partition, which would otherwise have to be scanned (and
+    emptied) before a partition covering them could be attached.
+    Returns the names of the partitions created.
+    """
+    created = []
+    month = _month_start(today or datetime.now(timezone.utc).date())
+    for table, _ in PARTITIONED:
+        conn.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {table}_default "
+                f"PARTITION OF {table} DEFAULT"
+            )
+        )
+    for offset in range(months_ahead + 1):
+        start = _add_months(month, offset)
+        for table, _ in PARTITIONED:
+            name = partition_name(table, start)
+            exists = conn.execute(
+                text("SELECT to_regclass(:name)"), {"name": name}
+            ).scalar()
+            if exists:
+                continue
+            conn.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF {table} "
+                    "FOR VALUES FROM (:start) TO (:end)"
+                ).bindparams(
+                    start=_bound(start), end=_bound(_add_months(start, 1))
+                )
+            )
+            created.append(name)
+    return created
+
+
+def monthly_partitions(conn: Connection) -> list[date]:
+    """Months that have an ``orders`` partition, oldest first."""
+    names = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'orders'::regclass"
+        )
+    ).scalars()
+    months = []
+    for name in names:
+        match = _MONTHLY.match(name)
+        if match:
+            months.append(date(int(match[1]), int(match[2]), 1))
+    return sorted(months)
+
+
+def _copy_out(conn: Connection, query: str, path: str) -> None:
+    # COPY straight from the server into a gzip file, without loading
+    # the month into Python. COPY TO STDOUT is driver API, not DBAPI:
+    # psycopg2 has copy_expert, psycopg 3 a copy() context manager.
+    driver = conn.connection.driver_connection
+    sql = f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)"
+    with gzip.open(path, "wb") as out:
+        cursor = driver.cursor()
+        try:
+            if hasattr(cursor, "copy_expert"):
+                cursor.copy_expert(sql, out)
+            elif hasattr(cursor, "copy"):
+                with cursor.copy(sql) as copy:
+                    for chunk in copy:
+                        out.write(chunk)
+            else:
+                raise RuntimeError(
+                    "archiving needs COPY support, which the "
+                    f"{conn.dialect.driver} driver does not offer"
+                )
+        finally:
+            cursor.close()
+        out.flush()
+        os.fsync(out.fileobj.fileno())
+
+
+def archive_month(conn: Connection, month: date, archive_dir: str) -> bool:
+    """Archive one month of orders to CSV files and drop its partitions.
+
+    Skipped (returns False) while the month still has open orders. The
+    month's orders, lines, options and payments are written to
+    ``archive_dir/YYYY_MM/<table>.csv.gz`` first; then, in one
+    transaction, its payments are deleted and its partitions detached
+    and dropped. Daily rollups are separate tables and keep the month's
+    figures.
+    """
+    orders = partition_name("orders", month)
+    still_open = conn.execute(
+        text(f"SELECT count(*) FROM {orders} WHERE is_completed IS NOT true")
+    ).scalar()
+    if still_open:
+        logger.warning(
+            "not archiving %s: %s orders still open", orders, still_open
+        )
+        conn.rollback()
+        return False
+
+    target = os.path.join(archive_dir, f"{month:%Y_%m}")
+    os.makedirs(target, exist_ok=True)
+    start, end = _bound(month), _bound(_add_months(month, 1))
+    for table, _ in PARTITIONED:
+        name = partition_name(table, month)
+        _copy_out(
+            conn,
+            f"SELECT * FROM {name} ORDER BY id",
+            os.path.join(target, f"{table}.csv.gz"),
+        )
+    payments = Payment.__table__
+    in_month = (
+        payments.c.order_created_at >= start,
+        payments.c.order_created_at < end,
+    )
+    # COPY takes no parameters, so the bounds are rendered by the
+    # dialect as literals
+    query = (
+        select(payments)
+        .where(*in_month)
+        .order_by(payments.c.id)
+        .compile(conn, compile_kwargs={"literal_binds": True})
+    )
+    _copy_out(conn, str(query), os.path.join(target, "payments.csv.gz"))
+
+    conn.execute(delete(payments).where(*in_month))
+    # Referencing tables first, so no foreign key points into a
+    # partition as it is detached
+    for table, _ in reversed(PARTITIONED):
+        name = partition_name(table, month)
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        conn.execute(text(f"DROP TABLE {name}"))
+    conn.commit()
+    logger.info("archived %s to %s", orders, target)
+    return True
+
+
+def close_stale_orders(conn: Connection, max_age_hours: int) -> int:
+    """Close orders left open for more than ``max_age_hours``.
+
+    ``place_order`` stops adding to an order at that age, so nothing
+    would close one that was never paid in full; marking it completed
+    and abandoned lets its month be archived. Returns the number closed.
+    """
+    closed = conn.execute(
+        text(
+            "UPDATE orders SET is_completed = true, abandoned_at = now() "
+            "WHERE is_completed IS NOT true "
+            "AND created_at < now() - make_interval(hours => :hours)"
+        ),
+        {"hours": max_age_hours},
+    ).rowcount
+    conn.commit()
+    return closed
+
+
+def maintain(
+    conn: Connection,
+    months_ahead: int,
+    archive_after_months: int | None,
+    archive_dir: str,
+    today: date | None = None,
+    open_order_max_age_hours: int | None = None,
+) -> None:
+    """Create upcoming partitions, close stale orders and archive months
+    past retention."""
+    today = today or datetime.now(timezone.utc).date()
+    for name in ensure_partitions(conn, months_ahead, today):
+        logger.info("created partition %s", name)
+    conn.commit()
+
+    default_rows = conn.execute(
+        text("SELECT count(*) FROM orders_default")
+    ).scalar()
+    if default_rows:
+        logger.warning(
+            "%s orders in orders_default; a partition for their months "
+            "can only be created once they are moved out of it",
+            default_rows,
+        )
+
+    if open_order_max_age_hours is not None:
+        closed = close_stale_orders(conn, open_order_max_age_hours)
+        if closed:
+            logger.info("closed %s abandoned orders", closed)
+
+    if archive_after_months is None:
+        return
+    cutoff = _add_months(_month_start(today), -archive_after_months)
+    for month in monthly_partitions(conn):
+        if month < cutoff:
+            archive_month(conn, month, archive_dir)
+
+
+def run_maintenance() -> bool:
+    """``maintain`` with the configured settings, unless already running.
+
+    Called hourly by the job runner; returns False if another process
+    holds the maintenance lock.
+    """
+    settings = get_settings()
+    with get_engine().connect() as conn:
+        locked = conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": _LOCK_KEY}
+        ).scalar()
+        if not locked:
+            conn.rollback()
+            return False
+        try:
+            maintain(
+                conn,
+                settings.PARTITION_MONTHS_AHEAD,
+                settings.ARCHIVE_AFTER_MONTHS or None,
+                settings.ARCHIVE_DIR,
+                open_order_max_age_hours=settings.OPEN_ORDER_MAX_AGE_HOURS,
+            )
+        finally:
+            conn.rollback()
+            conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": _LOCK_KEY}
+            )
+            conn.commit()
+    return True
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        description="Create order partitions and archive old months."
+    )
+    parser.add_argument(
+        "--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD
+    )
+    parser.add_argument(
+        "--archive-after-months",
+        type=int,
+        default=settings.ARCHIVE_AFTER_MONTHS,
+        help="archive months older than this (default: setting; "
+        "0 or less disables archiving)",
+    )
+    parser.add_argument("--archive-dir", default=settings.ARCHIVE_DIR)
+    parser.add_argument(
+        "--close-orders-after-hours",
+        type=int,
+        default=settings.OPEN_ORDER_MAX_AGE_HOURS,
+        help="close orders left open this long (default: setting; "
+        "0 or less leaves them open)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with get_engine().connect() as connection:
+        maintain(
+            connection,
+            args.months_ahead,
+            (
+                args.archive_after_months
+                if args.archive_after_months > 0
+                else None
+            ),
+            args.archive_dir,
+            open_order_max_age_hours=(
+                args.close_orders_after_hours
+                if args.close_orders_after_hours > 0
+                else None
+            ),
+        )
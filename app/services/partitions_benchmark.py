@@ -0,0 +1,247 @@
+import argparse
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from app.db.session import get_engine
+from app.services.partitions import _add_months, _bound, _month_start
+from sqlalchemy import Connection, text
+
+SCHEMA = "partitions_benchmark"
+_COLUMNS = (
+    "id bigint NOT NULL, restaurant_id integer NOT NULL, "
+    "table_id integer NOT NULL, is_completed boolean NOT NULL, "
+    "created_at timestamptz NOT NULL"
+)
+# place_order's lookup, without the row lock
+_LOOKUP = (
+    "SELECT id FROM {table} WHERE table_id = :table_id "
+    "AND restaurant_id = :restaurant_id AND is_completed IS false{bound} "
+    "LIMIT 1"
+)
+
+
+def _months(today: date, months: int) -> list[date]:
+    first = _add_months(_month_start(today), 1 - months)
+    return [_add_months(first, offset) for offset in range(months + 1)]
+
+
+def build(
+    conn: Connection,
+    orders: int,
+    months: int,
+    restaurants: int,
+    tables: int,
+    today: date,
+) -> None:
+    """Create ``orders_flat`` and ``orders_part`` with the same rows.
+
+    Orders are spread evenly over the last ``months`` months; those
+    from the last two days are still open.
+    """
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    conn.execute(
+        text(
+            f"CREATE TABLE {SCHEMA}.orders_flat ({_COLUMNS}, PRIMARY KEY (id))"
+        )
+    )
+    conn.execute(
+        text(
+            f"CREATE TABLE {SCHEMA}.orders_part ({_COLUMNS}, "
+            "PRIMARY KEY (id, created_at)) PARTITION BY RANGE (created_at)"
+        )
+    )
+    for month in _months(today, months):
+        conn.execute(
+            text(
+                f"CREATE TABLE {SCHEMA}.orders_part_{month:%Y_%m} "
+                f"PARTITION OF {SCHEMA}.orders_part "
+                "FOR VALUES FROM (:start) TO (:end)"
+            ).bindparams(
+                start=_bound(month), end=_bound(_add_months(month, 1))
+            )
+        )
+
+    now = datetime.now(timezone.utc)
+    oldest = _bound(_add_months(_month_start(today), 1 - months))
+    conn.execute(
+        text(
+            f"INSERT INTO {SCHEMA}.orders_flat "
+            "SELECT n, 1 + n % :restaurants, "
+            "1 + (n / :restaurants) % :tables, "
+            "created_at < :open_since, created_at "
+            "FROM generate_series(1, :orders) AS n, LATERAL ("
+            "SELECT :oldest + make_interval(secs => :span * n / :orders) "
+            "AS created_at) AS t"
+        ),
+        {
+            "restaurants": restaurants,
+            "tables": tables,
+            "orders": orders,
+            "oldest": oldest,
+            "span": (now - oldest).total_seconds(),
+            "open_since": now - timedelta(days=2),
+        },
+    )
+    conn.execute(
+        text(
+            f"INSERT INTO {SCHEMA}.orders_part "
+            f"SELECT * FROM {SCHEMA}.orders_flat"
+        )
+    )
+    conn.commit()
+    conn.execute(text(f"ANALYZE {SCHEMA}.orders_flat"))
+    conn.execute(text(f"ANALYZE {SCHEMA}.orders_part"))
+    conn.commit()
+
+
+def _index(conn: Connection, table: str) -> None:
+    conn.execute(
+        text(
+            f"CREATE INDEX ON {SCHEMA}.{table} (restaurant_id, table_id) "
+            "WHERE is_completed IS false"
+        )
+    )
+    conn.execute(text(f"ANALYZE {SCHEMA}.{table}"))
+    conn.commit()
+
+
+def time_lookups(
+    conn: Connection,
+    table: str,
+    bound: str,
+    params: dict,
+    keys: list[tuple[int, int]],
+) -> float:
+    """Median seconds of the open-order lookup over ``keys``."""
+    query = text(_LOOKUP.format(table=f"{SCHEMA}.{table}", bound=bound))
+    timings = []
+    for restaurant_id, table_id in keys:
+        started = time.perf_counter()
+        conn.execute(
+            query,
+            {"restaurant_id": restaurant_id, "table_id": table_id, **params},
+        ).first()
+        timings.append(time.perf_counter() - started)
+    conn.rollback()
+    return statistics.median(timings)
+
+
+def time_archive(conn: Connection, month: date) -> tuple[float, float]:
+    """Seconds to remove ``month``: DELETE from the plain table, then
+    DETACH and DROP of its partition."""
+    started = time.perf_counter()
+    conn.execute(
+        text(
+            f"DELETE FROM {SCHEMA}.orders_flat "
+            "WHERE created_at >= :start AND created_at < :end"
+        ),
+        {"start": _bound(month), "end": _bound(_add_months(month, 1))},
+    )
+    conn.commit()
+    deleted = time.perf_counter() - started
+
+    name = f"{SCHEMA}.orders_part_{month:%Y_%m}"
+    started = time.perf_counter()
+    conn.execute(
+        text(f"ALTER TABLE {SCHEMA}.orders_part DETACH PARTITION {name}")
+    )
+    conn.execute(text(f"DROP TABLE {name}"))
+    conn.commit()
+    return deleted, time.perf_counter() - started
+
+
+def run(
+    conn: Connection,
+    orders: int,
+    months: int,
+    restaurants: int,
+    tables: int,
+    lookups: int,
+    seed: int = 0,
+) -> list[tuple[str, float]]:
+    """Build the tables, time everything and drop the scratch schema.
+
+    Returns ``(label, seconds)`` pairs in the order they are measured.
+    """
+    today = datetime.now(timezone.utc).date()
+    rng = random.Random(seed)
+    keys = [
+        (rng.randint(1, restaurants), rng.randint(1, tables))
+        for _ in range(lookups)
+    ]
+    # Computed here, so the planner sees a constant and prunes at plan
+    # time, as place_order does
+    constant = {"open_since": datetime.now(timezone.utc) - timedelta(hours=48)}
+    in_sql = " AND created_at >= now() - interval '48 hours'"
+    timings = []
+    try:
+        build(conn, orders, months, restaurants, tables, today)
+        timings.append(
+            (
+                "lookup, plain table, no index",
+                time_lookups(conn, "orders_flat", "", {}, keys),
+            )
+        )
+        _index(conn, "orders_flat")
+        _index(conn, "orders_part")
+        timings += [
+            (
+                "lookup, plain table, partial index",
+                time_lookups(conn, "orders_flat", "", {}, keys),
+            ),
+            (
+                "lookup, partitioned, now() - 48h bound",
+                time_lookups(conn, "orders_part", in_sql, {}, keys),
+            ),
+            (
+                "lookup, partitioned, constant bound",
+                time_lookups(
+                    conn,
+                    "orders_part",
+                    " AND created_at >= :open_since",
+                    constant,
+                    keys,
+                ),
+            ),
+        ]
+        deleted, dropped = time_archive(conn, _months(today, months)[0])
+        timings += [
+            ("archive oldest month, DELETE", deleted),
+            ("archive oldest month, DETACH + DROP", dropped),
+        ]
+    finally:
+        conn.rollback()
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.commit()
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time the open-order lookup and month archival on "
+        "synthetic orders, plain and partitioned, in a scratch schema."
+    )
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--restaurants", type=int, default=200)
+    parser.add_argument("--tables", type=int, default=20)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with get_engine().connect() as connection:
+        results = run(
+            connection,
+            args.orders,
+            args.months,
+            args.restaurants,
+            args.tables,
+            args.lookups,
+            args.seed,
+        )
+    print(f"{args.orders:,} orders over {args.months} months")
+    for label, seconds in results:
+        print(f"{label:<40} {seconds * 1000:10.3f} ms")
@@ -0,0 +1,207 @@
+import logging
+
+from app.core.jobs import enqueue, job
+from app.models.order import Order
+from app.models.payment import Payment
+from app.schemas.payment import PaymentCreate
+from app.services.webhooks import emit
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Amounts are floats; anything under half a cent is rounding noise
+_EPSILON = 0.005
+_SETTLED = ("CAPTURED", "REFUNDED")
+
+
+class PaymentError(ValueError):
+    """A capture or refund that the order's payments do not allow."""
+
+    status_code = 409
+
+
+class KeyReuseError(PaymentError):
+    """An idempotency key replayed with a different payment."""
+
+    status_code = 422
+
+
+def amount_paid(order_id):
+    # Net of refunds, as a scalar subquery
+    return (
+        select(
+            func.coalesce(
+                func.sum(Payment.amount - Payment.refunded_amount), 0.0
+            )
+        )
+        .where(Payment.order_id == order_id, Payment.status.in_(_SETTLED))
+        .scalar_subquery()
+    )
+
+
+def capture_payment(
+    db: Session, data: PaymentCreate
+) -> tuple[Payment, float, float, bool]:
+    """Record a captured payment against an order, exactly once per key.
+
+    One short transaction: lock the order row (serialising captures of
+    the same order), replay or reject a reused key, check the balance,
+    insert the payment and its receipt job, and close the order once it
+    is paid in full. Receipts and other side effects run later as durable
+    jobs. Returns ``(payment, order_total, paid, completed)``.
+    """
+    order, paid = db.execute(
+        select(Order, amount_paid(Order.id))
+        .where(Order.id == data.order_id)
+        .with_for_update(of=Order)
+    ).one()
+    total = order.total_amount
+
+    existing = db.scalars(
+        select(Payment).where(
+            Payment.order_id == order.id,
+            Payment.idempotency_key == data.idempotency_key,
+        )
+    ).first()
+    if existing is not None:
+        # Nothing to write; the order lock goes with the session
+        if (existing.method, existing.txn_ref) != (
+            data.method,
+            data.txn_ref,
+        ) or abs(existing.amount - data.amount) > _EPSILON:
+            raise KeyReuseError(
+                "Idempotency key was already used for a different payment"
+            )
+        return existing, total, paid, bool(order.is_completed)
+
+    balance = round(total - paid, 2)
+    if data.amount > balance + _EPSILON:
+        raise PaymentError(f"Amount exceeds the balance due ({balance:.2f})")
+
+    payment = Payment(
+        order_id=order.id,
+        order_created_at=order.created_at,
+        method=data.method,
+        status="CAPTURED",
+        amount=round(data.amount, 2),
+        idempotency_key=data.idempotency_key,
+        txn_ref=data.txn_ref,
+        paid_at=func.now(),
+    )
+    db.add(payment)
+    paid = round(paid + payment.amount, 2)
+    completed = paid >= total - _EPSILON
+    if completed:
+        order.is_completed = True
+    db.flush()
+    enqueue(
+        db,
+        "payment.captured",
+        {
+            "payment_id": payment.id,
+            "order_id": order.id,
+            "restaurant_id": order.restaurant_id,
+            "method": data.method,
+            "amount": payment.amount,
+            "txn_ref": data.txn_ref,
+            "order_total": total,
+            "balance_due": round(total - paid, 2),
+        },
+    )
+    emit(
+        db,
+        order.restaurant_id,
+        "payment.captured",
+        {
+            "payment_id": payment.id,
+            "order_id": order.id,
+            "method": data.method,
+            "amount": payment.amount,
+            "txn_ref": data.txn_ref,
+            "order_total": total,
+            "balance_due": round(total - paid, 2),
+            "order_completed": completed,
+        },
+    )
+    db.commit()
+    return payment, total, paid, completed
+
+
+def refund_payment(
+    db: Session, payment_id: int, amount: float | None = None
+) -> Payment:
+    """Refund part or (by default) all of what is left of a payment."""
+    payment = db.execute(
+        select(Payment).where(Payment.id == payment_id).with_for_update()
+    ).scalar_one()
+    refundable = round(payment.amount - payment.refunded_amount, 2)
+    if payment.status != "CAPTURED" or refundable <= 0:
+        raise PaymentError("Payment has nothing left to refund")
+    if amount is None:
+        amount = refundable
+    if amount > refundable + _EPSILON:
+        raise PaymentError(
+            f"Refund exceeds the refundable amount ({refundable:.2f})"
+        )
+
+    payment.refunded_amount = round(payment.refunded_amount + amount, 2)
+    payment.refunded_at = func.now()
+    if payment.refunded_amount >= payment.amount - _EPSILON:
+        payment.status = "REFUNDED"
+    enqueue(
+        db,
+        "payment.refunded",
+        {
+            "payment_id": payment.id,
+            "order_id": payment.order_id,
+            "method": payment.method,
+            "amount": round(amount, 2),
+            "txn_ref": payment.txn_ref,
+        },
+    )
+    emit(
+        db,
+        select(Order.restaurant_id)
+        .where(Order.id == payment.order_id)
+        .scalar_subquery(),
+        "payment.refunded",
+        {
+            "payment_id": payment.id,
+            "order_id": payment.order_id,
+            "method": payment.method,
+            "amount": round(amount, 2),
+            "refunded_amount": payment.refunded_amount,
+            "status": payment.status,
+            "txn_ref": payment.txn_ref,
+        },
+    )
+    db.commit()
+    return payment
+
+
+# Durable jobs, run once the payment has committed. There is no mailer
+# or gateway client in this service yet, so these only log; integrations
+# plug in here without touching the request path.
+
+
+@job("payment.captured", queue="payments", max_attempts=10)
+def send_receipt(db: Session, payload: dict) -> None:
+    logger.info(
+        "receipt: order %s paid %.2f by %s (balance due %.2f)",
+        payload["order_id"],
+        payload["amount"],
+        payload["method"],
+        payload["balance_due"],
+    )
+
+
+@job("payment.refunded", queue="payments", max_attempts=10)
+def settle_refund(db: Session, payload: dict) -> None:
+    logger.info(
+        "refund: payment %s refunded %.2f via %s (ref %s)",
+        payload["payment_id"],
+        payload["amount"],
+        payload["method"],
+        payload["txn_ref"],
+    )
@@ -0,0 +1,90 @@
+import logging
+from datetime import timedelta
+
+from app.core.config import get_settings
+from app.db.base import Base
+from app.db.session import get_engine
+from app.db.soft_delete import SoftDelete
+from sqlalchemy import Table, delete, exists, func, select
+
+logger = logging.getLogger(__name__)
+
+
+def soft_delete_tables() -> list[Table]:
+    """Tables of ``SoftDelete`` models, referencing before referenced."""
+    tables = {
+        mapper.local_table
+        for mapper in Base.registry.mappers
+        if issubclass(mapper.class_, SoftDelete)
+    }
+    return [t for t in reversed(Base.metadata.sorted_tables) if t in tables]
+
+
+def _blocking_references(table: Table):
+    # Rows elsewhere that stop one of ``table``'s rows from being deleted;
+    # cascading and SET NULL keys take care of themselves
+    for other in Base.metadata.sorted_tables:
+        for fk in other.foreign_keys:
+            if fk.column.table is table and (
+                (fk.ondelete or "").upper() not in ("CASCADE", "SET NULL")
+            ):
+                yield exists().where(fk.parent == fk.column)
+
+
+def purge_batch(table: Table, cutoff, batch_size: int) -> int:
+    """Hard-delete up to ``batch_size`` rows of ``table`` in one transaction.
+
+    Only rows soft-deleted before ``cutoff`` that nothing references go;
+    rows still referenced (say, a menu item on an order) stay until the
+    references do. Rows locked by another purge are skipped.
+    """
+    doomed = (
+        select(table.c.id)
+        .where(
+            table.c.is_deleted.is_(True),
+            table.c.deleted_at < cutoff,
+            *(~ref for ref in _blocking_references(table)),
+        )
+        .order_by(table.c.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    with get_engine().begin() as conn:
+        return len(
+            conn.execute(
+                delete(table)
+                .where(table.c.id.in_(doomed))
+                .returning(table.c.id)
+            ).all()
+        )
+
+
+def purge_deleted() -> dict[str, int]:
+    """Purge rows soft-deleted longer than the retention, in batches.
+
+    Each table gets at most ``PURGE_MAX_BATCHES`` batches per run, so one
+    run stays short and the rest waits for the next. Returns the number
+    of rows purged per table.
+    """
+    settings = get_settings()
+    cutoff = func.now() - timedelta(days=settings.SOFT_DELETE_RETENTION_DAYS)
+    purged = {}
+    for table in soft_delete_tables():
+        count = 0
+        for _ in range(settings.PURGE_MAX_BATCHES):
+            deleted = purge_batch(table, cutoff, settings.PURGE_BATCH_SIZE)
+            count += deleted
+            if deleted < settings.PURGE_BATCH_SIZE:
+                break
+        if count:
+            logger.info("purged %s soft-deleted rows from %s", count, table)
+        purged[table.name] = count
+    return purged
+
+
+if __name__ == "__main__":
+    from app.db.base import load_models
+
+    logging.basicConfig(level=logging.INFO)
+    load_models()
+    print(purge_deleted())
@@ -0,0 +1,139 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterable, Iterator
+
+from app.core.config import get_settings
+from app.core.security import sign_payload
+from app.models.table import RestaurantTable
+from app.services.menu_cache import MenuCache
+from app.services.qr_render import render_png
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+_memory: MenuCache | None = None
+
+
+def _renderer() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a worker that already runs threads is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=get_settings().QR_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_renderer() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _memory_cache() -> MenuCache:
+    global _memory
+    if _memory is None:
+        _memory = MenuCache(get_settings().QR_MEMORY_CACHE_SIZE)
+    return _memory
+
+
+def _cache_dir() -> str:
+    path = get_settings().QR_CACHE_DIR or os.path.join(
+        tempfile.gettempdir(), "restaurant-qr"
+    )
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def table_link(table: RestaurantTable) -> tuple[str, str]:
+    """The signed link a table's QR code points at, and its signature."""
+    payload = f"{table.restaurant_id}:{table.id}:{table.qr_version}"
+    signature = sign_payload(payload)
+    link = (
+        f"{get_settings().PUBLIC_BASE_URL.rstrip('/')}/public/tables/"
+        f"{table.id}?v={table.qr_version}&sig={signature}"
+    )
+    return link, signature
+
+
+class _Render:
+    """A table's PNG: cached bytes, or a render running in the pool."""
+
+    def __init__(self, table: RestaurantTable):
+        self.link, signature = table_link(table)
+        # The signature changes with the secret as well as the version
+        self.key = f"{table.id}-{table.qr_version}-{signature}"
+        self.path = os.path.join(_cache_dir(), f"{self.key}.png")
+        self.png = _memory_cache().get(self.key)
+        self.future: Future | None = None
+        if self.png is None:
+            try:
+                with open(self.path, "rb") as cached:
+                    self.png = cached.read()
+            except FileNotFoundError:
+                self.future = _renderer().submit(render_png, self.link)
+            else:
+                _memory_cache().put(self.key, self.png)
+
+    def result(self) -> bytes:
+        if self.png is None:
+            self.png = self.future.result()
+            # Write then rename, so readers never see half a file
+            partial = f"{self.path}.{os.getpid()}.tmp"
+            with open(partial, "wb") as out:
+                out.write(self.png)
+            os.replace(partial, self.path)
+            _memory_cache().put(self.key, self.png)
+        return self.png
+
+
+def table_qr_png(table: RestaurantTable) -> bytes:
+    """The table's QR code as PNG, rendered at most once per version."""
+    return _Render(table).result()
+
+
+class _Chunks:
+    """Write-only file that hands out what was written so far."""
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def qr_zip(tables: Iterable[RestaurantTable]) -> Iterator[bytes]:
+    """Stream a ZIP of every table's QR PNG, one entry per table.
+
+    All missing PNGs are queued on the render pool straight away and
+    entries are written in table order as they finish, so the first bytes
+    go out while later tables are still rendering. PNGs are already
+    compressed, so entries are stored as-is.
+    """
+    renders = [(table.table_number, _Render(table)) for table in tables]
+    return _zip_entries(renders)
+
+
+def _zip_entries(renders: list[tuple[int, _Render]]) -> Iterator[bytes]:
+    sink = _Chunks()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:
+        for number, render in renders:
+            archive.writestr(f"table-{number}.png", render.result())
+            yield sink.take()
+    yield sink.take()
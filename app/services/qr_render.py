@@ -0,0 +1,17 @@
+"""QR rendering for the render processes; imports nothing from the app."""
+
+import io
+
+import segno
+
+# Pixels per QR module, and the quiet zone around the symbol in modules
+SCALE = 8
+BORDER = 4
+
+
+def render_png(data: str) -> bytes:
+    buffer = io.BytesIO()
+    segno.make(data, error="m").save(
+        buffer, kind="png", scale=SCALE, border=BORDER
+    )
+    return buffer.getvalue()
@@ -0,0 +1,250 @@
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.core.jobs import enqueue, job
+from app.models.order import Order, OrderItem
+from app.models.report import DailyItemSales, DailySales
+from app.models.restaurant import Restaurant
+from app.services.partitions import monthly_partitions
+from sqlalchemy import Date, cast, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+
+def _zone(time_zone: str | None):
+    try:
+        return ZoneInfo(time_zone or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def local_date(time_zone: str | None, moment: datetime | None = None) -> date:
+    """Calendar day of ``moment`` (default: now) in the restaurant's zone."""
+    moment = moment or datetime.now(timezone.utc)
+    return moment.astimezone(_zone(time_zone)).date()
+
+
+def day_start(time_zone: str | None, day: date) -> datetime:
+    """The moment ``day`` begins in the restaurant's zone.
+
+    The inverse of ``local_date``: orders from ``day_start(tz, d)`` up to
+    ``day_start(tz, d + 1 day)`` are the ones the rollups count on ``d``.
+    """
+    return datetime.combine(day, time.min, _zone(time_zone))
+
+
+def record_sale(
+    db: Session,
+    restaurant: Restaurant,
+    lines: list[tuple[int, int, float]],
+    new_order: bool,
+    order_created_at: datetime,
+) -> None:
+    """Queue freshly placed order lines for the rollup tables.
+
+    ``lines`` holds ``(menu_item_id, quantity, unit_price)`` tuples. The
+    job is written in the caller's transaction, so it exists exactly when
+    the order does, and the rollup upserts (and their row locks on the
+    busy per-day rows) stay out of the ordering request.
+
+    Sales count on the local day the order was opened, even for lines
+    added to it after midnight: order lines carry no time of their own,
+    so that is the only day ``backfill_rollups`` can give them too.
+    """
+    if not lines and not new_order:
+        return
+    enqueue(
+        db,
+        "reports.record_sale",
+        {
+            "restaurant_id": restaurant.id,
+            "sales_date": local_date(
+                restaurant.time_zone, order_created_at
+            ).isoformat(),
+            "lines": lines,
+            "new_order": new_order,
+        },
+    )
+
+
+@job("reports.record_sale", queue="reports", max_attempts=20)
+def apply_sale(db: Session, payload: dict) -> None:
+    """Add one order's lines to the rollups; committed with the job."""
+    restaurant_id = payload["restaurant_id"]
+    sales_date = date.fromisoformat(payload["sales_date"])
+    new_order = payload["new_order"]
+    items: dict[int, list] = {}
+    for menu_item_id, quantity, unit_price in payload["lines"]:
+        totals = items.setdefault(menu_item_id, [0, 0.0])
+        totals[0] += quantity
+        totals[1] += unit_price * quantity
+
+    day = insert(DailySales).values(
+        restaurant_id=restaurant_id,
+        sales_date=sales_date,
+        order_count=int(new_order),
+        item_count=sum(qty for qty, _ in items.values()),
+        revenue=sum(revenue for _, revenue in items.values()),
+    )
+    db.execute(
+        day.on_conflict_do_update(
+            index_elements=["restaurant_id", "sales_date"],
+            set_={
+                "order_count": DailySales.order_count
+                + day.excluded.order_count,
+                "item_count": DailySales.item_count + day.excluded.item_count,
+                "revenue": DailySales.revenue + day.excluded.revenue,
+            },
+        )
+    )
+
+    if not items:
+        return
+    item_rows = insert(DailyItemSales).values(
+        [
+            {
+                "restaurant_id": restaurant_id,
+                "sales_date": sales_date,
+                "menu_item_id": menu_item_id,
+                "quantity": quantity,
+                "revenue": revenue,
+            }
+            for menu_item_id, (quantity, revenue) in items.items()
+        ]
+    )
+    db.execute(
+        item_rows.on_conflict_do_update(
+            index_elements=["restaurant_id", "sales_date", "menu_item_id"],
+            set_={
+                "quantity": DailyItemSales.quantity
+                + item_rows.excluded.quantity,
+                "revenue": DailyItemSales.revenue + item_rows.excluded.revenue,
+            },
+        )
+    )
+
+
+def backfill_rollups(db: Session, restaurant_id: int | None = None) -> None:
+    """Rebuild the rollups from ``orders``/``order_items``.
+
+    This is the only place that scans the order history; run it once after
+    deploying the rollup tables, or to repair a restaurant's figures.
+    Revenue is rebuilt from ``Order.total_amount`` and current menu prices,
+    which is the best the historical data allows. Days before the oldest
+    order partition (archived months, and the first day, which the local
+    time zone may split) keep their rollups as they are.
+    """
+    sales_date = cast(
+        func.timezone(
+            func.coalesce(Restaurant.time_zone, "UTC"), Order.created_at
+        ),
+        Date,
+    ).label("sales_date")
+
+    day_delete = delete(DailySales)
+    item_delete = delete(DailyItemSales)
+    if restaurant_id is not None:
+        day_delete = day_delete.where(
+            DailySales.restaurant_id == restaurant_id
+        )
+        item_delete = item_delete.where(
+            DailyItemSales.restaurant_id == restaurant_id
+        )
+
+    item_lines = (
+        select(
+            Order.restaurant_id,
+            sales_date,
+            OrderItem.menu_item_id,
+            func.sum(OrderItem.quantity).label("quantity"),
+            func.sum(OrderItem.quantity * OrderItem.unit_price).label(
+                "revenue"
+            ),
+        )
+        .join(Restaurant, Restaurant.id == Order.restaurant_id)
+        .join(
+            OrderItem,
+            (OrderItem.order_id == Order.id)
+            & (OrderItem.order_created_at == Order.created_at),
+        )
+        .group_by(Order.restaurant_id, sales_date, OrderItem.menu_item_id)
+    )
+    item_counts = (
+        select(
+            OrderItem.order_id,
+            OrderItem.order_created_at,
+            func.sum(OrderItem.quantity).label("item_count"),
+        )
+        .group_by(OrderItem.order_id, OrderItem.order_created_at)
+        .subquery()
+    )
+    days = (
+        select(
+            Order.restaurant_id,
+            sales_date,
+            func.count(Order.id).label("order_count"),
+            func.coalesce(func.sum(item_counts.c.item_count), 0).label(
+                "item_count"
+            ),
+            func.coalesce(func.sum(Order.total_amount), 0.0).label("revenue"),
+        )
+        .join(Restaurant, Restaurant.id == Order.restaurant_id)
+        .outerjoin(
+            item_counts,
+            (item_counts.c.order_id == Order.id)
+            & (item_counts.c.order_created_at == Order.created_at),
+        )
+        .group_by(Order.restaurant_id, sales_date)
+    )
+    if restaurant_id is not None:
+        item_lines = item_lines.where(Order.restaurant_id == restaurant_id)
+        days = days.where(Order.restaurant_id == restaurant_id)
+
+    retained = monthly_partitions(db.connection())
+    if retained:
+        first_day = retained[0] + timedelta(days=1)
+        day_delete = day_delete.where(DailySales.sales_date >= first_day)
+        item_delete = item_delete.where(DailyItemSales.sales_date >= first_day)
+        item_lines = item_lines.where(sales_date >= first_day)
+        days = days.where(sales_date >= first_day)
+    db.execute(day_delete)
+    db.execute(item_delete)
+
+    db.execute(
+        insert(DailySales).from_select(
+            [
+                "restaurant_id",
+                "sales_date",
+                "order_count",
+                "item_count",
+                "revenue",
+            ],
+            days,
+        )
+    )
+    db.execute(
+        insert(DailyItemSales).from_select(
+            [
+                "restaurant_id",
+                "sales_date",
+                "menu_item_id",
+                "quantity",
+                "revenue",
+            ],
+            item_lines,
+        )
+    )
+    db.commit()
+
+
+if __name__ == "__main__":
+    import sys
+
+    from app.db.base import load_models
+    from app.db.session import SessionLocal
+
+    load_models()
+    with SessionLocal() as session:
+        backfill_rollups(
+            session, int(sys.argv[1]) if len(sys.argv) > 1 else None
+        )
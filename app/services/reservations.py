@@ -0,0 +1,216 @@
+import argparse
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, NamedTuple
+
+from app.models.reservation import HOLDING_STATUSES, Reservation
+from app.models.restaurant import Restaurant
+from app.models.table import RestaurantTable, TableStatus
+from app.services.menu_cache import MenuCache
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.orm import Session
+
+
+class IntervalTree:
+    """Static interval tree over half-open ``[start, end)`` intervals.
+
+    The intervals, sorted by start, are read as an implicit balanced
+    binary tree (each range's middle element is its root), and every
+    node keeps the largest end in its subtree. A search skips subtrees
+    that end before the window and stops going right once starts pass
+    its end, so finding the k intervals overlapping a window takes
+    O(log n + k).
+    """
+
+    __slots__ = ("_starts", "_ends", "_values", "_max_ends")
+
+    def __init__(self, intervals: Iterable[tuple[float, float, Any]]):
+        ordered = sorted(intervals, key=lambda interval: interval[0])
+        self._starts = [start for start, _, _ in ordered]
+        self._ends = [end for _, end, _ in ordered]
+        self._values = [value for _, _, value in ordered]
+        self._max_ends = list(self._ends)
+        self._augment(0, len(ordered))
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def _augment(self, lo: int, hi: int) -> float:
+        if lo >= hi:
+            return -math.inf
+        mid = (lo + hi) // 2
+        self._max_ends[mid] = max(
+            self._ends[mid],
+            self._augment(lo, mid),
+            self._augment(mid + 1, hi),
+        )
+        return self._max_ends[mid]
+
+    def overlapping(self, start: float, end: float) -> list:
+        """Values of the intervals overlapping ``[start, end)``."""
+        found = []
+        stack = [(0, len(self._starts))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self._max_ends[mid] <= start:
+                continue
+            stack.append((lo, mid))
+            if self._starts[mid] < end:
+                if self._ends[mid] > start:
+                    found.append(self._values[mid])
+                stack.append((mid + 1, hi))
+        return found
+
+
+class FreeTable(NamedTuple):
+    id: int
+    table_number: int
+    seats: int
+
+
+# Per-worker trees keyed by (restaurant_id, reservations_version), in an
+# LRU like the cached menus
+availability_cache = MenuCache()
+
+
+def bump_reservations_version(db: Session, restaurant_id) -> int | None:
+    """Invalidate cached availability and return the new version.
+
+    Called in the transaction of every reservation change that moves,
+    takes or frees a table.
+    """
+    return db.execute(
+        update(Restaurant)
+        .where(Restaurant.id == restaurant_id)
+        .values(reservations_version=Restaurant.reservations_version + 1)
+        .returning(Restaurant.reservations_version)
+    ).scalar()
+
+
+def _booked_tree(db: Session, restaurant_id: int) -> IntervalTree:
+    # Holding reservations not over yet; windows are clamped to start no
+    # earlier than now, so nothing that ended before the build matters
+    rows = db.execute(
+        select(
+            Reservation.starts_at, Reservation.ends_at, Reservation.table_id
+        ).where(
+            Reservation.restaurant_id == restaurant_id,
+            Reservation.period.overlaps(func.tstzrange(func.now(), None)),
+            Reservation.status.in_(HOLDING_STATUSES),
+        )
+    ).all()
+    return IntervalTree(
+        (starts_at.timestamp(), ends_at.timestamp(), table_id)
+        for starts_at, ends_at, table_id in rows
+    )
+
+
+def free_tables(
+    db: Session,
+    restaurant_id: int,
+    windows: list[tuple[datetime, datetime]],
+    party_size: int,
+) -> list[list[FreeTable]]:
+    """Tables seating ``party_size`` that are free for each whole window.
+
+    One query fetches the restaurant's tables and reservation version;
+    the reservations themselves come from the worker's interval tree for
+    that version, rebuilt only after a booking changed. Each list is
+    smallest table first. Windows start no earlier than now.
+    """
+    rows = db.execute(
+        select(
+            Restaurant.reservations_version,
+            RestaurantTable.id,
+            RestaurantTable.table_number,
+            RestaurantTable.seats,
+        )
+        .outerjoin(
+            RestaurantTable,
+            and_(
+                RestaurantTable.restaurant_id == Restaurant.id,
+                RestaurantTable.status != TableStatus.INACTIVE,
+                RestaurantTable.seats >= party_size,
+            ),
+        )
+        .where(Restaurant.id == restaurant_id)
+    ).all()
+    if not rows:
+        return [[] for _ in windows]
+    tables = sorted(
+        (FreeTable(*row[1:]) for row in rows if row[1] is not None),
+        key=lambda table: (table.seats, table.table_number),
+    )
+
+    key = (restaurant_id, rows[0][0])
+    tree = availability_cache.get(key)
+    if tree is None:
+        tree = availability_cache.put(key, _booked_tree(db, restaurant_id))
+
+    now = datetime.now(timezone.utc).timestamp()
+    free = []
+    for starts_at, ends_at in windows:
+        start, end = max(starts_at.timestamp(), now), ends_at.timestamp()
+        if end <= start:
+            free.append([])
+            continue
+        booked = set(tree.overlapping(start, end))
+        free.append([table for table in tables if table.id not in booked])
+    return free
+
+
+def slots(
+    start: datetime, end: datetime, duration: timedelta, step: timedelta
+) -> list[tuple[datetime, datetime]]:
+    """Windows of ``duration`` starting every ``step`` within the range."""
+    windows = []
+    while start + duration <= end:
+        windows.append((start, start + duration))
+        start += step
+    return windows
+
+
+if __name__ == "__main__":
+    from zoneinfo import ZoneInfo
+
+    from app.db.base import load_models
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(
+        description="Print the tables free for each slot of an evening."
+    )
+    parser.add_argument("restaurant_id", type=int)
+    parser.add_argument("date", help="YYYY-MM-DD, in the restaurant's zone")
+    parser.add_argument("party_size", type=int)
+    parser.add_argument("--from", dest="first", default="17:00")
+    parser.add_argument("--to", dest="last", default="23:00")
+    parser.add_argument("--duration", type=int, default=90, help="minutes")
+    parser.add_argument("--step", type=int, default=15, help="minutes")
+    args = parser.parse_args()
+
+    load_models()
+    with SessionLocal() as session:
+        zone = ZoneInfo(
+            session.get(Restaurant, args.restaurant_id).time_zone or "UTC"
+        )
+        start, end = (
+            datetime.fromisoformat(f"{args.date}T{clock}").replace(tzinfo=zone)
+            for clock in (args.first, args.last)
+        )
+        windows = slots(
+            start,
+            end,
+            timedelta(minutes=args.duration),
+            timedelta(minutes=args.step),
+        )
+        free = free_tables(
+            session, args.restaurant_id, windows, args.party_size
+        )
+    for (starts_at, ends_at), tables in zip(windows, free):
+        print(
+            f"{starts_at:%H:%M}-{ends_at:%H:%M}",
+            " ".join(f"#{t.table_number}({t.seats})" for t in tables) or "-",
+        )
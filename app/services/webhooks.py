@@ -0,0 +1,193 @@
+import argparse
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import random
+import socket
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from app.core.broadcast import publish
+from app.core.config import get_settings
+from app.db.session import get_engine
+from app.models.webhook import WebhookDelivery, WebhookSubscription
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Broadcast topic that wakes the dispatchers on commit
+WAKE_TOPIC = "webhooks"
+SIGNATURE_HEADER = "X-Webhook-Signature"
+TIMESTAMP_HEADER = "X-Webhook-Timestamp"
+
+
+class UnsafeURLError(ValueError):
+    """A webhook URL whose host is not a public address."""
+
+
+def public_address(host: str, port: int | None = None) -> str:
+    """An address of ``host`` to connect to, if every one is public.
+
+    Subscribers choose the URL and the server makes the request, so an
+    endpoint resolving to loopback, private, link-local or otherwise
+    non-global space would reach internal services. The dispatcher
+    connects to the address returned here rather than resolving the
+    name again, so a host can't pass the check and then rebind.
+    """
+    try:
+        infos = socket.getaddrinfo(host, port or 443, type=socket.SOCK_STREAM)
+    except socket.gaierror as exc:
+        raise UnsafeURLError(f"{host} does not resolve") from exc
+    addresses = []
+    for *_, sockaddr in infos:
+        # Drop an IPv6 zone ("fe80::1%eth0") before parsing
+        address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if isinstance(address, ipaddress.IPv6Address) and (
+            address.ipv4_mapped
+        ):
+            address = address.ipv4_mapped
+        addresses.append(address)
+    if not get_settings().WEBHOOK_ALLOW_PRIVATE_ADDRESSES and any(
+        not address.is_global or address.is_multicast for address in addresses
+    ):
+        raise UnsafeURLError(f"{host} resolves to a non-public address")
+    return str(addresses[0])
+
+
+def check_url(url: str) -> None:
+    """Raise ``UnsafeURLError`` unless the URL's host is public."""
+    parts = urlsplit(url)
+    if not parts.hostname:
+        raise UnsafeURLError("URL has no host")
+    public_address(parts.hostname, parts.port)
+
+
+def emit(db: Session, restaurant_id, event: str, data: dict) -> None:
+    """Owe ``event`` to each of the restaurant's subscribers to it.
+
+    One INSERT ... SELECT in the caller's transaction, so deliveries
+    exist exactly when the caller's writes commit, and the request never
+    waits on a subscriber. ``restaurant_id`` may be a subquery.
+    """
+    subscribers = select(
+        WebhookSubscription.id,
+        literal(event),
+        literal(data, JSONB),
+    ).where(
+        WebhookSubscription.restaurant_id == restaurant_id,
+        WebhookSubscription.is_active.is_(True),
+        WebhookSubscription.events.any(event),
+    )
+    owed = db.execute(
+        insert(WebhookDelivery)
+        .from_select(["subscription_id", "event", "payload"], subscribers)
+        .returning(WebhookDelivery.id)
+    ).first()
+    if owed is not None:
+        publish(db, WAKE_TOPIC, event, {})
+
+
+def sign(secret: str, timestamp: str, body: bytes) -> str:
+    """HMAC-SHA256 of ``"{timestamp}.{body}"``, as sent in the header.
+
+    Receivers recompute it with their secret and reject stale
+    timestamps, so a captured request can't be replayed later.
+    """
+    digest = hmac.new(
+        secret.encode(), timestamp.encode() + b"." + body, hashlib.sha256
+    )
+    return "sha256=" + digest.hexdigest()
+
+
+def verify(
+    secret: str,
+    timestamp: str,
+    body: bytes,
+    signature: str,
+    tolerance: int = 300,
+) -> bool:
+    """Check a request as a receiver would: signature and freshness."""
+    try:
+        fresh = abs(time.time() - int(timestamp)) <= tolerance
+    except ValueError:
+        return False
+    return fresh and hmac.compare_digest(
+        sign(secret, timestamp, body), signature
+    )
+
+
+def prune_deliveries() -> int:
+    """Delete deliveries made longer ago than the retention."""
+    keep = timedelta(hours=get_settings().WEBHOOK_KEEP_DELIVERED_HOURS)
+    with get_engine().begin() as conn:
+        deleted = conn.execute(
+            delete(WebhookDelivery).where(
+                WebhookDelivery.delivered_at < func.now() - keep
+            )
+        ).rowcount
+    if deleted:
+        logger.info("pruned %s webhook deliveries", deleted)
+    return deleted
+
+
+def _receiver(secret: str | None, delay: float, fail_rate: float):
+    # A stand-in subscriber endpoint for trying deliveries locally
+    class Receiver(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            if secret and not verify(
+                secret,
+                self.headers.get(TIMESTAMP_HEADER, ""),
+                body,
+                self.headers.get(SIGNATURE_HEADER, ""),
+            ):
+                self.send_response(401)
+                self.end_headers()
+                return
+            time.sleep(delay)
+            if random.random() < fail_rate:
+                self.send_response(503)
+                self.end_headers()
+                return
+            for event in json.loads(body)["events"]:
+                print(event["id"], event["event"], json.dumps(event["data"]))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return Receiver
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run a local webhook receiver that prints events."
+    )
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument(
+        "--secret", help="reject requests not signed with this secret"
+    )
+    parser.add_argument(
+        "--delay", type=float, default=0.0, help="seconds per request"
+    )
+    parser.add_argument(
+        "--fail-rate",
+        type=float,
+        default=0.0,
+        help="share of requests answered 503",
+    )
+    args = parser.parse_args()
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", args.port),
+        _receiver(args.secret, args.delay, args.fail_rate),
+    )
+    print(f"listening on http://127.0.0.1:{args.port}/")
+    print("(subscribe it with WEBHOOK_ALLOW_PRIVATE_ADDRESSES=true)")
+    server.serve_forever()
@@ -0,0 +1,93 @@
+import os
+import uuid
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def database_url():
+    """An empty database with the app's schema, from ``TEST_DATABASE_URL``.
+
+    Its public schema is dropped and rebuilt from the models, so point
+    it at a database of its own. Tests needing it are skipped
+    when the variable is unset.
+    """
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    from app.db.base import Base, load_models
+    from app.services.partitions import ensure_partitions
+    from sqlalchemy import create_engine, text
+
+    load_models()
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+        # What the migrations set up besides the models' tables
+        conn.execute(
+            text("CREATE TYPE role_type AS ENUM ('OWNER', 'STAFF', 'ADMIN')")
+        )
+        for extension in ("pg_trgm", "btree_gin", "btree_gist"):
+            conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
+        Base.metadata.create_all(conn)
+        ensure_partitions(conn, 1)
+    engine.dispose()
+    return url
+
+
+@pytest.fixture(scope="session")
+def client(database_url, tmp_path_factory):
+    """A test client of an app on the test database, without jobs.
+
+    Audit entries are held in memory for the whole session, so only
+    request statements reach the database.
+    """
+    from app.core.config import Settings
+    from app.main import create_app
+    from fastapi.testclient import TestClient
+
+    settings = Settings(
+        DATABASE_URL=database_url,
+        JWT_SECRET="test",
+        JOBS_RUN=False,
+        AUDIT_FLUSH_SECONDS=3600,
+        AUDIT_SPILL_PATH=str(tmp_path_factory.mktemp("audit") / "spill"),
+    )
+    with TestClient(create_app(settings)) as client:
+        yield client
+
+
+@pytest.fixture
+def owner(client):
+    """Authorization headers of a newly registered owner."""
+    unique = uuid.uuid4().hex
+    email = f"{unique}@example.com"
+    response = client.post(
+        "/auth/register/owner",
+        json={
+            "email": email,
+            "password": "secret",
+            "fullname": "Owner",
+            "phone": unique[:15],
+        },
+    )
+    assert response.status_code == 200, response.text
+    response = client.post(
+        "/auth/login", data={"username": email, "password": "secret"}
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def restaurant_id(client, owner):
+    """A restaurant of ``owner``, in Asia/Kolkata."""
+    response = client.post(
+        "/restaurants/hotels/",
+        json={"name": "Dosa Corner", "location": "Pune"},
+        headers=owner,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
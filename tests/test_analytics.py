@@ -0,0 +1,161 @@
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pytest
+from app.services.analytics import (
+    _aggregate,
+    _aggregate_in_python,
+    synthetic_lines,
+)
+from sqlalchemy import text
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_group_bys_match_a_python_loop():
+    # Sparse item ids take the np.unique path of _group, dense ones the
+    # bincount path
+    for items in (50, 1_000_000):
+        lines = synthetic_lines(20_000, restaurants=5, items=items, seed=1)
+        restaurant_ids = [5, 3, 1, 2, 4]
+        revenue, (item_ids, quantity, item_revenue), basket, heatmap = (
+            _aggregate(lines, restaurant_ids)
+        )
+        by_restaurant, by_item, by_order, grid = _aggregate_in_python(
+            lines, restaurant_ids
+        )
+
+        assert np.allclose(revenue, [by_restaurant[i] for i in restaurant_ids])
+        assert np.array_equal(
+            quantity, [by_item[i][0] for i in item_ids.tolist()]
+        )
+        assert np.allclose(
+            item_revenue, [by_item[i][1] for i in item_ids.tolist()]
+        )
+        assert sorted(by_item) == sorted(item_ids.tolist())
+        assert list(quantity) == sorted(quantity, reverse=True)
+        assert np.array_equal(basket[0], [q for q, _ in by_order.values()])
+        assert np.allclose(basket[1], [r for _, r in by_order.values()])
+        assert np.allclose(heatmap, grid)
+
+
+def test_benchmark_runs():
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "app.services.analytics",
+            "--lines",
+            "10000",
+        ],
+        cwd=ROOT,
+        env={**os.environ, "DATABASE_URL": "sqlite://", "JWT_SECRET": "x"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.startswith("10,000 lines: numpy ")
+
+
+@pytest.fixture
+def item_id(client, owner, restaurant_id):
+    category = client.post(
+        f"/categories/{restaurant_id}", json={"name": "Mains"}, headers=owner
+    ).json()
+    response = client.post(
+        f"/menu/{category['id']}",
+        json={"name": "Dosa", "price": 100},
+        headers=owner,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def _sell(client, owner, restaurant_id, item_id, created_at, quantity):
+    from app.db.session import get_engine
+
+    table = client.post(
+        f"/tables/{restaurant_id}", json={"table_number": 9}, headers=owner
+    ).json()
+    with get_engine().begin() as conn:
+        order_id = conn.execute(
+            text(
+                "INSERT INTO orders (restaurant_id, table_id, total_amount, "
+                "is_completed, created_at) "
+                "VALUES (:restaurant_id, :table_id, 0, true, :at) "
+                "RETURNING id"
+            ),
+            {
+                "restaurant_id": restaurant_id,
+                "table_id": table["id"],
+                "at": created_at,
+            },
+        ).scalar()
+        conn.execute(
+            text(
+                "INSERT INTO order_items (order_id, order_created_at, "
+                "menu_item_id, quantity, name, unit_price) "
+                "VALUES (:order_id, :at, :item_id, :quantity, 'Dosa', 100)"
+            ),
+            {
+                "order_id": order_id,
+                "at": created_at,
+                "item_id": item_id,
+                "quantity": quantity,
+            },
+        )
+
+
+def test_analytics_days_are_local_days(client, owner, restaurant_id, item_id):
+    # 18:40 UTC is ten past midnight of the next day in Asia/Kolkata
+    for hour, minute, quantity in ((12, 0, 1), (18, 40, 2)):
+        _sell(
+            client,
+            owner,
+            restaurant_id,
+            item_id,
+            datetime(2026, 3, 10, hour, minute, tzinfo=timezone.utc),
+            quantity,
+        )
+
+    def sold(day):
+        response = client.get(
+            "/analytics/item-mix",
+            params={"start": day, "end": day, "restaurant_id": restaurant_id},
+            headers=owner,
+        )
+        assert response.status_code == 200, response.text
+        return [row["quantity"] for row in response.json()]
+
+    assert sold("2026-03-10") == [1]
+    assert sold("2026-03-11") == [2]
+
+    # The day before is the previous period of a one-day window
+    response = client.get(
+        "/analytics/revenue",
+        params={
+            "start": "2026-03-11",
+            "end": "2026-03-11",
+            "restaurant_id": restaurant_id,
+        },
+        headers=owner,
+    )
+    assert response.status_code == 200, response.text
+    [row] = response.json()
+    assert (row["revenue"], row["previous_revenue"]) == (200, 100)
+
+
+@pytest.mark.parametrize("limit, status", [(0, 422), (1, 200), (101, 422)])
+def test_item_mix_limit_is_bounded(
+    client, owner, restaurant_id, limit, status
+):
+    response = client.get(
+        "/analytics/item-mix",
+        params={"limit": limit, "restaurant_id": restaurant_id},
+        headers=owner,
+    )
+    assert response.status_code == status, response.text
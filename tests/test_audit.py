@@ -0,0 +1,75 @@
+import logging
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from app.core import audit
+from app.core.config import Settings
+
+
+@pytest.fixture
+def spill_path(tmp_path, monkeypatch):
+    path = tmp_path / "spill.jsonl"
+    settings = Settings(
+        DATABASE_URL="sqlite://", JWT_SECRET="x", AUDIT_SPILL_PATH=str(path)
+    )
+    monkeypatch.setattr(audit, "get_settings", lambda: settings)
+    return path
+
+
+def _entry(entity_id):
+    return {
+        "id": uuid.uuid4(),
+        "occurred_at": datetime.now(timezone.utc),
+        "actor_id": 1,
+        "restaurant_id": 2,
+        "entity": "menu_items",
+        "entity_id": entity_id,
+        "action": "update",
+        "changes": {"price": 120.0},
+    }
+
+
+def test_any_write_failure_spills_the_batch(spill_path, monkeypatch, caplog):
+    def fail(entries):
+        raise ValueError("not a database error")
+
+    monkeypatch.setattr(audit, "_write", fail)
+    log = audit.AuditLog()
+    entries = [_entry(1), _entry(2)]
+    log._pending = list(entries)
+
+    with caplog.at_level(logging.ERROR, logger=audit.__name__):
+        assert log.flush() == 0
+    assert "spilling 2 entries" in caplog.text
+    assert log._pending == []
+    spilled = [audit._load(line) for line in spill_path.open()]
+    assert spilled == entries
+
+    # The next flush that can write replays the spill file
+    written = []
+    monkeypatch.setattr(
+        audit, "_write", lambda batch: written.extend(batch) or len(batch)
+    )
+    assert log.flush() == 2
+    assert written == entries
+    assert not spill_path.exists()
+
+
+def test_failed_spill_keeps_entries_in_memory(spill_path, monkeypatch):
+    def fail(entries):
+        raise ValueError("not a database error")
+
+    monkeypatch.setattr(audit, "_write", fail)
+    # The spill file's directory is gone
+    monkeypatch.setattr(
+        audit.get_settings(),
+        "AUDIT_SPILL_PATH",
+        str(spill_path.parent / "missing" / "spill.jsonl"),
+    )
+    log = audit.AuditLog()
+    entries = [_entry(1)]
+    log._pending = list(entries)
+
+    assert log.flush() == 0
+    assert log._pending == entries
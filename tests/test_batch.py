@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+from app.api.dependencies import get_db
+from app.core.config import get_settings
+from fastapi import Depends
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# A sync handler still running in its worker thread at the timeout
+SLOW_SECONDS = 0.6
+# The current test's signals; the route is added to the app only once
+_slow = {}
+
+
+def _slow_handler(restaurant_id: int, db: Session = Depends(get_db)):
+    try:
+        time.sleep(SLOW_SECONDS)
+        db.execute(
+            text("UPDATE restaurants SET name = 'late' WHERE id = :id"),
+            {"id": restaurant_id},
+        )
+        db.commit()
+    except Exception as exc:
+        _slow["errors"].append(exc)
+        raise
+    finally:
+        _slow["finished"].set()
+    return {"ok": True}
+
+
+@pytest.fixture
+def slow_route(client, monkeypatch):
+    """``POST /_test/slow/{restaurant_id}`` renames it after a pause."""
+    monkeypatch.setattr(get_settings(), "BATCH_REQUEST_TIMEOUT_SECONDS", 0.1)
+    _slow.update(finished=threading.Event(), errors=[])
+    path = "/_test/slow/{restaurant_id}"
+    if not any(getattr(r, "path", None) == path for r in client.app.routes):
+        client.app.add_api_route(path, _slow_handler, methods=["POST"])
+    return _slow["finished"], _slow["errors"]
+
+
+def _restaurant_name(client, owner, restaurant_id):
+    return client.get(f"/restaurants/{restaurant_id}", headers=owner).json()[
+        "name"
+    ]
+
+
+@pytest.mark.parametrize("atomic", [True, False])
+def test_timed_out_sub_request_stops_the_batch(
+    client, owner, restaurant_id, slow_route, atomic
+):
+    finished, errors = slow_route
+    response = client.post(
+        "/batch",
+        json={
+            "atomic": atomic,
+            "requests": [
+                {
+                    "method": "PATCH",
+                    "path": f"/restaurants/{restaurant_id}",
+                    "body": {"name": "first"},
+                },
+                {"method": "POST", "path": f"/_test/slow/{restaurant_id}"},
+                {"path": f"/restaurants/{restaurant_id}"},
+            ],
+        },
+        headers=owner,
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [r["status"] for r in body["responses"]] == [200, 504, 424]
+    assert body["rolled_back"] is atomic
+
+    # The handler finishes on its session; only then is it rolled back
+    # (atomic) or closed, and nothing failed underneath it
+    assert finished.wait(5)
+    time.sleep(0.3)
+    assert errors == []
+    name = _restaurant_name(client, owner, restaurant_id)
+    assert name == ("Dosa Corner" if atomic else "late")
@@ -0,0 +1,143 @@
+import gzip
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import brotli
+import pytest
+import zstandard
+from app.core.compression import CODECS, CompressionMiddleware, negotiate
+from app.services.menu_cache import CachedPayload, synthetic_menu
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _unzstd(data: bytes) -> bytes:
+    # Streamed frames carry no content size, which decompress() requires
+    return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+DECODE = {"br": brotli.decompress, "zstd": _unzstd, "gzip": gzip.decompress}
+
+
+def test_codecs_are_preferred_br_zstd_gzip():
+    assert list(CODECS) == ["br", "zstd", "gzip"]
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("", None),
+        ("gzip", "gzip"),
+        ("gzip, deflate, br, zstd", "br"),
+        ("gzip, zstd", "zstd"),
+        ("GZIP, Deflate", "gzip"),
+        ("deflate, compress", None),
+        # A higher q wins over the preference order
+        ("br;q=0.5, gzip;q=0.8", "gzip"),
+        ("br;q=0.9, zstd;q=0.9, gzip", "gzip"),
+        ("gzip; q=0.2, zstd ; q = 0.3", "zstd"),
+        ("gzip;level=1;q=0.4, br;q=0.3", "gzip"),
+        # q=0 means "not acceptable"
+        ("br;q=0, gzip", "gzip"),
+        ("br;q=0, zstd;q=0, gzip;q=0", None),
+        ("gzip;q=abc", None),
+        # identity;q=0 refuses an unencoded body but picks no coding
+        ("identity;q=0, gzip;q=0.1", "gzip"),
+        ("identity;q=0", None),
+        # The wildcard covers every coding not listed
+        ("*", "br"),
+        ("br;q=0, *", "zstd"),
+        ("*;q=0.1, gzip", "gzip"),
+        ("*;q=0, identity", None),
+    ],
+)
+def test_negotiate(header, expected):
+    assert negotiate(header) == expected
+
+
+def test_cached_payload_decodes_to_the_raw_json():
+    raw = synthetic_menu(3, 4)
+    payload = CachedPayload(raw)
+    assert payload.body(None) is raw
+    for encoding, decode in DECODE.items():
+        body = payload.body(encoding)
+        assert payload.body(encoding) is body
+        assert decode(body) == raw
+
+
+def _app():
+    text = "menu " * 400
+
+    def large(request):
+        return PlainTextResponse(text)
+
+    def small(request):
+        return PlainTextResponse("ok")
+
+    def image(request):
+        return Response(text.encode(), media_type="image/png")
+
+    app = Starlette(
+        routes=[
+            Route("/large", large),
+            Route("/small", small),
+            Route("/image", image),
+        ]
+    )
+    return CompressionMiddleware(app, minimum_size=1024), text.encode()
+
+
+@pytest.mark.parametrize("encoding", list(DECODE))
+def test_middleware_compresses_with_the_negotiated_coding(encoding):
+    app, text = _app()
+    client = TestClient(app)
+    # Ask for this coding and, less preferred, the others
+    accept = ", ".join(
+        name if name == encoding else f"{name};q=0.5" for name in DECODE
+    )
+    with client.stream(
+        "GET", "/large", headers={"Accept-Encoding": accept}
+    ) as response:
+        body = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == encoding
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert DECODE[encoding](body) == text
+
+
+@pytest.mark.parametrize(
+    "path, accept", [("/small", "br"), ("/image", "br"), ("/large", "")]
+)
+def test_middleware_leaves_body_as_is(path, accept):
+    app, _ = _app()
+    response = TestClient(app).get(path, headers={"Accept-Encoding": accept})
+    assert "content-encoding" not in response.headers
+
+
+def test_benchmark_runs():
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "app.services.menu_cache",
+            "--categories",
+            "2",
+            "--items",
+            "3",
+            "--repeat",
+            "2",
+        ],
+        cwd=ROOT,
+        env={**os.environ, "DATABASE_URL": "sqlite://", "JWT_SECRET": "x"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    lines = result.stdout.splitlines()
+    assert lines[0].startswith("2 x 3 menu: ")
+    assert [line.split()[0] for line in lines[1:]] == list(CODECS)
@@ -0,0 +1,83 @@
+import base64
+import json
+
+import pytest
+from app.crud.customer import decode_cursor, encode_cursor
+
+
+def _raw(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode()
+
+
+@pytest.mark.parametrize(
+    "key, kinds",
+    [
+        ((7,), (int,)),
+        ((0.8125, 42), (float, int)),
+        # A score of exactly 1 comes back from JSON as an int
+        ((1, 42), (float, int)),
+        (("2026-03-10T12:00:00+00:00", "9f1c"), (str, str)),
+        ((True,), (bool,)),
+    ],
+)
+def test_cursor_round_trips(key, kinds):
+    assert decode_cursor(encode_cursor(*key), *kinds) == list(key)
+
+
+@pytest.mark.parametrize(
+    "cursor, kinds",
+    [
+        ("", (int,)),
+        ("not base64!", (int,)),
+        ("é", (int,)),
+        (_raw(b"{not json"), (int,)),
+        (_raw(b"\xff\xfe\x00"), (int,)),
+        # Not a list, or the wrong number of values
+        (_raw(b'{"id": 7}'), (int,)),
+        (_raw(b"7"), (int,)),
+        (_raw(b"[]"), (int,)),
+        (_raw(b"[7, 8]"), (int,)),
+        (_raw(b"[0.5]"), (float, int)),
+        # The wrong kinds, including JSON's bool-for-int
+        (_raw(b'["7"]'), (int,)),
+        (_raw(b"[7.5]"), (int,)),
+        (_raw(b"[true]"), (int,)),
+        (_raw(b"[null, 7]"), (float, int)),
+        (_raw(b'[0.5, "7"]'), (float, int)),
+        (_raw(b"[[1], 7]"), (float, int)),
+        # Scores no row can be compared with
+        (_raw(b"[NaN, 7]"), (float, int)),
+        (_raw(b"[Infinity, 7]"), (float, int)),
+        (_raw(b"[1e999, 7]"), (float, int)),
+        # Deep enough to exhaust the JSON decoder's recursion
+        (_raw(b"[" * 5_000), (int,)),
+    ],
+)
+def test_malformed_cursor_is_refused(cursor, kinds):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor, *kinds)
+
+
+def test_customer_pages_follow_the_cursor(client, owner, restaurant_id):
+    path = f"/restaurants/{restaurant_id}/customers"
+    for n in range(5):
+        response = client.post(
+            path, json={"name": f"Guest {n}"}, headers=owner
+        )
+        assert response.status_code == 200, response.text
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get(path, params=params, headers=owner).json()
+        seen += [customer["name"] for customer in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"Guest {n}" for n in range(5)]
+
+    forged = _raw(json.dumps(["1; DROP TABLE customers"]).encode())
+    for bad in ("garbage", forged, _raw(b"[" * 5_000)):
+        response = client.get(path, params={"cursor": bad}, headers=owner)
+        assert response.status_code == 400, response.text
+        assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,119 @@
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Peak RSS (KiB) of a process streaming the large export, imports
+# included; buffering it would take several times this
+MEMORY_CEILING_KIB = 150 * 1024
+LARGE_EXPORT_ROWS = 1_000_000
+
+# Streams one restaurant's CSV export; prints its lines and peak RSS.
+# On Linux ru_maxrss carries over the forked parent's peak across exec,
+# so the test runner's own size would count; VmHWM is this image's only.
+_EXPORT_SCRIPT = """
+import re, resource, sys
+from app.db.base import load_models
+from app.services.exports import export_orders
+
+
+def peak_rss():
+    try:
+        with open("/proc/self/status") as status:
+            return int(re.search(r"VmHWM:\\s+(\\d+)", status.read())[1])
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+load_models()
+lines = sum(
+    chunk.count(b"\\n") for chunk in export_orders(int(sys.argv[1]), "csv")
+)
+print(lines, peak_rss())
+"""
+
+
+@pytest.fixture
+def table_id(client, owner, restaurant_id):
+    response = client.post(
+        f"/tables/{restaurant_id}", json={"table_number": 1}, headers=owner
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def _add_orders(restaurant_id, table_id, created_at, count=1):
+    from app.db.session import get_engine
+
+    with get_engine().begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO orders "
+                "(restaurant_id, table_id, total_amount, is_completed, "
+                "created_at) "
+                "SELECT :restaurant_id, :table_id, n, true, :created_at "
+                "FROM generate_series(1, :count) AS n"
+            ),
+            {
+                "restaurant_id": restaurant_id,
+                "table_id": table_id,
+                "created_at": created_at,
+                "count": count,
+            },
+        )
+
+
+def test_export_dates_are_local_days(client, owner, restaurant_id, table_id):
+    # 18:40 UTC is ten past midnight of the next day in Asia/Kolkata
+    _add_orders(
+        restaurant_id,
+        table_id,
+        datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc),
+    )
+    _add_orders(
+        restaurant_id,
+        table_id,
+        datetime(2026, 3, 10, 18, 40, tzinfo=timezone.utc),
+    )
+
+    def exported(day):
+        response = client.get(
+            f"/orders/{restaurant_id}/export",
+            params={"format": "ndjson", "start": day, "end": day},
+            headers=owner,
+        )
+        assert response.status_code == 200, response.text
+        return [line for line in response.text.splitlines() if line]
+
+    assert [line.count("T12:00:00") for line in exported("2026-03-10")] == [1]
+    assert [line.count("T18:40:00") for line in exported("2026-03-11")] == [1]
+
+
+def test_large_export_streams_in_bounded_memory(
+    database_url, restaurant_id, table_id
+):
+    _add_orders(
+        restaurant_id,
+        table_id,
+        datetime(2026, 2, 1, tzinfo=timezone.utc),
+        LARGE_EXPORT_ROWS,
+    )
+    # In a process of its own, so its peak RSS is the export's alone
+    result = subprocess.run(
+        [sys.executable, "-c", _EXPORT_SCRIPT, str(restaurant_id)],
+        cwd=ROOT,
+        env={**os.environ, "DATABASE_URL": database_url, "JWT_SECRET": "x"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    lines, peak = map(int, result.stdout.split())
+    # Header, then one line per order (they have no items)
+    assert lines == LARGE_EXPORT_ROWS + 1
+    assert peak <= MEMORY_CEILING_KIB, f"peak RSS {peak // 1024} MiB"
@@ -0,0 +1,79 @@
+import threading
+import time
+import uuid
+
+import pytest
+from fastapi import Response
+
+# Calls of the test route, by Idempotency-Key
+_calls: dict[str, int] = {}
+
+
+def _counted(key: str, response: Response, delay: float = 0.0):
+    time.sleep(delay)
+    _calls[key] = _calls.get(key, 0) + 1
+    response.set_cookie("first", "1")
+    response.set_cookie("second", "2")
+    return {"calls": _calls[key]}
+
+
+@pytest.fixture
+def counted(client, owner):
+    """``POST /_test/counted/{key}``, and a poster sending that key."""
+    path = "/_test/counted/{key}"
+    if not any(getattr(r, "path", None) == path for r in client.app.routes):
+        client.app.add_api_route(path, _counted, methods=["POST"])
+    key = uuid.uuid4().hex
+
+    def post(query="", body=None):
+        return client.post(
+            f"/_test/counted/{key}{query}",
+            json=body or {"a": 1},
+            headers={**owner, "Idempotency-Key": key},
+        )
+
+    return key, post
+
+
+def test_retry_replays_the_stored_response(counted):
+    key, post = counted
+    first, second = post(), post()
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json() == {"calls": 1}
+    assert _calls[key] == 1
+    assert "Idempotent-Replayed" not in first.headers
+    assert second.headers["Idempotent-Replayed"] == "true"
+    # Repeated headers are kept, live and replayed
+    for response in (first, second):
+        cookies = response.headers.get_list("set-cookie")
+        assert [cookie.split(";")[0] for cookie in cookies] == [
+            "first=1",
+            "second=2",
+        ]
+
+
+@pytest.mark.parametrize("change", [{"body": {"a": 2}}, {"query": "?delay=0"}])
+def test_reused_key_for_another_request_is_rejected(counted, change):
+    key, post = counted
+    assert post().status_code == 200
+    response = post(**change)
+    assert response.status_code == 422
+    assert _calls[key] == 1
+
+
+def test_duplicate_in_flight_waits_for_the_first(counted):
+    key, post = counted
+    responses = {}
+
+    def send(name):
+        responses[name] = post("?delay=0.5")
+
+    first = threading.Thread(target=send, args=("first",))
+    first.start()
+    time.sleep(0.2)
+    send("second")
+    first.join()
+
+    assert responses["first"].json() == responses["second"].json()
+    assert responses["second"].headers["Idempotent-Replayed"] == "true"
+    assert _calls[key] == 1
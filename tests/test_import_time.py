@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules ``import app.main`` may load: FastAPI, pydantic-settings and
+# the config, with some headroom (it is about 300)
+MODULE_BUDGET = 400
+# Cumulative microseconds for app.main, cold, on a slow runner
+TIME_BUDGET_US = 2_000_000
+# Only imported once the app is built or started
+DEFERRED = ("httpx", "segno", "numpy", "sqlalchemy", "psycopg2", "app.api")
+
+
+def _import_times() -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT,
+        env={**os.environ, "DATABASE_URL": "sqlite://", "JWT_SECRET": "x"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_app_main_stays_light():
+    times = _import_times()
+    assert len(times) <= MODULE_BUDGET, f"{len(times)} modules imported"
+    assert times["app.main"] <= TIME_BUDGET_US
+    loaded = [
+        name
+        for name in times
+        if any(name == top or name.startswith(f"{top}.") for top in DEFERRED)
+    ]
+    assert not loaded, f"imported by app.main: {loaded}"
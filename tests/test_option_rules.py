@@ -0,0 +1,130 @@
+import pytest
+from app.services.option_rules import (
+    GroupRule,
+    ItemRule,
+    MenuRules,
+    OptionError,
+    OptionRule,
+    compile_rules,
+)
+
+SIZE = GroupRule(1, "Size", min_select=1, max_select=1)
+TOPPINGS = GroupRule(2, "Toppings", min_select=0, max_select=2)
+
+
+@pytest.fixture
+def rules():
+    return MenuRules(
+        items={
+            10: ItemRule(10, "Pizza", 200.0, groups=(SIZE, TOPPINGS)),
+            11: ItemRule(11, "Naan", 40.0),
+            12: ItemRule(12, "Kulfi", 90.0, is_available=False),
+        },
+        options={
+            100: OptionRule(100, 1, "Small", 0.0, True),
+            101: OptionRule(101, 1, "Large", 80.0, True),
+            200: OptionRule(200, 2, "Olives", 25.0, True),
+            201: OptionRule(201, 2, "Paneer", 45.5, True),
+            202: OptionRule(202, 2, "Jalapeno", 20.0, True),
+            203: OptionRule(203, 2, "Truffle", 300.0, False),
+            # Offered by no group of the pizza
+            300: OptionRule(300, 3, "Butter", 10.0, True),
+        },
+    )
+
+
+def test_item_without_groups(rules):
+    line = rules.price(11, [])
+    assert (line.menu_item_id, line.name, line.unit_price) == (
+        11,
+        "Naan",
+        40.0,
+    )
+    assert line.options == () and line.options_key == ""
+
+
+def test_price_adds_the_chosen_options(rules):
+    line = rules.price(10, [201, 101, 200])
+    assert line.unit_price == pytest.approx(200 + 80 + 25 + 45.5)
+    # Options are ordered by id, so the same choice always keys the same
+    assert [option.id for option in line.options] == [101, 200, 201]
+    assert line.options_key == "101,200,201"
+    assert rules.price(10, [200, 201, 101]).options_key == line.options_key
+
+
+def test_optional_group_may_be_skipped(rules):
+    assert rules.price(10, [100]).unit_price == 200.0
+
+
+@pytest.mark.parametrize(
+    "item_id, option_ids, message",
+    [
+        (12, [], "Kulfi is not available"),
+        (10, [100, 100], "An option was chosen more than once"),
+        (10, [100, 300], "Option 300 is not offered for Pizza"),
+        (10, [100, 999], "Option 999 is not offered for Pizza"),
+        (11, [100], "Option 100 is not offered for Naan"),
+        (10, [100, 203], "Truffle is not available"),
+        (10, [], "Choose at least 1 of Size"),
+        (10, [200], "Choose at least 1 of Size"),
+        (10, [100, 101], "Choose at most 1 of Size"),
+        (10, [100, 200, 201, 202], "Choose at most 2 of Toppings"),
+    ],
+)
+def test_violations(rules, item_id, option_ids, message):
+    with pytest.raises(OptionError) as raised:
+        rules.price(item_id, option_ids)
+    assert str(raised.value) == message
+
+
+def test_unknown_item(rules):
+    with pytest.raises(KeyError):
+        rules.price(99, [])
+
+
+def test_compile_rules(client, owner, restaurant_id):
+    from app.db.session import SessionLocal
+
+    category = client.post(
+        f"/categories/{restaurant_id}", json={"name": "Mains"}, headers=owner
+    ).json()
+    item = client.post(
+        f"/menu/{category['id']}",
+        json={"name": "Thali", "price": 150},
+        headers=owner,
+    ).json()
+    # Required lifts min_select to one
+    group = client.post(
+        f"/options/groups/{restaurant_id}",
+        json={"name": "Rice", "required": True, "max_select": 1},
+        headers=owner,
+    ).json()
+    option = client.post(
+        f"/options/groups/{group['id']}/options",
+        json={"name": "Jeera", "price_delta": 20},
+        headers=owner,
+    ).json()
+    response = client.put(
+        f"/options/{restaurant_id}/items/{item['id']}",
+        json={"option_group_ids": [group["id"]]},
+        headers=owner,
+    )
+    assert response.status_code == 200, response.text
+
+    with SessionLocal() as db:
+        rules = compile_rules(db, restaurant_id)
+    assert rules.items[item["id"]].groups == (
+        GroupRule(group["id"], "Rice", 1, 1),
+    )
+    assert rules.price(item["id"], [option["id"]]).unit_price == 170
+    with pytest.raises(OptionError, match="Choose at least 1 of Rice"):
+        rules.price(item["id"], [])
+
+    response = client.patch(
+        f"/menu/{item['id']}", json={"is_available": False}, headers=owner
+    )
+    assert response.status_code == 200, response.text
+    with SessionLocal() as db:
+        rules = compile_rules(db, restaurant_id)
+    with pytest.raises(OptionError, match="Thali is not available"):
+        rules.price(item["id"], [option["id"]])
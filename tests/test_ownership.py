@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import text
+
+
+@pytest.fixture
+def category_id(client, owner, restaurant_id):
+    response = client.post(
+        f"/categories/{restaurant_id}", json={"name": "Mains"}, headers=owner
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def _deleted_elsewhere(restaurant_id):
+    # As another worker would: this process's ownership cache still
+    # lists the restaurant
+    from app.db.session import get_engine
+
+    with get_engine().begin() as conn:
+        conn.execute(
+            text(
+                "UPDATE restaurants SET is_deleted = true, "
+                "deleted_at = now() WHERE id = :id"
+            ),
+            {"id": restaurant_id},
+        )
+
+
+def test_writes_refuse_a_restaurant_deleted_by_another_worker(
+    client, owner, restaurant_id, category_id
+):
+    # Fill the cache
+    response = client.get(f"/restaurants/{restaurant_id}/menu", headers=owner)
+    assert response.status_code == 200, response.text
+    _deleted_elsewhere(restaurant_id)
+
+    # Restaurant-scoped and parent-scoped writes
+    for method, path, body in (
+        ("POST", f"/categories/{restaurant_id}", {"name": "Sides"}),
+        ("POST", f"/tables/{restaurant_id}", {"table_number": 3}),
+        ("PUT", f"/categories/{category_id}", {"name": "Curries"}),
+        ("POST", f"/menu/{category_id}", {"name": "Naan", "price": 40}),
+    ):
+        response = client.request(method, path, json=body, headers=owner)
+        assert response.status_code == 404, (method, path, response.text)
+
+
+def test_writes_see_a_restaurant_restored_by_another_worker(
+    client, owner, restaurant_id
+):
+    _deleted_elsewhere(restaurant_id)
+    response = client.get(f"/restaurants/{restaurant_id}/menu", headers=owner)
+    assert response.status_code == 404, response.text
+
+    from app.db.session import get_engine
+
+    with get_engine().begin() as conn:
+        conn.execute(
+            text(
+                "UPDATE restaurants SET is_deleted = false, "
+                "deleted_at = NULL WHERE id = :id"
+            ),
+            {"id": restaurant_id},
+        )
+    response = client.post(
+        f"/categories/{restaurant_id}", json={"name": "Sides"}, headers=owner
+    )
+    assert response.status_code == 200, response.text
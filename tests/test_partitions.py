@@ -0,0 +1,109 @@
+import csv
+import gzip
+from datetime import date, datetime, timezone
+
+import pytest
+from app.services import partitions_benchmark
+from app.services.partitions import archive_month, ensure_partitions
+from sqlalchemy import create_engine, text
+
+
+@pytest.fixture
+def engine(database_url):
+    engine = create_engine(database_url)
+    yield engine
+    engine.dispose()
+
+
+def _rows(path):
+    with gzip.open(path, "rt", newline="") as archived:
+        return list(csv.DictReader(archived))
+
+
+def test_archive_month_copies_and_deletes_its_payments(
+    client, owner, restaurant_id, engine, tmp_path
+):
+    table = client.post(
+        f"/tables/{restaurant_id}", json={"table_number": 1}, headers=owner
+    ).json()
+    month = date(2020, 1, 1)
+    with engine.connect() as conn:
+        ensure_partitions(conn, 1, today=month)
+        orders = {}
+        # The last instant of January and the first of February
+        for name, created_at in (
+            (
+                "january",
+                datetime(2020, 1, 31, 23, 59, 59, tzinfo=timezone.utc),
+            ),
+            ("february", datetime(2020, 2, 1, tzinfo=timezone.utc)),
+        ):
+            orders[name] = conn.execute(
+                text(
+                    "INSERT INTO orders (restaurant_id, table_id, "
+                    "total_amount, is_completed, created_at) "
+                    "VALUES (:restaurant_id, :table_id, 100, true, :at) "
+                    "RETURNING id"
+                ),
+                {
+                    "restaurant_id": restaurant_id,
+                    "table_id": table["id"],
+                    "at": created_at,
+                },
+            ).scalar()
+            conn.execute(
+                text(
+                    "INSERT INTO payments (order_id, order_created_at, "
+                    "method, status, amount, idempotency_key) "
+                    "VALUES (:order_id, :at, 'CASH', 'CAPTURED', 100, :key)"
+                ),
+                {"order_id": orders[name], "at": created_at, "key": name},
+            )
+        conn.commit()
+
+        assert archive_month(conn, month, str(tmp_path))
+
+        target = tmp_path / "2020_01"
+        archived = _rows(target / "orders.csv.gz")
+        assert [int(row["id"]) for row in archived] == [orders["january"]]
+        payments = _rows(target / "payments.csv.gz")
+        assert [row["idempotency_key"] for row in payments] == ["january"]
+        left = conn.execute(
+            text(
+                "SELECT idempotency_key FROM payments "
+                "WHERE order_id = ANY(:ids)"
+            ),
+            {"ids": list(orders.values())},
+        ).scalars()
+        assert list(left) == ["february"]
+        assert (
+            conn.execute(
+                text("SELECT to_regclass('orders_p2020_01')")
+            ).scalar()
+            is None
+        )
+        conn.rollback()
+
+
+def test_benchmark_runs(engine):
+    with engine.connect() as conn:
+        timings = partitions_benchmark.run(
+            conn, orders=5_000, months=3, restaurants=10, tables=5, lookups=5
+        )
+        assert [label for label, _ in timings] == [
+            "lookup, plain table, no index",
+            "lookup, plain table, partial index",
+            "lookup, partitioned, now() - 48h bound",
+            "lookup, partitioned, constant bound",
+            "archive oldest month, DELETE",
+            "archive oldest month, DETACH + DROP",
+        ]
+        assert all(seconds > 0 for _, seconds in timings)
+        # The scratch schema is gone again
+        assert (
+            conn.execute(
+                text("SELECT to_regnamespace(:name)"),
+                {"name": partitions_benchmark.SCHEMA},
+            ).scalar()
+            is None
+        )
@@ -0,0 +1,133 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from app.services.reservations import IntervalTree
+
+
+def test_interval_tree_matches_brute_force():
+    rng = random.Random(7)
+    intervals = []
+    for value in range(3_600):
+        start = rng.uniform(0, 100_000)
+        intervals.append((start, start + rng.uniform(1, 600), value))
+    tree = IntervalTree(intervals)
+    assert len(tree) == len(intervals)
+
+    windows = [(-10.0, 0.0), (100_600.0, 200_000.0), (0.0, 200_000.0)]
+    windows += [
+        (start, start + rng.uniform(0, 2_000))
+        for start in (rng.uniform(-500, 100_500) for _ in range(2_000))
+    ]
+    # Shared endpoints: half-open intervals that only touch don't overlap
+    windows += [(end, end + 5) for _, end, _ in intervals[:200]]
+    windows += [(start - 5, start) for start, _, _ in intervals[:200]]
+    for start, end in windows:
+        expected = {
+            value for s, e, value in intervals if s < end and e > start
+        }
+        assert set(tree.overlapping(start, end)) == expected
+
+
+def test_empty_interval_tree():
+    assert IntervalTree([]).overlapping(0, 10) == []
+
+
+@pytest.fixture
+def table_id(client, owner, restaurant_id):
+    response = client.post(
+        f"/tables/{restaurant_id}",
+        json={"table_number": 1, "seats": 4},
+        headers=owner,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def _book(client, owner, restaurant_id, starts_at, hours=2, **values):
+    return client.post(
+        f"/restaurants/{restaurant_id}/reservations",
+        json={
+            "guest_name": "Asha",
+            "party_size": 2,
+            "starts_at": starts_at.isoformat(),
+            "ends_at": (starts_at + timedelta(hours=hours)).isoformat(),
+            **values,
+        },
+        headers=owner,
+    )
+
+
+def _hour_from_now(hours):
+    now = datetime.now(timezone.utc)
+    return now.replace(minute=0, second=0, microsecond=0) + timedelta(
+        hours=hours
+    )
+
+
+def test_overlapping_booking_hits_the_exclusion_constraint(
+    client, owner, restaurant_id, table_id
+):
+    starts_at = _hour_from_now(24)
+    first = _book(client, owner, restaurant_id, starts_at, table_id=table_id)
+    assert first.status_code == 200, first.text
+
+    # The route doesn't look for overlaps on a named table; the database
+    # constraint refuses the second booking
+    clash = _book(
+        client,
+        owner,
+        restaurant_id,
+        starts_at + timedelta(hours=1),
+        table_id=table_id,
+    )
+    assert clash.status_code == 409
+    assert clash.json()["detail"] == "Table is already booked for that time"
+
+    # Without a table the search finds none free
+    full = _book(client, owner, restaurant_id, starts_at)
+    assert full.status_code == 409
+
+    # Touching windows don't overlap
+    after = _book(
+        client,
+        owner,
+        restaurant_id,
+        starts_at + timedelta(hours=2),
+        table_id=table_id,
+    )
+    assert after.status_code == 200, after.text
+
+    # Cancelling frees the table
+    cancelled = client.patch(
+        f"/reservations/{first.json()['id']}",
+        json={"status": "CANCELLED"},
+        headers=owner,
+    )
+    assert cancelled.status_code == 200, cancelled.text
+    assert _book(client, owner, restaurant_id, starts_at).status_code == 200
+
+
+def test_start_in_the_past_is_refused(client, owner, restaurant_id, table_id):
+    past = datetime.now(timezone.utc) - timedelta(hours=1)
+    response = _book(client, owner, restaurant_id, past, hours=3)
+    assert response.status_code == 422
+    assert response.json()["detail"] == "That time has passed"
+
+    # Within the grace period (a walk-in entered late) it's accepted, and
+    # the running booking can still be extended
+    recent = datetime.now(timezone.utc) - timedelta(minutes=5)
+    booked = _book(client, owner, restaurant_id, recent, hours=1)
+    assert booked.status_code == 200, booked.text
+    extended = client.patch(
+        f"/reservations/{booked.json()['id']}",
+        json={"ends_at": (recent + timedelta(hours=2)).isoformat()},
+        headers=owner,
+    )
+    assert extended.status_code == 200, extended.text
+    moved = client.patch(
+        f"/reservations/{booked.json()['id']}",
+        json={"starts_at": past.isoformat()},
+        headers=owner,
+    )
+    assert moved.status_code == 422
@@ -0,0 +1,151 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+
+@contextmanager
+def statements():
+    """Collect the SQL the app's engine sends while the block runs."""
+    from app.db.session import get_engine
+
+    sent = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        sent.append(statement)
+
+    engine = get_engine()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield sent
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _assert_budget(sent: list[str], budget: int):
+    assert len(sent) <= budget, "\n".join(sent)
+
+
+# One lookup of the user (or of what they own), then one INSERT or
+# UPDATE ... RETURNING: no SELECT-then-refresh round trips. COMMIT is
+# not a cursor statement and is not counted.
+
+
+def test_create_restaurant(client, owner):
+    with statements() as sent:
+        response = client.post(
+            "/restaurants/hotels/",
+            json={"name": "Dosa Corner", "location": "Pune"},
+            headers=owner,
+        )
+    assert response.status_code == 200, response.text
+    _assert_budget(sent, 2)
+
+
+def test_put_restaurant(client, owner, restaurant_id):
+    with statements() as sent:
+        response = client.put(
+            f"/restaurants/{restaurant_id}",
+            json={"name": "Dosa Corner 2", "location": "Mumbai"},
+            headers=owner,
+        )
+    assert response.status_code == 200, response.text
+    assert response.json()["name"] == "Dosa Corner 2"
+    _assert_budget(sent, 2)
+
+
+def test_create_table(client, owner, restaurant_id):
+    with statements() as sent:
+        response = client.post(
+            f"/tables/{restaurant_id}", json={"table_number": 1}, headers=owner
+        )
+    assert response.status_code == 200, response.text
+    _assert_budget(sent, 2)
+
+
+def test_put_table(client, owner, restaurant_id):
+    table = client.post(
+        f"/tables/{restaurant_id}", json={"table_number": 1}, headers=owner
+    ).json()
+    with statements() as sent:
+        response = client.put(
+            f"/tables/{table['id']}",
+            json={"table_number": 2, "seats": 6},
+            headers=owner,
+        )
+    assert response.status_code == 200, response.text
+    assert response.json()["table_number"] == 2
+    _assert_budget(sent, 2)
+
+
+@pytest.fixture
+def menu(client, owner, restaurant_id):
+    """Ids of a table, category, menu item and option of the restaurant."""
+
+    def create(path, body):
+        response = client.post(path, json=body, headers=owner)
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+
+    category_id = create(f"/categories/{restaurant_id}", {"name": "Mains"})
+    group_id = create(f"/options/groups/{restaurant_id}", {"name": "Spice"})
+    return {
+        "restaurant_id": restaurant_id,
+        "table_id": create(f"/tables/{restaurant_id}", {"table_number": 1}),
+        "category_id": category_id,
+        "item_id": create(
+            f"/menu/{category_id}", {"name": "Paneer", "price": 250}
+        ),
+        "option_id": create(
+            f"/options/groups/{group_id}/options", {"name": "Hot"}
+        ),
+    }
+
+
+# (method, path, body, budget): the ownership lookup (writes never
+# answer it from the per-process cache), the write and, for anything
+# under a category, the restaurant's menu version bump
+WRITES = [
+    ("PATCH", "/restaurants/{restaurant_id}", {"name": "Renamed"}, 2),
+    ("PATCH", "/tables/{table_id}", {"status": "OCCUPIED"}, 2),
+    ("POST", "/categories/{restaurant_id}", {"name": "Sides"}, 3),
+    ("PUT", "/categories/{category_id}", {"name": "Curries"}, 3),
+    ("PATCH", "/categories/{category_id}", {"name": "Curries"}, 3),
+    ("POST", "/menu/{category_id}", {"name": "Naan", "price": 40}, 3),
+    ("PUT", "/menu/{item_id}", {"name": "Paneer", "price": 260}, 3),
+    ("PATCH", "/menu/{item_id}", {"is_available": False}, 3),
+    ("PUT", "/options/{option_id}", {"name": "Hot", "price_delta": 5}, 3),
+    ("PATCH", "/options/{option_id}", {"price_delta": 10}, 3),
+]
+
+
+@pytest.mark.parametrize("method, path, body, budget", WRITES)
+def test_menu_and_patch_writes(
+    client, owner, menu, method, path, body, budget
+):
+    with statements() as sent:
+        response = client.request(
+            method, path.format(**menu), json=body, headers=owner
+        )
+    assert response.status_code == 200, response.text
+    _assert_budget(sent, budget)
+
+
+def test_place_order(client, owner, menu):
+    path = f"/orders/{menu['restaurant_id']}/"
+    items = [{"menu_item_id": menu["item_id"], "quantity": 2}]
+    # The first order compiles and caches the menu rules; measure a new
+    # order on another table and then an append to that open order
+    first = {"table_id": menu["table_id"], "items": items}
+    assert client.post(path, json=first, headers=owner).status_code == 200
+    table = client.post(
+        f"/tables/{menu['restaurant_id']}",
+        json={"table_number": 2},
+        headers=owner,
+    ).json()
+    order = {"table_id": table["id"], "items": items}
+    for budget in (12, 13):
+        with statements() as sent:
+            response = client.post(path, json=order, headers=owner)
+        assert response.status_code == 200, response.text
+        _assert_budget(sent, budget)
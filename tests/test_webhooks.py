@@ -0,0 +1,153 @@
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from app.core.config import get_settings
+from app.core.webhooks import WebhookDispatcher, _PinnedTransport
+from app.services import webhooks
+from app.services.webhooks import UnsafeURLError, check_url
+from sqlalchemy import text
+
+
+@pytest.fixture
+def resolve_to(monkeypatch):
+    """Make every host name resolve to the given address."""
+
+    def resolve(address):
+        def getaddrinfo(host, port, *args, **kwargs):
+            family = socket.AF_INET6 if ":" in address else socket.AF_INET
+            return [(family, socket.SOCK_STREAM, 6, "", (address, port))]
+
+        monkeypatch.setattr(webhooks.socket, "getaddrinfo", getaddrinfo)
+
+    return resolve
+
+
+@pytest.fixture
+def receiver():
+    """A local endpoint recording the Host header of each request."""
+    hosts = []
+
+    class Receiver(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            hosts.append(self.headers["Host"])
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Receiver)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1], hosts
+    server.shutdown()
+
+
+def _post(url: str):
+    async def post():
+        async with httpx.AsyncClient(transport=_PinnedTransport()) as client:
+            return await client.post(url, content=b"{}")
+
+    return asyncio.run(post())
+
+
+@pytest.mark.parametrize(
+    "address",
+    [
+        "127.0.0.1",
+        "10.1.2.3",
+        "169.254.169.254",
+        "100.64.0.1",
+        "224.0.0.1",
+        "0.0.0.0",
+        "::1",
+        "::ffff:127.0.0.1",
+        "fe80::1",
+    ],
+)
+def test_non_public_addresses_are_refused(resolve_to, address):
+    resolve_to(address)
+    with pytest.raises(UnsafeURLError):
+        check_url("https://hooks.example/in")
+
+
+def test_public_address_is_allowed(resolve_to):
+    resolve_to("93.184.216.34")
+    check_url("https://hooks.example/in")
+
+
+def test_requests_go_to_the_checked_address(resolve_to, receiver, monkeypatch):
+    port, hosts = receiver
+    monkeypatch.setattr(
+        get_settings(), "WEBHOOK_ALLOW_PRIVATE_ADDRESSES", True
+    )
+    # No real DNS for this name: the request reaches the receiver only
+    # through the address the check resolved
+    resolve_to("127.0.0.1")
+    response = _post(f"http://hooks.example:{port}/in")
+    assert response.status_code == 204
+    assert hosts == [f"hooks.example:{port}"]
+
+
+def test_rebound_host_is_refused_at_connect(resolve_to, receiver):
+    port, hosts = receiver
+    resolve_to("127.0.0.1")
+    with pytest.raises(UnsafeURLError):
+        _post(f"http://hooks.example:{port}/in")
+    assert hosts == []
+
+
+def test_claim_keeps_only_free_slots(client, restaurant_id, monkeypatch):
+    from app.db.session import get_engine
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "WEBHOOK_BATCH_SIZE", 10)
+    monkeypatch.setattr(settings, "WEBHOOK_ENDPOINT_CONCURRENCY", 2)
+    monkeypatch.setattr(settings, "WEBHOOK_CLAIM_SIZE", 200)
+    with get_engine().begin() as conn:
+        sid = conn.execute(
+            text(
+                "INSERT INTO webhook_subscriptions "
+                "(restaurant_id, url, secret, events) "
+                "VALUES (:rid, 'https://hooks.example/in', 's', "
+                "ARRAY['order.placed']) RETURNING id"
+            ),
+            {"rid": restaurant_id},
+        ).scalar()
+        conn.execute(
+            text(
+                "INSERT INTO webhook_deliveries (subscription_id, event, "
+                "payload) SELECT :sid, 'order.placed', '{}' "
+                "FROM generate_series(1, 35)"
+            ),
+            {"sid": sid},
+        )
+
+    # One batch already in flight leaves one slot
+    batches = [
+        batch
+        for batch in WebhookDispatcher()._claim({sid: 1})
+        if batch.subscription_id == sid
+    ]
+    assert [len(batch.deliveries) for batch in batches] == [10]
+    with get_engine().begin() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT attempts, available_at <= now() AS due, count(*) "
+                "FROM webhook_deliveries WHERE subscription_id = :sid "
+                "GROUP BY 1, 2 ORDER BY 1"
+            ),
+            {"sid": sid},
+        ).all()
+    # The rest are handed back untried and due again
+    assert [tuple(row) for row in rows] == [(0, True, 25), (1, False, 10)]
+
+    # At its limit the endpoint is left out of claims altogether
+    assert not any(
+        batch.subscription_id == sid
+        for batch in WebhookDispatcher()._claim({sid: 2})
+    )